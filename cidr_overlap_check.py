@@ -0,0 +1,45 @@
+import json
+import random
+import sys
+import time
+
+from network_topology.overlap import encode_cidrs, find_conflicts, overlapping_pairs
+from network_topology.snapshot import load_snapshot, merge_accounts, snapshot_basename
+
+# Reports overlapping VPC CIDRs and shadowed TGW routes in a saved snapshot:
+#   python cidr_overlap_check.py <snapshot.json[.gz|.zst] | snapshot.cols>
+# or times the overlap sweep on N random prefixes:
+#   python cidr_overlap_check.py --synthetic 100000
+
+if len(sys.argv) == 3 and sys.argv[1] == "--synthetic":
+    count = int(sys.argv[2])
+    rng = random.Random(0)
+    cidrs = [
+        f"10.{rng.randrange(256)}.{rng.randrange(256)}.0/{rng.choice((16, 20, 24, 28))}"
+        for _ in range(count)
+    ]
+    start = time.perf_counter()
+    starts, ends, _ = encode_cidrs(cidrs)
+    encoded = time.perf_counter()
+    first, _ = overlapping_pairs(starts, ends)
+    swept = time.perf_counter()
+    print(f"✅ {count} prefixes: encoded in {encoded - start:.3f}s, "
+          f"{len(first)} overlapping pairs found in {swept - encoded:.3f}s")
+    sys.exit()
+
+if len(sys.argv) != 2:
+    sys.exit(f"Usage: {sys.argv[0]} <snapshot.json | snapshot.cols> | --synthetic <count>")
+
+source = sys.argv[1].rstrip("/")
+topology = load_snapshot(source)
+
+# A multi-account crawl is checked as one estate
+topology = merge_accounts(topology)
+
+conflicts = find_conflicts(topology)
+output_file = snapshot_basename(source) + ".conflicts.json"
+with open(output_file, "w") as f:
+    json.dump(conflicts, f, indent=2)
+
+print(f"✅ {len(conflicts['OverlappingVpcs'])} overlapping VPC pairs, "
+      f"{len(conflicts['ShadowedTgwRoutes'])} shadowed TGW routes saved to: {output_file}")
@@ -0,0 +1,74 @@
+import json
+import time
+import tracemalloc
+from datetime import datetime
+
+from network_topology.collect import collect_topology
+from network_topology.fetch import client_config
+from network_topology.instrument import ApiRecorder
+from network_topology.standin import StandIn, standin_clients, synthetic_estate
+
+# Times collect_topology against a local stand-in for EC2 and Direct Connect,
+# so collector changes can be measured without AWS credentials:
+#   python collector_benchmark.py
+
+# ==== CONFIGURE ====
+# Estate sizes to run; keys are synthetic_estate arguments
+ESTATES = {
+    "small": dict(tgws=2, route_tables=2, routes=50, vpcs=50, subnets=4, vpns=10, dx_gateways=2, vifs=4),
+    "medium": dict(tgws=5, route_tables=4, routes=200, vpcs=500, subnets=6, vpns=50, dx_gateways=5, vifs=10),
+    "large": dict(tgws=20, route_tables=10, routes=500, vpcs=3000, subnets=8, vpns=200, dx_gateways=20, vifs=20),
+}
+LATENCY = 0.02  # seconds added to every request
+JITTER = 0.01  # up to this many extra seconds per request
+THROTTLE_RATE = 0.01  # share of requests answered with a throttling error
+MAX_WORKERS = 16  # concurrent TGW route table calls
+MEASURE_MEMORY = True  # a second, tracemalloc-traced run per estate for peak memory
+
+
+def run(estate, trace_memory):
+    standin = StandIn(estate, LATENCY, JITTER, THROTTLE_RATE)
+    ec2, dx = standin_clients(standin, config=client_config(MAX_WORKERS))
+    recorder = ApiRecorder()
+    recorder.attach(ec2)
+    recorder.attach(dx)
+
+    if trace_memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    topology = collect_topology(ec2, dx, MAX_WORKERS)
+    seconds = time.perf_counter() - started
+    peak = None
+    if trace_memory:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    return {
+        "Entities": sum(len(entities) for entities in topology.values()),
+        "Seconds": round(seconds, 3),
+        "Calls": len(recorder.records),
+        "Requests": standin.requests,
+        "Throttled": standin.throttled,
+        "PeakMB": round(peak / 2 ** 20, 1) if peak is not None else None,
+    }
+
+
+results = {}
+for name, size in ESTATES.items():
+    estate = synthetic_estate(**size)
+    results[name] = run(estate, trace_memory=False)
+    if MEASURE_MEMORY:
+        results[name]["PeakMB"] = run(estate, trace_memory=True)["PeakMB"]
+    r = results[name]
+    print(f"{name:>8}: {r['Entities']} entities in {r['Seconds']}s, {r['Calls']} API calls "
+          f"({r['Requests']} requests, {r['Throttled']} throttled), peak {r['PeakMB']} MB")
+
+output_file = f"collector_benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+with open(output_file, "w") as f:
+    json.dump({
+        "Config": {"Latency": LATENCY, "Jitter": JITTER, "ThrottleRate": THROTTLE_RATE, "MaxWorkers": MAX_WORKERS},
+        "Estates": ESTATES,
+        "Results": results,
+    }, f, indent=2)
+
+print(f"\n✅ Benchmark results saved to: {output_file}")
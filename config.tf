@@ -8,19 +8,43 @@ resource "aws_s3_object" "config_file" {
   source = "config.json"
 }
 
+# lambda.py, deployed as lambda_function.py, and the copy engine it imports
+data "archive_file" "s3_copy" {
+  type        = "zip"
+  output_path = "${path.module}/build/s3-subfolder-copy-lambda.zip"
+
+  source {
+    content  = file("${path.module}/lambda.py")
+    filename = "lambda_function.py"
+  }
+
+  source {
+    content  = file("${path.module}/s3_copy.py")
+    filename = "s3_copy.py"
+  }
+}
+
 resource "aws_lambda_function" "s3_copy" {
   function_name = "s3-subfolder-copy-lambda"
   role          = aws_iam_role.lambda_role.arn
   handler       = "lambda_function.lambda_handler"
   runtime       = "python3.9"
+  timeout       = local.copy_lambda_timeout
+  # Copies run server-side, but up to RECORD_CONCURRENCY x COPY_CONCURRENCY
+  # (64) requests are in flight; Lambda scales CPU and network with memory
+  memory_size = 512
 
-  filename         = var.lambda_zip_path
-  source_code_hash = filebase64sha256(var.lambda_zip_path)
+  filename         = data.archive_file.s3_copy.output_path
+  source_code_hash = data.archive_file.s3_copy.output_base64sha256
 
   environment {
     variables = {
       CONFIG_BUCKET = aws_s3_bucket.config.bucket
       CONFIG_KEY    = aws_s3_object.config_file.key
+      # Config edits reach warm Lambdas within this many seconds
+      CONFIG_TTL_SECONDS = "60"
+      # Queued mode only: lets an invocation pull more of a backlog than its batch
+      QUEUE_URL = local.queued ? aws_sqs_queue.copy_events[0].id : ""
     }
   }
 }
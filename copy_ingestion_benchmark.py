@@ -0,0 +1,174 @@
+import contextlib
+import importlib
+import io
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+# Compares the copy Lambda's direct S3 ingestion with queued SQS ingestion
+# on a burst of object events. S3, SQS and Lambda are replaced by in-process
+# stand-ins, so it runs without AWS:
+#   python copy_ingestion_benchmark.py
+
+# lambda.py and s3_copy.py read these at import; the clients are swapped out below
+os.environ.setdefault("CONFIG_BUCKET", "benchmark")
+os.environ.setdefault("CONFIG_KEY", "config.json")
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+os.environ.setdefault("QUEUE_URL", "https://sqs.us-east-1.amazonaws.com/123456789012/s3-subfolder-copy-events")
+handler = importlib.import_module("lambda")
+s3_copy = importlib.import_module("s3_copy")
+
+# ==== CONFIGURE ====
+EVENTS = 10_000  # object events in the burst
+DUPLICATE_RATE = 0.3  # share of events that rewrite a key written shortly before
+DUPLICATE_WINDOW = 50  # how many events back a rewritten key was first written
+COPY_LATENCY = 0.02  # seconds per CopyObject
+INVOKE_OVERHEAD = 0.01  # seconds Lambda adds to every invocation
+CONCURRENCY = 20  # Lambdas running at once, in either mode
+BATCH_SIZE = 100  # messages the event source mapping delivers per invocation
+FUNCTION_TIMEOUT = 300  # seconds, as in sqs_ingestion.tf
+
+CONFIG = {
+    "source_bucket": "my-source-bucket",
+    "dest_bucket": "my-dest-bucket",
+    "mappings": [{"source_prefix": "incoming/data/", "dest_prefix": "processed/data/"}],
+}
+
+
+class FakeS3:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.copies = 0
+        self.written = set()
+
+    def get_object(self, Bucket, Key, **kwargs):
+        return {"Body": io.BytesIO(json.dumps(CONFIG).encode()), "ETag": '"config"'}
+
+    def copy_object(self, CopySource, Bucket, Key):
+        time.sleep(COPY_LATENCY)
+        with self.lock:
+            self.copies += 1
+            self.written.add(Key)
+        return {}
+
+
+class FakeSQS:
+    # One queue; received messages are in flight until deleted
+    def __init__(self, messages):
+        self.lock = threading.Lock()
+        self.queue = deque(messages)
+        self.in_flight = {}
+
+    def receive_message(self, QueueUrl, MaxNumberOfMessages=1, WaitTimeSeconds=0):
+        with self.lock:
+            messages = [self.queue.popleft() for _ in range(min(MaxNumberOfMessages, len(self.queue)))]
+            self.in_flight.update((m["ReceiptHandle"], m) for m in messages)
+        return {"Messages": messages} if messages else {}
+
+    def delete_message_batch(self, QueueUrl, Entries):
+        with self.lock:
+            for entry in Entries:
+                self.in_flight.pop(entry["ReceiptHandle"], None)
+        return {"Successful": [{"Id": entry["Id"]} for entry in Entries]}
+
+    def get_queue_attributes(self, QueueUrl, AttributeNames):
+        with self.lock:
+            return {"Attributes": {"ApproximateNumberOfMessages": str(len(self.queue))}}
+
+
+class Context:
+    def __init__(self):
+        self.deadline = time.monotonic() + FUNCTION_TIMEOUT
+
+    def get_remaining_time_in_millis(self):
+        return int((self.deadline - time.monotonic()) * 1000)
+
+
+def burst(rng):
+    keys = []
+    for i in range(EVENTS):
+        if keys and rng.random() < DUPLICATE_RATE:
+            keys.append(rng.choice(keys[-DUPLICATE_WINDOW:]))
+        else:
+            keys.append(f"incoming/data/{i:06d}.parquet")
+    return [
+        {
+            "eventSource": "aws:s3",
+            "s3": {
+                "bucket": {"name": CONFIG["source_bucket"]},
+                "object": {"key": key, "size": 1024, "sequencer": f"{i + 1:016X}"},
+            },
+        }
+        for i, key in enumerate(keys)
+    ]
+
+
+def invoke(event):
+    time.sleep(INVOKE_OVERHEAD)
+    return handler.lambda_handler(event, Context())
+
+
+def run_direct(records):
+    # S3 invokes the function once per event
+    with ThreadPoolExecutor(max_workers=CONCURRENCY) as pool:
+        list(pool.map(lambda record: invoke({"Records": [record]}), records))
+
+
+def run_queued(records):
+    # Each poller stands in for one concurrent Lambda fed by the event source mapping
+    sqs = s3_copy.sqs_client = FakeSQS([
+        {"MessageId": str(i), "ReceiptHandle": f"rh-{i}", "Body": json.dumps({"Records": [record]})}
+        for i, record in enumerate(records)
+    ])
+
+    def poll():
+        while True:
+            messages = sqs.receive_message(s3_copy.QUEUE_URL, BATCH_SIZE).get("Messages", [])
+            if not messages:
+                return
+            event = {"Records": [
+                {"messageId": m["MessageId"], "receiptHandle": m["ReceiptHandle"], "body": m["Body"],
+                 "eventSource": "aws:sqs"}
+                for m in messages
+            ]}
+            failed = {f["itemIdentifier"] for f in invoke(event)["batchItemFailures"]}
+            sqs.delete_message_batch(s3_copy.QUEUE_URL, [
+                {"Id": m["MessageId"], "ReceiptHandle": m["ReceiptHandle"]}
+                for m in messages if m["MessageId"] not in failed
+            ])
+
+    with ThreadPoolExecutor(max_workers=CONCURRENCY) as pool:
+        for future in [pool.submit(poll) for _ in range(CONCURRENCY)]:
+            future.result()
+    assert not sqs.queue and not sqs.in_flight
+
+
+def measure(run, records):
+    s3 = s3_copy.s3_client = FakeS3()
+    handler._config_cache.update(config=None, trie=None, etag=None, checked_at=0.0)
+    started = time.perf_counter()
+    # The handler logs every copy
+    with contextlib.redirect_stdout(io.StringIO()):
+        run(records)
+    seconds = time.perf_counter() - started
+    return seconds, s3
+
+
+records = burst(random.Random(0))
+unique = {record["s3"]["object"]["key"] for record in records}
+print(f"{EVENTS} events, {len(unique)} unique keys, {CONCURRENCY} concurrent Lambdas, "
+      f"{COPY_LATENCY * 1000:.0f} ms per copy, {INVOKE_OVERHEAD * 1000:.0f} ms per invocation")
+
+results = {}
+for mode, run in (("direct", run_direct), ("queued", run_queued)):
+    seconds, s3 = measure(run, records)
+    # Both modes must leave every key copied to its destination
+    assert len(s3.written) == len(unique), mode
+    results[mode] = seconds
+    print(f"{mode:>7}: {seconds:6.2f}s, {EVENTS / seconds:7.0f} events/s, {s3.copies} copies")
+
+print(f"queued is {results['direct'] / results['queued']:.1f}x faster")
@@ -1,4 +1,5 @@
 resource "aws_lambda_permission" "allow_s3" {
+  count         = local.queued ? 0 : 1
   statement_id  = "AllowExecutionFromS3"
   action        = "lambda:InvokeFunction"
   function_name = aws_lambda_function.s3_copy.function_name
@@ -6,13 +7,25 @@ resource "aws_lambda_permission" "allow_s3" {
   source_arn    = "arn:aws:s3:::${local.config.source_bucket}"
 }
 
+# Direct mode invokes the Lambda per event; queued mode sends events to SQS (sqs_ingestion.tf)
 resource "aws_s3_bucket_notification" "source_notification" {
   bucket = local.config.source_bucket
 
-  lambda_function {
-    lambda_function_arn = aws_lambda_function.s3_copy.arn
-    events              = ["s3:ObjectCreated:*"]
+  dynamic "lambda_function" {
+    for_each = local.queued ? [] : [1]
+    content {
+      lambda_function_arn = aws_lambda_function.s3_copy.arn
+      events              = ["s3:ObjectCreated:*"]
+    }
   }
 
-  depends_on = [aws_lambda_permission.allow_s3]
+  dynamic "queue" {
+    for_each = local.queued ? [1] : []
+    content {
+      queue_arn = aws_sqs_queue.copy_events[0].arn
+      events    = ["s3:ObjectCreated:*"]
+    }
+  }
+
+  depends_on = [aws_lambda_permission.allow_s3, aws_sqs_queue_policy.copy_events]
 }
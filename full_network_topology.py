@@ -1,212 +1,75 @@
-import boto3
 import json
 from datetime import datetime
 
+from network_topology.collect import iter_topology
+from network_topology.fetch import client_config
+from network_topology.instrument import record_api_calls
+from network_topology.session import get_client
+from network_topology.snapshot import diff_fingerprints, fingerprint_stream, latest_snapshot_path, scan_snapshot
+from network_topology.writer import COMPRESSION_SUFFIX, write_topology
+
 # ==== CONFIGURE ====
 ROLE_ARN = "arn:aws:iam::123456789012:role/CrossAccountTGWReadRole"  # replace
 SESSION_NAME = "FullNetworkTopologySession"
-
-# ===== Assume Role =====
-sts_client = boto3.client("sts")
+MAX_WORKERS = 16  # concurrent TGW route table calls
+INCREMENTAL = True  # reuse unchanged TGW route tables from the last snapshot
+MAX_SNAPSHOT_AGE = 6 * 3600  # seconds; TGW route tables not searched for this long are searched again
+COMPACT_OUTPUT = False  # True writes JSON without indentation
+COMPRESSION = None  # None, "gzip" or "zstd"
+API_SUMMARY = True  # print per-operation and per-phase API call stats
+API_TRACE = False  # also write a Chrome trace (chrome://tracing) of every call
+# Only collect around these TGWs / VPCs / tags, e.g.
+# {"TransitGatewayIds": ["tgw-0123456789abcdef0"], "VpcIds": [], "Tags": {"env": ["prod"]}}
+SCOPE = None
+
+# ===== Clients =====
+recorder = record_api_calls() if API_SUMMARY or API_TRACE else None
+# Assumed-role credentials are cached and refreshed before they expire
 print(f"Assuming role: {ROLE_ARN}")
-assumed_role = sts_client.assume_role(
-    RoleArn=ROLE_ARN,
-    RoleSessionName=SESSION_NAME
-)
-creds = assumed_role["Credentials"]
-
-# Clients
-ec2 = boto3.client(
-    "ec2",
-    aws_access_key_id=creds["AccessKeyId"],
-    aws_secret_access_key=creds["SecretAccessKey"],
-    aws_session_token=creds["SessionToken"]
-)
-dx = boto3.client(
-    "directconnect",
-    aws_access_key_id=creds["AccessKeyId"],
-    aws_secret_access_key=creds["SecretAccessKey"],
-    aws_session_token=creds["SessionToken"]
-)
-
-# ===== Get Base Data =====
-tgws = ec2.describe_transit_gateways()["TransitGateways"]
-attachments_all = ec2.describe_transit_gateway_attachments()["TransitGatewayAttachments"]
-tgw_route_tables_all = ec2.describe_transit_gateway_route_tables()["TransitGatewayRouteTables"]
-
-vpcs_all = ec2.describe_vpcs()["Vpcs"]
-subnets_all = ec2.describe_subnets()["Subnets"]
-rtbs_all = ec2.describe_route_tables()["RouteTables"]
-
-vpn_connections_all = ec2.describe_vpn_connections()["VpnConnections"]
-customer_gateways_all = ec2.describe_customer_gateways()["CustomerGateways"]
-
-# VPC Peering
-vpc_peerings_all = ec2.describe_vpc_peering_connections()["VpcPeeringConnections"]
-
-# Direct Connect Gateways & Virtual Interfaces
-dx_gateways_all = dx.describe_direct_connect_gateways()["directConnectGateways"]
-dx_virtual_interfaces_all = dx.describe_virtual_interfaces()["virtualInterfaces"]
-
-# ===== Build Topology =====
-topology = {
-    "TransitGateways": [],
-    "VPCs": [],
-    "DirectConnectGateways": []
-}
-
-# --- Map Customer Gateways for lookup ---
-cg_map = {cg["CustomerGatewayId"]: cg for cg in customer_gateways_all}
-
-# --- Process TGWs ---
-for tgw in tgws:
-    tgw_id = tgw["TransitGatewayId"]
-
-    # Attachments for this TGW
-    tgw_attachments = [att for att in attachments_all if att["TransitGatewayId"] == tgw_id]
-
-    # Route tables for this TGW
-    tgw_rts = []
-    for rtb in [r for r in tgw_route_tables_all if r["TransitGatewayId"] == tgw_id]:
-        rtb_id = rtb["TransitGatewayRouteTableId"]
-
-        routes = ec2.search_transit_gateway_routes(
-            TransitGatewayRouteTableId=rtb_id,
-            Filters=[{"Name": "state", "Values": ["active"]}]
-        )["Routes"]
-
-        associations = ec2.get_transit_gateway_route_table_associations(
-            TransitGatewayRouteTableId=rtb_id
-        )["Associations"]
-
-        propagations = ec2.get_transit_gateway_route_table_propagations(
-            TransitGatewayRouteTableId=rtb_id
-        )["TransitGatewayRouteTablePropagations"]
-
-        rtb["Routes"] = routes
-        rtb["Associations"] = associations
-        rtb["Propagations"] = propagations
-        tgw_rts.append(rtb)
-
-    # VPNs terminating on this TGW
-    tgw_vpns = []
-    for vpn in vpn_connections_all:
-        if vpn.get("TransitGatewayId") == tgw_id:
-            cg = cg_map.get(vpn["CustomerGatewayId"], {})
-            tgw_vpns.append({
-                "VpnConnectionId": vpn["VpnConnectionId"],
-                "State": vpn["State"],
-                "Type": vpn["Type"],
-                "CustomerGateway": {
-                    "Id": cg.get("CustomerGatewayId"),
-                    "IpAddress": cg.get("IpAddress"),
-                    "BgpAsn": cg.get("BgpAsn"),
-                    "Type": cg.get("Type")
-                },
-                "Routes": vpn.get("Routes", []),
-                "Tunnels": vpn.get("VgwTelemetry", []),
-                "Tags": vpn.get("Tags", [])
-            })
-
-    topology["TransitGateways"].append({
-        "TransitGatewayId": tgw_id,
-        "Description": tgw.get("Description", ""),
-        "State": tgw["State"],
-        "OwnerId": tgw["OwnerId"],
-        "CreationTime": tgw["CreationTime"].isoformat(),
-        "Attachments": tgw_attachments,
-        "RouteTables": tgw_rts,
-        "VPNConnections": tgw_vpns
-    })
-
-# --- Process VPCs ---
-for vpc in vpcs_all:
-    vpc_id = vpc["VpcId"]
-
-    vpc_subnets = [
-        {
-            "SubnetId": sn["SubnetId"],
-            "CidrBlock": sn["CidrBlock"],
-            "AvailabilityZone": sn["AvailabilityZone"],
-            "State": sn["State"],
-            "Tags": sn.get("Tags", [])
-        }
-        for sn in subnets_all if sn["VpcId"] == vpc_id
-    ]
-
-    vpc_rts = [
-        {
-            "RouteTableId": rt["RouteTableId"],
-            "Routes": rt.get("Routes", []),
-            "Associations": rt.get("Associations", []),
-            "Tags": rt.get("Tags", [])
-        }
-        for rt in rtbs_all if rt["VpcId"] == vpc_id
-    ]
-
-    # VPC Peering links for this VPC
-    vpc_peerings = [
-        p for p in vpc_peerings_all
-        if p["RequesterVpcInfo"].get("VpcId") == vpc_id
-        or p["AccepterVpcInfo"].get("VpcId") == vpc_id
-    ]
-
-    # VPNs terminating on VGW attached to this VPC
-    vpc_vpns = []
-    for vpn in vpn_connections_all:
-        if vpn.get("VpnGatewayId"):
-            vgw_id = vpn["VpnGatewayId"]
-            vgws = ec2.describe_vpn_gateways(VpnGatewayIds=[vgw_id])["VpnGateways"]
-            for vgw in vgws:
-                for att in vgw.get("VpcAttachments", []):
-                    if att["VpcId"] == vpc_id:
-                        cg = cg_map.get(vpn["CustomerGatewayId"], {})
-                        vpc_vpns.append({
-                            "VpnConnectionId": vpn["VpnConnectionId"],
-                            "State": vpn["State"],
-                            "Type": vpn["Type"],
-                            "CustomerGateway": {
-                                "Id": cg.get("CustomerGatewayId"),
-                                "IpAddress": cg.get("IpAddress"),
-                                "BgpAsn": cg.get("BgpAsn"),
-                                "Type": cg.get("Type")
-                            },
-                            "Routes": vpn.get("Routes", []),
-                            "Tunnels": vpn.get("VgwTelemetry", []),
-                            "Tags": vpn.get("Tags", [])
-                        })
-
-    topology["VPCs"].append({
-        "VpcId": vpc_id,
-        "CidrBlock": vpc["CidrBlock"],
-        "State": vpc["State"],
-        "IsDefault": vpc["IsDefault"],
-        "Tags": vpc.get("Tags", []),
-        "Subnets": vpc_subnets,
-        "RouteTables": vpc_rts,
-        "PeeringConnections": vpc_peerings,
-        "VPNConnections": vpc_vpns
-    })
-
-# --- Process Direct Connect Gateways ---
-for dxgw in dx_gateways_all:
-    dxgw_id = dxgw["directConnectGatewayId"]
-    dxgw_vifs = [
-        vif for vif in dx_virtual_interfaces_all
-        if vif.get("directConnectGatewayId") == dxgw_id
-    ]
-    topology["DirectConnectGateways"].append({
-        "DirectConnectGatewayId": dxgw_id,
-        "Name": dxgw.get("directConnectGatewayName"),
-        "OwnerAccount": dxgw.get("ownerAccount"),
-        "State": dxgw.get("state"),
-        "AmazonSideAsn": dxgw.get("amazonSideAsn"),
-        "VirtualInterfaces": dxgw_vifs
-    })
-
-# ===== Save Output =====
-output_file = f"network_topology_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-with open(output_file, "w") as f:
-    json.dump(topology, f, indent=2, default=str)
-
-print(f"\n✅ Full network topology (TGW + VPC + VPN + Peering + DX) saved to: {output_file}")
+ec2 = get_client("ec2", ROLE_ARN, SESSION_NAME, config=client_config(MAX_WORKERS))
+dx = get_client("directconnect", ROLE_ARN, SESSION_NAME)
+
+# ===== Previous Snapshot =====
+# Read one entity at a time, keeping only what route reuse and the diff
+# need, so the previous snapshot is never held whole
+previous_file, previous, previous_fingerprints = None, None, None
+if INCREMENTAL:
+    previous_file = latest_snapshot_path()
+    if previous_file:
+        previous, previous_fingerprints = scan_snapshot(previous_file)
+    if previous:
+        print(f"Incremental refresh against: {previous_file}")
+
+# ===== Collect & Save Output =====
+# Each TGW / VPC / DXGW is written as soon as it is assembled, then freed
+# Scoped snapshots get their own prefix so they are never diffed against or
+# mistaken for a full snapshot
+timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+prefix = "scoped_network_topology" if SCOPE else "network_topology"
+output_file = f"{prefix}_{timestamp}.json{COMPRESSION_SUFFIX[COMPRESSION]}"
+
+entities = iter_topology(ec2, dx, MAX_WORKERS, previous, SCOPE, MAX_SNAPSHOT_AGE)
+del previous
+new_fingerprints = {}
+if previous_fingerprints is not None and not SCOPE:
+    entities = fingerprint_stream(entities, new_fingerprints)
+write_topology(output_file, entities, compact=COMPACT_OUTPUT, compression=COMPRESSION)
+
+print(f"\n✅ {'Scoped' if SCOPE else 'Full'} network topology (TGW + VPC + VPN + Peering + DX) saved to: {output_file}")
+
+# ===== Diff Against Previous Snapshot =====
+if previous_fingerprints is not None and not SCOPE:
+    diff_file = f"network_topology_{timestamp}.diff.json"
+    with open(diff_file, "w") as f:
+        json.dump(diff_fingerprints(previous_fingerprints, new_fingerprints), f, indent=2)
+    print(f"✅ Changes since {previous_file} saved to: {diff_file}")
+
+# ===== API Call Summary =====
+if recorder:
+    recorder.stop()
+if API_SUMMARY:
+    print(f"\n{recorder.summary_table('Phase')}\n\n{recorder.summary_table()}")
+if API_TRACE:
+    trace_file = f"{prefix}_{timestamp}.trace.json"
+    recorder.write_trace(trace_file)
+    print(f"✅ API call trace saved to: {trace_file}")
@@ -28,7 +28,7 @@ resource "aws_iam_policy" "dest_rw" {
     Statement = [
       {
         Effect   = "Allow"
-        Action   = ["s3:PutObject", "s3:GetObject", "s3:ListBucket", "s3:PutObjectAcl"]
+        Action   = ["s3:PutObject", "s3:GetObject", "s3:ListBucket", "s3:PutObjectAcl", "s3:AbortMultipartUpload"]
         Resource = [
           "arn:aws:s3:::${local.config.dest_bucket}",
           "arn:aws:s3:::${local.config.dest_bucket}/*"
@@ -0,0 +1,70 @@
+import copy
+import time
+
+from network_topology import collect
+from network_topology.standin import StandIn, standin_clients, synthetic_estate
+
+# Times topology assembly (join stage plus per-entity build) on synthetic
+# estates of growing size, next to the per-VPC list scans it replaced:
+#   python join_benchmark.py
+# Nothing is fetched: the base collections come straight from the estate,
+# and the one TGW route table's details from the stand-in.
+
+# ==== CONFIGURE ====
+VPC_COUNTS = [250, 500, 1000, 2000, 4000]
+SUBNETS_PER_VPC = 12  # 4000 VPCs -> 48k subnets
+SCAN_LIMIT = 2000  # the scans are quadratic; larger estates are skipped
+ROUNDS = 3  # best of
+
+
+def base_collections(estate):
+    ec2, dx = estate["ec2"], estate["directconnect"]
+    return {
+        "TransitGateways": ec2["DescribeTransitGateways"],
+        "TransitGatewayAttachments": ec2["DescribeTransitGatewayAttachments"],
+        "TransitGatewayRouteTables": ec2["DescribeTransitGatewayRouteTables"],
+        "Vpcs": ec2["DescribeVpcs"],
+        "Subnets": ec2["DescribeSubnets"],
+        "RouteTables": ec2["DescribeRouteTables"],
+        "VpnConnections": ec2["DescribeVpnConnections"],
+        "CustomerGateways": ec2["DescribeCustomerGateways"],
+        "VpnGateways": ec2["DescribeVpnGateways"],
+        "VpcPeeringConnections": ec2["DescribeVpcPeeringConnections"],
+        "DirectConnectGateways": dx["DescribeDirectConnectGateways"],
+        "VirtualInterfaces": dx["DescribeVirtualInterfaces"],
+    }
+
+
+def indexed(base, ec2, dx):
+    # iter_topology mutates what it is given, so every round gets a fresh copy
+    collect._fetch_all = lambda *clients: copy.deepcopy(base)
+    started = time.perf_counter()
+    entities = sum(1 for _ in collect.iter_topology(ec2, dx))
+    return time.perf_counter() - started, entities
+
+
+def scans(base):
+    # The per-VPC joins the scripts used to do before the join stage
+    started = time.perf_counter()
+    for vpc in base["Vpcs"]:
+        vpc_id = vpc["VpcId"]
+        [sn for sn in base["Subnets"] if sn["VpcId"] == vpc_id]
+        [rt for rt in base["RouteTables"] if rt["VpcId"] == vpc_id]
+        [p for p in base["VpcPeeringConnections"]
+         if p["RequesterVpcInfo"].get("VpcId") == vpc_id or p["AccepterVpcInfo"].get("VpcId") == vpc_id]
+    for tgw in base["TransitGateways"]:
+        [att for att in base["TransitGatewayAttachments"] if att["TransitGatewayId"] == tgw["TransitGatewayId"]]
+    return time.perf_counter() - started
+
+
+print(f"{'VPCs':>6} {'subnets':>8} {'indexed s':>10} {'µs/VPC':>8} {'scans s':>9} {'µs/VPC':>8}")
+for vpcs in VPC_COUNTS:
+    estate = synthetic_estate(tgws=1, route_tables=1, routes=10, vpcs=vpcs, subnets=SUBNETS_PER_VPC,
+                              vpns=vpcs // 10, dx_gateways=2, vifs=4, peerings=vpcs // 2)
+    ec2, dx = standin_clients(StandIn(estate))
+    base = base_collections(estate)
+
+    seconds = min(indexed(base, ec2, dx)[0] for _ in range(ROUNDS))
+    scan = min(scans(base) for _ in range(ROUNDS)) if vpcs <= SCAN_LIMIT else None
+    scan_text = f"{scan:9.3f} {scan / vpcs * 1e6:8.0f}" if scan is not None else f"{'-':>9} {'-':>8}"
+    print(f"{vpcs:>6} {len(base['Subnets']):>8} {seconds:10.3f} {seconds / vpcs * 1e6:8.0f} {scan_text}")
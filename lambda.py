@@ -1,49 +1,119 @@
-import boto3
 import os
 import json
+import time
+from functools import partial
+from botocore.exceptions import ClientError
 
-s3_client = boto3.client('s3')
+import s3_copy
 
 CONFIG_BUCKET = os.environ['CONFIG_BUCKET']
 CONFIG_KEY = os.environ['CONFIG_KEY']
+# How long a warm execution environment trusts its cached config before
+# revalidating it, i.e. the longest a config edit takes to apply
+CONFIG_TTL_SECONDS = float(os.environ.get('CONFIG_TTL_SECONDS', '60'))
+# "first": the first mapping in config order whose prefix matches (default);
+# "longest": the mapping with the longest matching prefix
+MATCH_MODE = os.environ.get('MATCH_MODE', 'first')
+
+# Lives as long as the execution environment
+_config_cache = {"config": None, "trie": None, "etag": None, "checked_at": 0.0}
+_config_stats = {"hit": 0, "not_modified": 0, "miss": 0, "stale": 0}
+
+def compile_mappings(mappings):
+    """Build a character trie over the mappings' source prefixes.
+
+    Each node maps the next character to a child node; a node that ends a
+    prefix also holds (rule index, rule) under the None key. A duplicated
+    prefix keeps its first rule, as the linear scan would.
+    """
+    root = {}
+    for index, rule in enumerate(mappings):
+        node = root
+        for ch in rule["source_prefix"]:
+            node = node.setdefault(ch, {})
+        node.setdefault(None, (index, rule))
+    return root
+
+def match_rule(trie, key, longest=False):
+    """Return the mapping for key, or None, in O(len(key)).
+
+    Every rule whose prefix matches lies on the path spelled by key, so one
+    walk finds both the first in config order and the longest.
+    """
+    best = trie.get(None)
+    node = trie
+    for ch in key:
+        node = node.get(ch)
+        if node is None:
+            break
+        found = node.get(None)
+        if found is not None and (best is None or longest or found[0] < best[0]):
+            best = found
+    return best[1] if best is not None else None
 
 def load_config():
-    obj = s3_client.get_object(Bucket=CONFIG_BUCKET, Key=CONFIG_KEY)
-    return json.loads(obj['Body'].read())
+    """Return the mapping config and how it was obtained (hit, not_modified, miss or stale).
 
-def lambda_handler(event, context):
-    config = load_config()
+    Within CONFIG_TTL_SECONDS of the last check the cached config is used
+    as is. After that it is revalidated with a conditional GET on its ETag,
+    so an unchanged config costs a 304 and no download or parse.
+    """
+    cached = _config_cache["config"]
+    now = time.monotonic()
+    if cached is not None and now - _config_cache["checked_at"] < CONFIG_TTL_SECONDS:
+        return cached, "hit"
+
+    kwargs = {"IfNoneMatch": _config_cache["etag"]} if cached is not None else {}
+    try:
+        obj = s3_copy.s3_client.get_object(Bucket=CONFIG_BUCKET, Key=CONFIG_KEY, **kwargs)
+    except ClientError as e:
+        if cached is not None and e.response["Error"]["Code"] in ("304", "NotModified"):
+            _config_cache["checked_at"] = now
+            return cached, "not_modified"
+        if cached is None:
+            raise
+        # Keep copying with the last good config; the next invocation retries the fetch
+        print(f"⚠️ Config revalidation failed ({e}), using cached config.")
+        return cached, "stale"
+
+    config = json.loads(obj['Body'].read())
+    # The trie is rebuilt only when the config actually changes
+    _config_cache.update(config=config, trie=compile_mappings(config["mappings"]), etag=obj["ETag"], checked_at=now)
+    return _config_cache["config"], "miss"
+
+def copy_record(record, config, trie, longest):
     source_bucket = config["source_bucket"]
     dest_bucket   = config["dest_bucket"]
-    mappings      = config["mappings"]
-
-    for record in event["Records"]:
-        event_bucket = record["s3"]["bucket"]["name"]
-        source_key   = record["s3"]["object"]["key"]
-
-        if event_bucket != source_bucket:
-            print(f"⚠️ Event bucket {event_bucket} does not match configured source {source_bucket}, skipping.")
-            continue
-
-        matched = False
-        for rule in mappings:
-            src_prefix  = rule["source_prefix"]
-            dest_prefix = rule["dest_prefix"]
-
-            if source_key.startswith(src_prefix):
-                relative_path = source_key[len(src_prefix):]
-                dest_key = f"{dest_prefix}{relative_path}"
-
-                copy_source = {"Bucket": source_bucket, "Key": source_key}
-                s3_client.copy_object(
-                    CopySource=copy_source,
-                    Bucket=dest_bucket,
-                    Key=dest_key
-                )
-
-                print(f"✅ Copied {source_key} → {dest_bucket}/{dest_key}")
-                matched = True
-                break
-
-        if not matched:
-            print(f"⚠️ No matching prefix for {source_key}, skipping.")
+    event_bucket  = record["s3"]["bucket"]["name"]
+    source_key    = record["s3"]["object"]["key"]
+
+    if event_bucket != source_bucket:
+        print(f"⚠️ Event bucket {event_bucket} does not match configured source {source_bucket}, skipping.")
+        return
+
+    rule = match_rule(trie, source_key, longest)
+    if rule is None:
+        print(f"⚠️ No matching prefix for {source_key}, skipping.")
+        return
+
+    src_prefix  = rule["source_prefix"]
+    dest_prefix = rule["dest_prefix"]
+
+    relative_path = source_key[len(src_prefix):]
+    dest_key = f"{dest_prefix}{relative_path}"
+
+    copy_source = {"Bucket": source_bucket, "Key": source_key}
+    size = s3_copy.object_size(record, source_bucket, source_key)
+    parts = s3_copy.copy_object(copy_source, size, dest_bucket, dest_key)
+
+    print(f"✅ Copied {source_key} → {dest_bucket}/{dest_key} ({size} bytes, {parts} part(s))")
+
+def lambda_handler(event, context):
+    config, outcome = load_config()
+    _config_stats[outcome] += 1
+    print(f"⚙️ Config {outcome} (hits={_config_stats['hit']}, not modified={_config_stats['not_modified']}, "
+          f"misses={_config_stats['miss']}, stale={_config_stats['stale']})")
+    # The trie is only read, so every thread can share it
+    copy = partial(copy_record, config=config, trie=_config_cache["trie"], longest=MATCH_MODE == "longest")
+
+    return s3_copy.handle_records(event["Records"], context, copy)
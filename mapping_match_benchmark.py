@@ -0,0 +1,72 @@
+import importlib
+import os
+import random
+import time
+
+# Compares the copy Lambda's prefix-trie matcher with the linear startswith
+# scan it replaced, at several rule counts:
+#   python mapping_match_benchmark.py
+
+# lambda.py reads these at import; nothing is fetched from S3 here
+os.environ.setdefault("CONFIG_BUCKET", "benchmark")
+os.environ.setdefault("CONFIG_KEY", "config.json")
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+handler = importlib.import_module("lambda")
+
+# ==== CONFIGURE ====
+RULE_COUNTS = [10, 1_000, 100_000]
+KEYS = 2_000  # keys matched per rule count
+MISS_RATE = 0.1  # share of keys that match no rule
+
+
+def linear_match(mappings, key):
+    for rule in mappings:
+        if key.startswith(rule["source_prefix"]):
+            return rule
+    return None
+
+
+def synthetic_rules(count, rng):
+    # Nested team/project/dataset prefixes, like a real bucket layout
+    return [
+        {"source_prefix": f"team{i % 97}/project{i // 97 % 211}/dataset{i}/", "dest_prefix": f"archive/{i}/"}
+        for i in rng.sample(range(count * 2), count)
+    ]
+
+
+def synthetic_keys(mappings, count, rng):
+    keys = []
+    for _ in range(count):
+        if rng.random() < MISS_RATE:
+            keys.append(f"unmapped/{rng.randrange(10 ** 6)}/part-0000.parquet")
+        else:
+            keys.append(f"{rng.choice(mappings)['source_prefix']}2024/06/{rng.randrange(10 ** 6)}.parquet")
+    return keys
+
+
+def per_key_us(match, keys):
+    started = time.perf_counter()
+    for key in keys:
+        match(key)
+    return (time.perf_counter() - started) / len(keys) * 1e6
+
+
+rng = random.Random(0)
+for count in RULE_COUNTS:
+    mappings = synthetic_rules(count, rng)
+    keys = synthetic_keys(mappings, KEYS, rng)
+
+    started = time.perf_counter()
+    trie = handler.compile_mappings(mappings)
+    compile_ms = (time.perf_counter() - started) * 1000
+
+    # The trie must agree with the scan it replaces
+    for key in keys[:200]:
+        assert handler.match_rule(trie, key) is linear_match(mappings, key), key
+
+    # The scan is slow enough at 100k rules that a sample of keys is plenty
+    linear = per_key_us(lambda key: linear_match(mappings, key), keys[:max(KEYS * 100 // count, 20)])
+    first = per_key_us(lambda key: handler.match_rule(trie, key), keys)
+    longest = per_key_us(lambda key: handler.match_rule(trie, key, longest=True), keys)
+    print(f"{count:>7} rules: linear {linear:9.1f} µs/key, trie {first:5.1f} µs/key "
+          f"(longest {longest:5.1f}), speedup {linear / first:6.1f}x, compiled in {compile_ms:.1f} ms")
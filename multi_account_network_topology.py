@@ -0,0 +1,55 @@
+import json
+from datetime import datetime
+
+from network_topology.crawler import crawl, crawl_global
+from network_topology.instrument import record_api_calls
+
+# ==== CONFIGURE ====
+ROLE_ARNS = [
+    "arn:aws:iam::123456789012:role/CrossAccountTGWReadRole",  # replace / add one per account
+]
+REGIONS = ["us-east-1"]
+SESSION_NAME = "FullNetworkTopologySession"
+MAX_SHARDS = 8    # account x region shards collected at once
+MAX_WORKERS = 16  # concurrent TGW route table calls per shard
+API_SUMMARY = True  # print per-operation and per-phase API call stats
+API_TRACE = False  # also write a Chrome trace (chrome://tracing) of every call
+# Only collect around these TGWs / VPCs / tags in every shard, e.g. {"Tags": {"env": ["prod"]}}
+SCOPE = None
+# Stitch TGW peerings and DX gateway associations into global edges across
+# regions, keeping one copy of each DX gateway
+STITCH_REGIONS = True
+
+# ===== Crawl =====
+recorder = record_api_calls() if API_SUMMARY or API_TRACE else None
+print(f"Crawling {len(ROLE_ARNS)} account(s) x {len(REGIONS)} region(s)")
+crawler = crawl_global if STITCH_REGIONS else crawl
+topology = crawler(ROLE_ARNS, REGIONS, SESSION_NAME, MAX_SHARDS, MAX_WORKERS, SCOPE)
+
+# ===== Save Output =====
+timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+output_file = f"network_topology_multi_{timestamp}.json"
+with open(output_file, "w") as f:
+    json.dump(topology, f, indent=2, default=str)
+
+# ===== Shard Summary =====
+failed = [s for s in topology["Shards"] if s["Status"] != "ok"]
+for s in failed:
+    print(f"❌ {s['AccountId']}/{s['Region']}: {s['Error']}")
+
+if STITCH_REGIONS:
+    cross = sum(1 for e in topology["GlobalEdges"] if e["From"]["Region"] != e["To"]["Region"])
+    print(f"🔗 {len(topology['GlobalEdges'])} global edges ({cross} cross-region), "
+          f"{len(topology['DirectConnectGateways'])} DX gateways")
+
+print(f"\n✅ {len(topology['Shards']) - len(failed)}/{len(topology['Shards'])} shards saved to: {output_file}")
+
+# ===== API Call Summary =====
+if recorder:
+    recorder.stop()
+if API_SUMMARY:
+    print(f"\n{recorder.summary_table('Phase')}\n\n{recorder.summary_table()}")
+if API_TRACE:
+    trace_file = f"network_topology_multi_{timestamp}.trace.json"
+    recorder.write_trace(trace_file)
+    print(f"✅ API call trace saved to: {trace_file}")
@@ -0,0 +1 @@
+# Shared helpers for the network topology scripts in the repo root.
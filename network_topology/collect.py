@@ -0,0 +1,238 @@
+from network_topology.fetch import MAX_WORKERS, client_config, iter_tgw_route_table_details, paginate
+from network_topology.join import build_indexes, index_vpns_by_vpc
+from network_topology.scope import fetch_scoped
+from network_topology.session import get_client
+from network_topology.snapshot import MAX_ROUTE_AGE_SECONDS, reusable_route_tables, search_stamp
+
+
+# Top-level sections of the topology document, in output order
+SECTIONS = ("TransitGateways", "VPCs", "DirectConnectGateways")
+
+
+def collect(role_arn, session_name, region=None, max_workers=MAX_WORKERS, previous=None, scope=None):
+    """Crawl one account/region under role_arn into a topology dict.
+
+    This is the single collection entry point: collect once, then hand the
+    result to as many renderers as needed.
+    """
+    ec2 = get_client("ec2", role_arn, session_name, region, client_config(max_workers))
+    dx = get_client("directconnect", role_arn, session_name, region)
+    return collect_topology(ec2, dx, max_workers, previous, scope)
+
+
+def collect_topology(ec2, dx, max_workers=MAX_WORKERS, previous=None, scope=None):
+    """Describe TGWs, VPCs, VPNs, peerings and DX gateways into one topology dict."""
+    topology = {section: [] for section in SECTIONS}
+    for section, entity in iter_topology(ec2, dx, max_workers, previous, scope):
+        topology[section].append(entity)
+    return topology
+
+
+def _fetch_all(ec2, dx):
+    # Every base collection in the account/region. Attachments, subnets, route
+    # tables and VIFs stay generators so they can be grouped as pages arrive
+    return {
+        "TransitGateways": list(paginate(ec2, "describe_transit_gateways", "TransitGateways")),
+        "TransitGatewayAttachments": paginate(ec2, "describe_transit_gateway_attachments", "TransitGatewayAttachments"),
+        "TransitGatewayRouteTables": list(paginate(
+            ec2, "describe_transit_gateway_route_tables", "TransitGatewayRouteTables")),
+
+        "Vpcs": list(paginate(ec2, "describe_vpcs", "Vpcs")),
+        "Subnets": paginate(ec2, "describe_subnets", "Subnets"),
+        "RouteTables": paginate(ec2, "describe_route_tables", "RouteTables"),
+
+        "VpnConnections": list(paginate(ec2, "describe_vpn_connections", "VpnConnections")),
+        "CustomerGateways": list(paginate(ec2, "describe_customer_gateways", "CustomerGateways")),
+        "VpnGateways": list(paginate(ec2, "describe_vpn_gateways", "VpnGateways")),
+
+        # VPC Peering
+        "VpcPeeringConnections": list(paginate(ec2, "describe_vpc_peering_connections", "VpcPeeringConnections")),
+
+        # Direct Connect Gateways & Virtual Interfaces
+        "DirectConnectGateways": list(paginate(dx, "describe_direct_connect_gateways", "directConnectGateways")),
+        "VirtualInterfaces": paginate(dx, "describe_virtual_interfaces", "virtualInterfaces"),
+    }
+
+
+def iter_topology(ec2, dx, max_workers=MAX_WORKERS, previous=None, scope=None,
+                  max_route_age=MAX_ROUTE_AGE_SECONDS):
+    """Yield (section, entity) pairs for the topology, one entity at a time.
+
+    Entities come out grouped by section in SECTIONS order. Each one is
+    assembled only when requested and its source data is dropped from the
+    join indexes, so a streaming writer can keep memory flat.
+
+    With a scope (see network_topology.scope), only the TGWs, VPCs and DX
+    gateways around the selected ones are fetched.
+
+    previous is the snapshot.previous_state of the last snapshot. TGW route
+    tables whose describe record, TGW attachments, associations,
+    propagations and propagating VPC CIDRs are unchanged keep their Routes
+    from it instead of being searched again, until max_route_age seconds
+    after they were last searched (see snapshot.reusable_route_tables).
+    Every TGW route table records that time as LastSearched.
+    """
+    searched_at = search_stamp()
+
+    # ===== Get Base Data =====
+    base = fetch_scoped(ec2, dx, scope) if scope else _fetch_all(ec2, dx)
+    tgws = base["TransitGateways"]
+    attachments_all = base["TransitGatewayAttachments"]
+    tgw_route_tables_all = base["TransitGatewayRouteTables"]
+    vpcs_all = base["Vpcs"]
+    subnets_all = base["Subnets"]
+    rtbs_all = base["RouteTables"]
+    vpn_connections_all = base["VpnConnections"]
+    customer_gateways_all = base["CustomerGateways"]
+    vpn_gateways_all = base["VpnGateways"]
+    vpc_peerings_all = base["VpcPeeringConnections"]
+    dx_gateways_all = base["DirectConnectGateways"]
+    dx_virtual_interfaces_all = base["VirtualInterfaces"]
+    del base
+
+    # ===== Build Topology =====
+    # --- Map Customer Gateways for lookup ---
+    cg_map = {cg["CustomerGatewayId"]: cg for cg in customer_gateways_all}
+
+    # --- Group every collection by its foreign key (join stage) ---
+    # Attachments, subnets, route tables and VIFs are grouped page by page as they stream in
+    indexes = build_indexes(
+        attachments_all, tgw_route_tables_all, subnets_all, rtbs_all,
+        vpn_connections_all, vpc_peerings_all, dx_virtual_interfaces_all
+    )
+
+    # --- TGW route tables that may keep their previous routes ---
+    reuse = {}
+    if previous:
+        reuse = reusable_route_tables(
+            previous, tgw_route_tables_all, indexes["attachments_by_tgw"], vpcs_all, max_route_age
+        )
+    # From here on the route tables are only reachable through the indexes, and
+    # only the reusable ones' previous routes are kept
+    del tgw_route_tables_all, previous
+
+    # --- Index VGW VPNs by the VPC their gateway is attached to ---
+    vpc_vpn_index = index_vpns_by_vpc(vpn_connections_all, vpn_gateways_all)
+
+    # --- Process TGWs ---
+    # Routes, associations and propagations are fetched a few TGWs ahead of the
+    # one being assembled, so routes are held only until their TGW is written
+    tgw_route_tables = (
+        (tgw, indexes["tgw_route_tables_by_tgw"].pop(tgw["TransitGatewayId"], [])) for tgw in tgws
+    )
+    # Blackhole routes are kept apart so routing analysis can report them
+    tgw_details = iter_tgw_route_table_details(
+        ec2, tgw_route_tables, max_workers, reuse, searched_at, blackholes=True
+    )
+    for tgw, tgw_rts in tgw_details:
+        tgw_id = tgw["TransitGatewayId"]
+
+        # Attachments for this TGW
+        tgw_attachments = indexes["attachments_by_tgw"].pop(tgw_id, [])
+
+        # VPNs terminating on this TGW
+        tgw_vpns = []
+        for vpn in indexes["vpns_by_tgw"].pop(tgw_id, []):
+            cg = cg_map.get(vpn["CustomerGatewayId"], {})
+            tgw_vpns.append({
+                "VpnConnectionId": vpn["VpnConnectionId"],
+                "State": vpn["State"],
+                "Type": vpn["Type"],
+                "CustomerGateway": {
+                    "Id": cg.get("CustomerGatewayId"),
+                    "IpAddress": cg.get("IpAddress"),
+                    "BgpAsn": cg.get("BgpAsn"),
+                    "Type": cg.get("Type")
+                },
+                "Routes": vpn.get("Routes", []),
+                "Tunnels": vpn.get("VgwTelemetry", []),
+                "Tags": vpn.get("Tags", [])
+            })
+
+        yield "TransitGateways", {
+            "TransitGatewayId": tgw_id,
+            "Description": tgw.get("Description", ""),
+            "State": tgw["State"],
+            "OwnerId": tgw["OwnerId"],
+            "CreationTime": tgw["CreationTime"].isoformat(),
+            "Attachments": tgw_attachments,
+            "RouteTables": tgw_rts,
+            "VPNConnections": tgw_vpns
+        }
+
+    # --- Process VPCs ---
+    for vpc in vpcs_all:
+        vpc_id = vpc["VpcId"]
+
+        vpc_subnets = [
+            {
+                "SubnetId": sn["SubnetId"],
+                # IPv6-only subnets have no IPv4 block
+                "CidrBlock": sn.get("CidrBlock"),
+                "Ipv6CidrBlockAssociationSet": sn.get("Ipv6CidrBlockAssociationSet", []),
+                "AvailabilityZone": sn["AvailabilityZone"],
+                "State": sn["State"],
+                "Tags": sn.get("Tags", [])
+            }
+            for sn in indexes["subnets_by_vpc"].pop(vpc_id, [])
+        ]
+
+        vpc_rts = [
+            {
+                "RouteTableId": rt["RouteTableId"],
+                "Routes": rt.get("Routes", []),
+                "Associations": rt.get("Associations", []),
+                "Tags": rt.get("Tags", [])
+            }
+            for rt in indexes["route_tables_by_vpc"].pop(vpc_id, [])
+        ]
+
+        # VPC Peering links for this VPC
+        vpc_peerings = indexes["peerings_by_vpc"].pop(vpc_id, [])
+
+        # VPNs terminating on VGW attached to this VPC
+        vpc_vpns = []
+        for vpn in vpc_vpn_index.pop(vpc_id, []):
+            cg = cg_map.get(vpn["CustomerGatewayId"], {})
+            vpc_vpns.append({
+                "VpnConnectionId": vpn["VpnConnectionId"],
+                "State": vpn["State"],
+                "Type": vpn["Type"],
+                "CustomerGateway": {
+                    "Id": cg.get("CustomerGatewayId"),
+                    "IpAddress": cg.get("IpAddress"),
+                    "BgpAsn": cg.get("BgpAsn"),
+                    "Type": cg.get("Type")
+                },
+                "Routes": vpn.get("Routes", []),
+                "Tunnels": vpn.get("VgwTelemetry", []),
+                "Tags": vpn.get("Tags", [])
+            })
+
+        yield "VPCs", {
+            "VpcId": vpc_id,
+            "CidrBlock": vpc["CidrBlock"],
+            # Primary and secondary CIDRs, with their association state
+            "CidrBlockAssociationSet": vpc.get("CidrBlockAssociationSet", []),
+            "Ipv6CidrBlockAssociationSet": vpc.get("Ipv6CidrBlockAssociationSet", []),
+            "State": vpc["State"],
+            "IsDefault": vpc["IsDefault"],
+            "Tags": vpc.get("Tags", []),
+            "Subnets": vpc_subnets,
+            "RouteTables": vpc_rts,
+            "PeeringConnections": vpc_peerings,
+            "VPNConnections": vpc_vpns
+        }
+
+    # --- Process Direct Connect Gateways ---
+    for dxgw in dx_gateways_all:
+        dxgw_id = dxgw["directConnectGatewayId"]
+        dxgw_vifs = indexes["vifs_by_dxgw"].pop(dxgw_id, [])
+        yield "DirectConnectGateways", {
+            "DirectConnectGatewayId": dxgw_id,
+            "Name": dxgw.get("directConnectGatewayName"),
+            "OwnerAccount": dxgw.get("ownerAccount"),
+            "State": dxgw.get("state"),
+            "AmazonSideAsn": dxgw.get("amazonSideAsn"),
+            "VirtualInterfaces": dxgw_vifs
+        }
@@ -0,0 +1,238 @@
+import json
+import mmap
+import os
+import shutil
+
+import numpy as np
+
+# Record lists stored as columnar tables: table name -> path of the list
+# inside the topology document
+TABLES = {
+    "TgwAttachments": ("TransitGateways", "Attachments"),
+    "TgwRoutes": ("TransitGateways", "RouteTables", "Routes"),
+    "TgwAssociations": ("TransitGateways", "RouteTables", "Associations"),
+    "TgwPropagations": ("TransitGateways", "RouteTables", "Propagations"),
+    "Subnets": ("VPCs", "Subnets"),
+    "VpcRoutes": ("VPCs", "RouteTables", "Routes"),
+    "VpcRouteAssociations": ("VPCs", "RouteTables", "Associations"),
+}
+
+# Value id stored for a key the record does not have
+MISSING = -1
+
+
+def _holders(doc, path):
+    # Every dict along path that holds the list named by the last path element
+    holders = [doc]
+    for key in path:
+        holders = [child for holder in holders for child in holder.get(key, [])]
+    return holders
+
+
+def _skeleton(topology):
+    # Copy only the dicts and lists along the table paths, since those are
+    # the ones write_columnar rewrites; everything else is shared
+    doc = dict(topology)
+    copied = set()
+    for table_path in TABLES.values():
+        for depth in range(1, len(table_path)):
+            prefix = table_path[:depth]
+            if prefix in copied:
+                continue
+            copied.add(prefix)
+            for holder in _holders(doc, prefix[:-1]):
+                if isinstance(holder.get(prefix[-1]), list):
+                    holder[prefix[-1]] = [dict(child) for child in holder[prefix[-1]]]
+    return doc
+
+
+# One shared encoder; json.dumps builds a new one per call when given options
+_dumps = json.JSONEncoder(separators=(",", ":"), default=str).encode
+
+
+class _Interner:
+    # Every distinct value is stored once, as compact JSON text
+    def __init__(self):
+        self.ids = {}
+        self.texts = []
+
+    def intern(self, value):
+        # Scalars are keyed on their type too, since True == 1 == 1.0 as dict keys
+        if isinstance(value, (str, int, float, bool, type(None))):
+            key = (value.__class__, value)
+            text = None
+        else:
+            key = text = _dumps(value)
+        value_id = self.ids.get(key)
+        if value_id is None:
+            value_id = self.ids[key] = len(self.texts)
+            self.texts.append(text if text is not None else _dumps(value))
+        return value_id
+
+
+def write_columnar(topology, path):
+    """Write topology as a directory of memory-mappable column files.
+
+    Each list in TABLES becomes a table: one int32 column per record key
+    holding ids into a shared, interned value table (MISSING where the key
+    is absent), a shape column recording each record's key order and a
+    CSR offsets array mapping each parent to its slice of records. The
+    rest of the document is kept as skeleton.json with a record count in
+    place of each extracted list.
+
+    The directory is written next to path and then renamed into place, so
+    an existing snapshot at path is replaced whole: no column files of an
+    earlier write are left behind.
+    """
+    path = os.path.normpath(path)
+    staging = f"{path}.tmp-{os.getpid()}"
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+    try:
+        _write_columnar(topology, staging)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    if os.path.exists(path):
+        # A directory can't be renamed over a non-empty one
+        old = f"{path}.old-{os.getpid()}"
+        os.rename(path, old)
+        os.rename(staging, path)
+        shutil.rmtree(old)
+    else:
+        os.rename(staging, path)
+
+
+def _write_columnar(topology, path):
+    doc = _skeleton(topology)
+    values = _Interner()
+    manifest = {"tables": {}}
+
+    for name, table_path in TABLES.items():
+        records, offsets = [], [0]
+        for holder in _holders(doc, table_path[:-1]):
+            items = holder.get(table_path[-1])
+            if not isinstance(items, list):
+                continue
+            records.extend(items)
+            offsets.append(len(records))
+            holder[table_path[-1]] = len(items)
+
+        shapes, shape_ids, columns = {}, [], {}
+        for i, record in enumerate(records):
+            shape_ids.append(shapes.setdefault(tuple(record), len(shapes)))
+            for key, value in record.items():
+                column = columns.get(key)
+                if column is None:
+                    column = columns[key] = [MISSING] * len(records)
+                column[i] = values.intern(value)
+
+        np.save(os.path.join(path, f"{name}.__shape__.npy"), np.array(shape_ids, dtype=np.int32))
+        np.save(os.path.join(path, f"{name}.__offsets__.npy"), np.array(offsets, dtype=np.int64))
+        for key, column in columns.items():
+            np.save(os.path.join(path, f"{name}.{key}.npy"), np.array(column, dtype=np.int32))
+        manifest["tables"][name] = {
+            "rows": len(records),
+            "columns": list(columns),
+            "shapes": [list(shape) for shape in shapes],
+        }
+
+    encoded = [text.encode() for text in values.texts]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    with open(os.path.join(path, "values.bin"), "wb") as f:
+        f.write(b"".join(encoded))
+    np.save(os.path.join(path, "values.__offsets__.npy"), offsets)
+
+    with open(os.path.join(path, "skeleton.json"), "w") as f:
+        json.dump(doc, f, separators=(",", ":"), default=str)
+    with open(os.path.join(path, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+
+
+class ColumnarSnapshot:
+    """A columnar snapshot opened with every array memory-mapped.
+
+    Opening costs a few file opens regardless of size. Values are decoded
+    only when asked for, each distinct value at most once per call.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, "manifest.json")) as f:
+            self.manifest = json.load(f)
+        with open(os.path.join(path, "values.bin"), "rb") as f:
+            # mmap can't map an empty file
+            self._blob = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if os.fstat(f.fileno()).st_size else b""
+        self._value_offsets = self._load("values.__offsets__.npy")
+
+    def _load(self, filename):
+        return np.load(os.path.join(self.path, filename), mmap_mode="r")
+
+    @property
+    def tables(self):
+        return list(self.manifest["tables"])
+
+    def rows(self, table):
+        return self.manifest["tables"][table]["rows"]
+
+    def column(self, table, key):
+        # int32 value ids, MISSING where a record has no such key
+        return self._load(f"{table}.{key}.npy")
+
+    def offsets(self, table):
+        # Records of the i-th parent are rows offsets[i]:offsets[i + 1]
+        return self._load(f"{table}.__offsets__.npy")
+
+    def value(self, value_id):
+        start, end = self._value_offsets[value_id], self._value_offsets[value_id + 1]
+        return json.loads(self._blob[start:end])
+
+    def decode(self, table, key):
+        """Python values of one column, with None where the key is missing.
+
+        Equal nested values (lists, dicts) come back as one shared object.
+        """
+        ids = np.asarray(self.column(table, key))
+        unique, inverse = np.unique(ids, return_inverse=True)
+        present = unique[unique != MISSING]
+        starts = self._value_offsets[present].tolist()
+        ends = self._value_offsets[present + 1].tolist()
+        # One json.loads over all the distinct values is far cheaper than one per value
+        blob = self._blob
+        decoded = json.loads(b"[" + b",".join([blob[start:end] for start, end in zip(starts, ends)]) + b"]")
+        if len(present) < len(unique):
+            decoded.insert(0, None)
+        return [decoded[i] for i in inverse.tolist()]
+
+    def records(self, table):
+        """Rebuild the record dicts of a table, keys in their original order."""
+        info = self.manifest["tables"][table]
+        columns = {key: self.decode(table, key) for key in info["columns"]}
+        shapes = info["shapes"]
+        shape_ids = self._load(f"{table}.__shape__.npy").tolist()
+        return [
+            {key: columns[key][i] for key in shapes[shape_id]}
+            for i, shape_id in enumerate(shape_ids)
+        ]
+
+    def to_topology(self):
+        """Rebuild the full JSON topology document."""
+        with open(os.path.join(self.path, "skeleton.json")) as f:
+            doc = json.load(f)
+        for name, table_path in TABLES.items():
+            if name not in self.manifest["tables"]:
+                continue
+            records = self.records(name)
+            position = 0
+            for holder in _holders(doc, table_path[:-1]):
+                count = holder.get(table_path[-1])
+                if not isinstance(count, int):
+                    continue
+                holder[table_path[-1]] = records[position:position + count]
+                position += count
+        return doc
+
+
+def load_columnar(path):
+    return ColumnarSnapshot(path)
@@ -0,0 +1,89 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from network_topology.collect import collect
+from network_topology.fetch import MAX_WORKERS
+from network_topology.session import get_client
+from network_topology.stitch import fetch_dx_associations, fetch_peering_attachments, stitch_regions
+
+# Default number of account x region shards collected at once
+MAX_SHARDS = 8
+
+
+def _run_shard(role_arn, region, session_name, max_workers, scope, peerings=False):
+    shard = {
+        "AccountId": role_arn.split(":")[4],
+        "Region": region,
+        "RoleArn": role_arn
+    }
+    started = time.monotonic()
+    try:
+        topology = collect(role_arn, session_name, region, max_workers, scope=scope)
+        if peerings:
+            ec2 = get_client("ec2", role_arn, session_name, region)
+            topology["TransitGatewayPeeringAttachments"] = fetch_peering_attachments(ec2)
+        shard["Status"] = "ok"
+    except Exception as e:
+        # A failed shard is reported, never allowed to abort the crawl
+        topology = None
+        shard["Status"] = "failed"
+        shard["Error"] = f"{type(e).__name__}: {e}"
+    shard["Seconds"] = round(time.monotonic() - started, 2)
+
+    icon = "✅" if topology is not None else "❌"
+    print(f"{icon} {shard['AccountId']}/{region} ({shard['Seconds']}s)")
+    return shard, topology
+
+
+def crawl(role_arns, regions, session_name, max_shards=MAX_SHARDS, max_workers=MAX_WORKERS, scope=None,
+          peerings=False):
+    """Collect every account x region shard concurrently and merge the results.
+
+    The merged document holds each shard's topology under
+    Accounts[account_id][region], plus a Shards list with the timing and
+    status (and error, if any) of every shard. A scope (see
+    network_topology.scope) is applied to every shard. With peerings, each
+    shard also records its TransitGatewayPeeringAttachments.
+    """
+    merged = {"Accounts": {}, "Shards": []}
+
+    with ThreadPoolExecutor(max_workers=max_shards) as pool:
+        futures = [
+            pool.submit(_run_shard, role_arn, region, session_name, max_workers, scope, peerings)
+            for role_arn in role_arns
+            for region in regions
+        ]
+        for future in futures:
+            shard, topology = future.result()
+            merged["Shards"].append(shard)
+            if topology is not None:
+                merged["Accounts"].setdefault(shard["AccountId"], {})[shard["Region"]] = topology
+
+    return merged
+
+
+def crawl_global(role_arns, regions, session_name, max_shards=MAX_SHARDS, max_workers=MAX_WORKERS, scope=None):
+    """crawl() every account x region in parallel, then stitch one global topology.
+
+    DX gateways are global, so their associations are fetched once per
+    gateway through any region of the owning account that collected
+    cleanly. See stitch_regions for the resulting document.
+    """
+    merged = crawl(role_arns, regions, session_name, max_shards, max_workers, scope, peerings=True)
+
+    dx_associations = {}
+    for role_arn in role_arns:
+        account_id = role_arn.split(":")[4]
+        collected = merged["Accounts"].get(account_id, {})
+        if not collected:
+            continue
+        region = next(iter(collected))
+        dxgw_ids = {
+            dxgw["DirectConnectGatewayId"]
+            for regional in collected.values()
+            for dxgw in regional.get("DirectConnectGateways", [])
+        }
+        dx = get_client("directconnect", role_arn, session_name, region)
+        dx_associations.update(fetch_dx_associations(dx, dxgw_ids, max_workers))
+
+    return stitch_regions(merged, dx_associations)
@@ -0,0 +1,192 @@
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+
+from botocore.config import Config
+
+# Default number of concurrent EC2 calls per client
+MAX_WORKERS = 16
+
+# Largest page size each operation accepts, to keep round-trips down.
+# Operations not listed use the service default.
+MAX_PAGE_SIZE = {
+    "describe_transit_gateways": 1000,
+    "describe_transit_gateway_attachments": 1000,
+    "describe_transit_gateway_route_tables": 1000,
+    "describe_transit_gateway_peering_attachments": 1000,
+    "describe_vpcs": 1000,
+    "describe_subnets": 1000,
+    "describe_route_tables": 100,
+    "describe_vpc_peering_connections": 1000,
+    "search_transit_gateway_routes": 1000,
+    "get_transit_gateway_route_table_associations": 1000,
+    "get_transit_gateway_route_table_propagations": 1000,
+    "describe_direct_connect_gateways": 100,
+    "describe_virtual_interfaces": 100,
+    "describe_direct_connect_gateway_associations": 100,
+}
+
+# Operations that page with a token but have no botocore paginator:
+# operation -> (page size parameter, token parameter, token response key)
+TOKEN_PAGED = {
+    "describe_virtual_interfaces": ("maxResults", "nextToken", "nextToken"),
+}
+
+
+def client_config(max_workers=MAX_WORKERS):
+    # One pooled connection per worker, and botocore's adaptive retry mode so
+    # throttled calls back off and the client rate-limits itself
+    return Config(
+        max_pool_connections=max_workers,
+        retries={"mode": "adaptive", "max_attempts": 10}
+    )
+
+
+def paginate(client, operation, result_key, **kwargs):
+    """Yield the items of every response page of a describe/search/get call.
+
+    Items are yielded as each page arrives, so callers can group or write
+    them without holding the whole result set.
+    """
+    page_size = MAX_PAGE_SIZE.get(operation)
+
+    if client.can_paginate(operation):
+        config = {"PageSize": page_size} if page_size else {}
+        paginator = client.get_paginator(operation)
+        for page in paginator.paginate(PaginationConfig=config, **kwargs):
+            yield from page.get(result_key, [])
+        return
+
+    method = getattr(client, operation)
+    if operation not in TOKEN_PAGED:
+        yield from method(**kwargs).get(result_key, [])
+        return
+
+    size_param, token_param, token_key = TOKEN_PAGED[operation]
+    if page_size:
+        kwargs[size_param] = page_size
+    while True:
+        page = method(**kwargs)
+        yield from page.get(result_key, [])
+        token = page.get(token_key)
+        if not token:
+            return
+        kwargs[token_param] = token
+
+
+def _search_routes(ec2, rtb_id, blackholes=False):
+    # Route table keys to set. Routes stays active-only; with blackholes, the
+    # same search also returns blackhole routes, kept apart as BlackholeRoutes
+    routes = list(paginate(
+        ec2, "search_transit_gateway_routes", "Routes",
+        TransitGatewayRouteTableId=rtb_id,
+        Filters=[{"Name": "state", "Values": ["active", "blackhole"] if blackholes else ["active"]}]
+    ))
+    if not blackholes:
+        return {"Routes": routes}
+    return {
+        "Routes": [r for r in routes if r.get("State") != "blackhole"],
+        "BlackholeRoutes": [r for r in routes if r.get("State") == "blackhole"],
+    }
+
+
+def _get_associations(ec2, rtb_id):
+    return list(paginate(
+        ec2, "get_transit_gateway_route_table_associations", "Associations",
+        TransitGatewayRouteTableId=rtb_id
+    ))
+
+
+def _get_propagations(ec2, rtb_id):
+    return list(paginate(
+        ec2, "get_transit_gateway_route_table_propagations", "TransitGatewayRouteTablePropagations",
+        TransitGatewayRouteTableId=rtb_id
+    ))
+
+
+def _done(value):
+    future = Future()
+    future.set_result(value)
+    return future
+
+
+def _submit(pool, ec2, route_tables, reuse, search):
+    # Start the calls for each route table; a reusable one's route search waits in _attach
+    pending = []
+    for rtb in route_tables:
+        rtb_id = rtb["TransitGatewayRouteTableId"]
+        pending.append((
+            rtb,
+            None if rtb_id in reuse else pool.submit(search, ec2, rtb_id),
+            pool.submit(_get_associations, ec2, rtb_id),
+            pool.submit(_get_propagations, ec2, rtb_id)
+        ))
+    return pending
+
+
+def _attach(pool, ec2, pending, reuse, search, searched_at):
+    fetched = []
+    for rtb, routes, associations, propagations in pending:
+        associations, propagations = associations.result(), propagations.result()
+        searched = searched_at
+        if routes is None:
+            rtb_id = rtb["TransitGatewayRouteTableId"]
+            kept = reuse.pop(rtb_id)(associations, propagations)
+            if kept is None:
+                routes = pool.submit(search, ec2, rtb_id)
+            else:
+                routes, searched = _done(kept[0]), kept[1]
+        fetched.append((rtb, routes, associations, propagations, searched))
+
+    for rtb, routes, associations, propagations, searched in fetched:
+        rtb.update(routes.result())
+        rtb["Associations"] = associations
+        rtb["Propagations"] = propagations
+        if searched_at is not None:
+            rtb["LastSearched"] = searched
+
+
+def iter_tgw_route_table_details(ec2, groups, max_workers=MAX_WORKERS, reuse=None, searched_at=None,
+                                 blackholes=False):
+    """Yield (key, route_tables) for each (key, route_tables) in groups, with details attached.
+
+    Each route table gets Routes (active routes), Associations and
+    Propagations, its three calls fanned out over a bounded thread pool. Calls run at most about
+    max_workers route tables ahead of the group being yielded, so only the
+    next few groups' routes are held at once rather than every table's.
+
+    reuse maps route table id -> check (see snapshot.reusable_route_tables).
+    For those tables the route search waits for the associations and
+    propagations, and is skipped when check returns the routes to keep.
+    Entries are removed from reuse as they are used.
+
+    With searched_at, every route table also gets LastSearched: searched_at
+    for the ones searched now, the previous value for the ones kept. With
+    blackholes, it also gets its blackhole routes as BlackholeRoutes.
+    """
+    reuse = reuse if reuse is not None else {}
+    search = partial(_search_routes, blackholes=blackholes)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        ahead, queued = deque(), 0
+        for key, route_tables in groups:
+            ahead.append((key, route_tables, _submit(pool, ec2, route_tables, reuse, search)))
+            queued += len(route_tables)
+            while ahead and queued >= max_workers:
+                key, route_tables, pending = ahead.popleft()
+                queued -= len(route_tables)
+                _attach(pool, ec2, pending, reuse, search, searched_at)
+                yield key, route_tables
+        for key, route_tables, pending in ahead:
+            _attach(pool, ec2, pending, reuse, search, searched_at)
+            yield key, route_tables
+
+
+def fetch_tgw_route_table_details(ec2, route_tables, max_workers=MAX_WORKERS, reuse=None):
+    """Attach Routes, Associations and Propagations to each TGW route table, all at once.
+
+    Results are written back in input order, so the route table dicts end
+    up exactly as the serial loop left them.
+    """
+    for _ in iter_tgw_route_table_details(ec2, [(None, route_tables)], max_workers, reuse):
+        pass
+    return route_tables
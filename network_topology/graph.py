@@ -0,0 +1,353 @@
+from xml.sax.saxutils import escape, quoteattr
+
+import numpy as np
+
+# ==== Topology Graph ====
+# The topology as a compact undirected graph: integer node ids, CSR
+# adjacency arrays and per-kind attribute tables. Traversals expand a whole
+# BFS frontier per numpy call, so they cost a handful of array operations
+# per hop rather than a Python step per edge.
+
+NODE_KINDS = ("tgw", "vpc", "subnet", "rtb", "vpn", "dxgw", "vif", "other")
+EDGE_TYPES = ("attachment", "contains", "association", "peering", "vpn", "vif")
+
+# Node kind of the resource behind each TGW attachment type
+ATTACHMENT_KINDS = {
+    "vpc": "vpc",
+    "vpn": "vpn",
+    "direct-connect-gateway": "dxgw",
+    "peering": "tgw",
+}
+
+# Attribute columns kept for each node kind
+NODE_ATTRIBUTES = {
+    "tgw": ("State", "OwnerId"),
+    "vpc": ("CidrBlock", "State", "IsDefault"),
+    "subnet": ("CidrBlock", "AvailabilityZone", "State"),
+    "rtb": ("Scope",),
+    "vpn": ("State", "Type"),
+    "dxgw": ("Name", "State", "AmazonSideAsn"),
+    "vif": ("virtualInterfaceState", "vlan", "asn"),
+    "other": ("ResourceType",),
+}
+# Every attribute column, for formats that declare their keys up front
+ATTRIBUTE_COLUMNS = tuple(dict.fromkeys(col for cols in NODE_ATTRIBUTES.values() for col in cols))
+
+
+def _text(value):
+    # Attribute values are exported as strings; a missing one as ""
+    return "" if value is None else str(value)
+
+
+class TopologyGraph:
+    """Integer-indexed graph of a topology document; build with build_graph().
+
+    ids[n] is the AWS id of node n and kinds[n] its index in NODE_KINDS.
+    Each edge e joins sources[e] and targets[e] with type
+    EDGE_TYPES[edge_types[e]] and label edge_labels[e] (the attachment or
+    peering id where there is one). The neighbours of node n are
+    indices[indptr[n]:indptr[n + 1]], reached over edges
+    edge_ids[indptr[n]:indptr[n + 1]]. attributes[kind] is a table of the
+    NODE_ATTRIBUTES columns for that kind's nodes, listed in its "node"
+    column.
+    """
+
+    def __init__(self):
+        self.ids = []
+        self.index = {}
+        self._kinds = []
+        self.rows = []  # node -> its row in its kind's attribute table
+        self.attributes = {kind: {"node": [], **{col: [] for col in NODE_ATTRIBUTES[kind]}} for kind in NODE_KINDS}
+        self._sources, self._targets, self._edge_types = [], [], []
+        self.edge_labels = []
+        self._edges_by_label = None
+
+    # --- construction ---
+
+    def add_node(self, node_id, kind, record=None):
+        n = self.index.get(node_id)
+        if n is not None:
+            return n
+        n = self.index[node_id] = len(self.ids)
+        self.ids.append(node_id)
+        self._kinds.append(NODE_KINDS.index(kind))
+        table = self.attributes[kind]
+        self.rows.append(len(table["node"]))
+        table["node"].append(n)
+        for col in NODE_ATTRIBUTES[kind]:
+            table[col].append((record or {}).get(col))
+        return n
+
+    def add_edge(self, source, target, edge_type, label=None):
+        self._sources.append(source)
+        self._targets.append(target)
+        self._edge_types.append(EDGE_TYPES.index(edge_type))
+        self.edge_labels.append(label)
+
+    def freeze(self):
+        self.kinds = np.array(self._kinds, dtype=np.int8)
+        self.sources = np.array(self._sources, dtype=np.int32)
+        self.targets = np.array(self._targets, dtype=np.int32)
+        self.edge_types = np.array(self._edge_types, dtype=np.int8)
+        del self._kinds, self._sources, self._targets, self._edge_types
+
+        # Every edge is stored in both directions, grouped by its first end
+        ends = np.concatenate([self.sources, self.targets])
+        others = np.concatenate([self.targets, self.sources])
+        edge_ids = np.tile(np.arange(len(self.sources), dtype=np.int32), 2)
+        order = np.argsort(ends, kind="stable")
+        self.indices = others[order]
+        self.edge_ids = edge_ids[order]
+        self.indptr = np.zeros(len(self.ids) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(ends, minlength=len(self.ids)), out=self.indptr[1:])
+        return self
+
+    # --- lookups ---
+
+    def node(self, node_id):
+        return self.index[node_id]
+
+    def kind(self, n):
+        return NODE_KINDS[self.kinds[n]]
+
+    def neighbors(self, n):
+        return self.indices[self.indptr[n]:self.indptr[n + 1]]
+
+    def node_attributes(self, n):
+        """Attribute columns of node n that have a value."""
+        kind = self.kind(n)
+        table, row = self.attributes[kind], self.rows[n]
+        return {col: table[col][row] for col in NODE_ATTRIBUTES[kind] if table[col][row] is not None}
+
+    def to_arrays(self):
+        """The graph as plain arrays, e.g. for np.savez.
+
+        Strings are fixed-width unicode arrays, so np.load reads them back
+        without allow_pickle; a missing edge label or attribute is "".
+        Each kind's attribute table is stored as "<kind>.node" (node
+        numbers) and one "<kind>.<column>" array per column.
+        """
+        arrays = {
+            "ids": np.array(self.ids, dtype=str),
+            "kinds": self.kinds,
+            "sources": self.sources,
+            "targets": self.targets,
+            "edge_types": self.edge_types,
+            "edge_labels": np.array([_text(label) for label in self.edge_labels], dtype=str),
+            "indptr": self.indptr,
+            "indices": self.indices,
+            "edge_ids": self.edge_ids,
+        }
+        for kind, table in self.attributes.items():
+            arrays[f"{kind}.node"] = np.array(table["node"], dtype=np.int32)
+            for col in NODE_ATTRIBUTES[kind]:
+                arrays[f"{kind}.{col}"] = np.array([_text(v) for v in table[col]], dtype=str)
+        return arrays
+
+    # --- traversal ---
+
+    def _expand(self, frontier, edge_mask=None):
+        # (from, to) for every edge leaving the frontier, in CSR order
+        starts, stops = self.indptr[frontier], self.indptr[frontier + 1]
+        counts = stops - starts
+        slots = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+        sources = np.repeat(frontier, counts)
+        if edge_mask is not None:
+            keep = edge_mask[self.edge_ids[slots]]
+            return sources[keep], self.indices[slots][keep]
+        return sources, self.indices[slots]
+
+    def connected_components(self, edge_mask=None):
+        """Component label of every node; nodes share a label iff connected.
+
+        edge_mask, a bool array over edges, leaves out the edges set to False.
+        """
+        sources, targets = self.sources, self.targets
+        if edge_mask is not None:
+            sources, targets = sources[edge_mask], targets[edge_mask]
+        labels = np.arange(len(self.ids))
+        while True:
+            # Take the smallest label across every edge, then jump pointers
+            # so long chains collapse in a few rounds
+            new = labels.copy()
+            np.minimum.at(new, sources, labels[targets])
+            np.minimum.at(new, targets, labels[sources])
+            new = new[new]
+            if np.array_equal(new, labels):
+                return labels
+            labels = new
+
+    def reachable(self, start, edge_mask=None):
+        """Bool mask of the nodes reachable from node start."""
+        seen = np.zeros(len(self.ids), dtype=bool)
+        seen[start] = True
+        frontier = np.array([start])
+        while len(frontier):
+            _, found = self._expand(frontier, edge_mask)
+            frontier = np.unique(found[~seen[found]])
+            seen[frontier] = True
+        return seen
+
+    def shortest_path(self, source_id, target_id):
+        """Fewest-hop path between two resource ids as a list of ids, or None."""
+        source, target = self.node(source_id), self.node(target_id)
+        parent = np.full(len(self.ids), -1, dtype=np.int64)
+        parent[source] = source
+        frontier = np.array([source])
+        while len(frontier) and parent[target] < 0:
+            froms, found = self._expand(frontier)
+            new = parent[found] < 0
+            # np.unique keeps the first parent seen for each newly found node
+            found, first = np.unique(found[new], return_index=True)
+            parent[found] = froms[new][first]
+            frontier = found
+        if parent[target] < 0:
+            return None
+        path = [target]
+        while path[-1] != source:
+            path.append(int(parent[path[-1]]))
+        return [self.ids[n] for n in reversed(path)]
+
+    def blast_radius(self, attachment_id):
+        """VPCs that lose connectivity if the TGW attachment is removed.
+
+        Returns the VPCs cut off on the attachment's resource side, and the
+        VPCs on the TGW side that lose their path to them. Both are empty when
+        another path (a peering, another TGW) still joins the two sides, or
+        when one side has no VPCs.
+        """
+        if self._edges_by_label is None:
+            self._edges_by_label = {}
+            for e, label in enumerate(self.edge_labels):
+                if label:
+                    self._edges_by_label.setdefault(label, []).append(e)
+        edges = self._edges_by_label[attachment_id]
+        mask = np.ones(len(self.sources), dtype=bool)
+        mask[edges] = False
+        edge = edges[0]
+        tgw_side = self.reachable(self.sources[edge], mask)
+        if tgw_side[self.targets[edge]]:
+            return {"AttachmentId": attachment_id, "VpcsCutOff": [], "VpcsLosingReach": []}
+        vpc = self.kinds == NODE_KINDS.index("vpc")
+        cut_off = np.flatnonzero(self.reachable(self.targets[edge], mask) & vpc)
+        losing = np.flatnonzero(tgw_side & vpc)
+        # Connectivity between VPCs is only lost when both sides have some
+        if not len(cut_off) or not len(losing):
+            cut_off = losing = []
+        return {
+            "AttachmentId": attachment_id,
+            "VpcsCutOff": [self.ids[n] for n in cut_off],
+            "VpcsLosingReach": [self.ids[n] for n in losing],
+        }
+
+
+def build_graph(topology):
+    """Build a TopologyGraph from a topology document."""
+    g = TopologyGraph()
+
+    for tgw in topology.get("TransitGateways", []):
+        g.add_node(tgw["TransitGatewayId"], "tgw", tgw)
+    for vpc in topology.get("VPCs", []):
+        g.add_node(vpc["VpcId"], "vpc", vpc)
+    for dxgw in topology.get("DirectConnectGateways", []):
+        g.add_node(dxgw["DirectConnectGatewayId"], "dxgw", dxgw)
+
+    for tgw in topology.get("TransitGateways", []):
+        t = g.node(tgw["TransitGatewayId"])
+        for att in tgw.get("Attachments", []):
+            kind = ATTACHMENT_KINDS.get(att.get("ResourceType"), "other")
+            r = g.add_node(att["ResourceId"], kind, att)
+            g.add_edge(t, r, "attachment", att["TransitGatewayAttachmentId"])
+        for rtb in tgw.get("RouteTables", []):
+            r = g.add_node(rtb["TransitGatewayRouteTableId"], "rtb", {"Scope": "tgw"})
+            g.add_edge(t, r, "contains")
+        for vpn in tgw.get("VPNConnections", []):
+            v = g.add_node(vpn["VpnConnectionId"], "vpn", vpn)
+            g.add_edge(t, v, "vpn", vpn["VpnConnectionId"])
+
+    for vpc in topology.get("VPCs", []):
+        v = g.node(vpc["VpcId"])
+        for sn in vpc.get("Subnets", []):
+            g.add_edge(v, g.add_node(sn["SubnetId"], "subnet", sn), "contains")
+        for rt in vpc.get("RouteTables", []):
+            r = g.add_node(rt["RouteTableId"], "rtb", {"Scope": "vpc"})
+            g.add_edge(v, r, "contains")
+            for assoc in rt.get("Associations", []):
+                if assoc.get("SubnetId") in g.index:
+                    g.add_edge(r, g.node(assoc["SubnetId"]), "association")
+        for p in vpc.get("PeeringConnections", []):
+            req, acc = p["RequesterVpcInfo"].get("VpcId"), p["AccepterVpcInfo"].get("VpcId")
+            # Listed under both VPCs; the requester adds the edge, or the
+            # accepter when the requester is outside this topology
+            if vpc["VpcId"] == req or (vpc["VpcId"] == acc and req not in g.index):
+                if req and acc:
+                    g.add_edge(g.add_node(req, "vpc"), g.add_node(acc, "vpc"), "peering", p["VpcPeeringConnectionId"])
+        for vpn in vpc.get("VPNConnections", []):
+            g.add_edge(v, g.add_node(vpn["VpnConnectionId"], "vpn", vpn), "vpn", vpn["VpnConnectionId"])
+
+    for dxgw in topology.get("DirectConnectGateways", []):
+        d = g.node(dxgw["DirectConnectGatewayId"])
+        for vif in dxgw.get("VirtualInterfaces", []):
+            g.add_edge(d, g.add_node(vif["virtualInterfaceId"], "vif", vif), "vif", vif["virtualInterfaceId"])
+
+    return g.freeze()
+
+
+# ==== GraphML / GEXF Export ====
+
+def write_graphml(graph, path):
+    with open(path, "w") as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        f.write('<graphml xmlns="http://graphml.graphdrawing.org/xmlns">\n')
+        f.write('<key id="kind" for="node" attr.name="kind" attr.type="string"/>\n')
+        for col in ATTRIBUTE_COLUMNS:
+            f.write(f'<key id={quoteattr(col)} for="node" attr.name={quoteattr(col)} attr.type="string"/>\n')
+        f.write('<key id="type" for="edge" attr.name="type" attr.type="string"/>\n')
+        f.write('<key id="label" for="edge" attr.name="label" attr.type="string"/>\n')
+        f.write('<graph edgedefault="undirected">\n')
+        for n, node_id in enumerate(graph.ids):
+            f.write(
+                f'<node id={quoteattr(node_id)}><data key="kind">{NODE_KINDS[graph.kinds[n]]}</data>'
+                + "".join(f'<data key={quoteattr(col)}>{escape(_text(value))}</data>'
+                          for col, value in graph.node_attributes(n).items())
+                + "</node>\n"
+            )
+        for e, (s, t) in enumerate(zip(graph.sources.tolist(), graph.targets.tolist())):
+            label = graph.edge_labels[e]
+            f.write(
+                f'<edge source={quoteattr(graph.ids[s])} target={quoteattr(graph.ids[t])}>'
+                f'<data key="type">{EDGE_TYPES[graph.edge_types[e]]}</data>'
+                + (f'<data key="label">{escape(label)}</data>' if label else "")
+                + "</edge>\n"
+            )
+        f.write("</graph>\n</graphml>\n")
+
+
+def write_gexf(graph, path):
+    with open(path, "w") as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        f.write('<gexf xmlns="http://gexf.net/1.3" version="1.3">\n')
+        f.write('<graph defaultedgetype="undirected">\n')
+        # Attribute 0 is the kind, then one per attribute column
+        columns = {col: i for i, col in enumerate(ATTRIBUTE_COLUMNS, 1)}
+        f.write('<attributes class="node"><attribute id="0" title="kind" type="string"/>'
+                + "".join(f'<attribute id="{i}" title={quoteattr(col)} type="string"/>' for col, i in columns.items())
+                + "</attributes>\n")
+        f.write('<attributes class="edge"><attribute id="0" title="type" type="string"/></attributes>\n')
+        f.write("<nodes>\n")
+        for n, node_id in enumerate(graph.ids):
+            f.write(
+                f'<node id="{n}" label={quoteattr(node_id)}><attvalues>'
+                f'<attvalue for="0" value="{NODE_KINDS[graph.kinds[n]]}"/>'
+                + "".join(f'<attvalue for="{columns[col]}" value={quoteattr(_text(value))}/>'
+                          for col, value in graph.node_attributes(n).items())
+                + "</attvalues></node>\n"
+            )
+        f.write("</nodes>\n<edges>\n")
+        for e, (s, t) in enumerate(zip(graph.sources.tolist(), graph.targets.tolist())):
+            label = graph.edge_labels[e]
+            f.write(
+                f'<edge id="{e}" source="{s}" target="{t}"' + (f" label={quoteattr(label)}" if label else "")
+                + f'><attvalues><attvalue for="0" value="{EDGE_TYPES[graph.edge_types[e]]}"/></attvalues></edge>\n'
+            )
+        f.write("</edges>\n</graph>\n</gexf>\n")
@@ -0,0 +1,203 @@
+import json
+import os
+import threading
+import time
+
+from botocore import xform_name
+
+from network_topology.session import on_new_client, remove_client_hook
+
+# ==== API Call Instrumentation ====
+# Records every AWS call made through instrumented clients using botocore's
+# event hooks: one record per call with its duration, whether it was a
+# follow-on page, the number of retries and throttled attempts, and the
+# final error code if it failed.
+
+# Crawl phase each operation belongs to, for the per-phase summary
+PHASES = {
+    "describe_transit_gateways": "transit gateways",
+    "describe_transit_gateway_attachments": "transit gateways",
+    "describe_transit_gateway_route_tables": "transit gateways",
+    "describe_transit_gateway_peering_attachments": "transit gateways",
+    "search_transit_gateway_routes": "tgw route tables",
+    "get_transit_gateway_route_table_associations": "tgw route tables",
+    "get_transit_gateway_route_table_propagations": "tgw route tables",
+    "describe_vpcs": "vpcs",
+    "describe_subnets": "vpcs",
+    "describe_route_tables": "vpcs",
+    "describe_vpn_connections": "vpn",
+    "describe_customer_gateways": "vpn",
+    "describe_vpn_gateways": "vpn",
+    "describe_vpc_peering_connections": "peering",
+    "describe_direct_connect_gateways": "direct connect",
+    "describe_virtual_interfaces": "direct connect",
+    "describe_direct_connect_gateway_associations": "direct connect",
+    "assume_role": "sts",
+}
+
+THROTTLE_CODES = {
+    "Throttling", "ThrottlingException", "ThrottledException", "RequestThrottled",
+    "RequestThrottledException", "TooManyRequestsException", "RequestLimitExceeded",
+    "SlowDown", "EC2ThrottledException",
+}
+
+TOKEN_PARAMS = ("NextToken", "nextToken", "Marker")
+
+# Key under which a call's in-flight record rides along in the botocore request context
+_CONTEXT_KEY = "network_topology_call"
+
+
+class ApiRecorder:
+    """Collects one record per API call from every client it is attached to.
+
+    Records are dicts with Operation, Service, Phase, Region, Start and
+    Seconds (perf_counter based), Page (False for the first page of a
+    paginated request), Retries, Throttles, Error and Thread.
+
+    stop() (or leaving a with block) detaches it from every client and
+    stops it attaching to new ones; the records are kept.
+    """
+
+    def __init__(self):
+        self.records = []
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+        self._clients = []
+
+    def _handlers(self):
+        return (
+            ("before-parameter-build.*.*", self._before),
+            ("response-received.*.*", self._attempt),
+            ("after-call.*.*", self._after),
+            ("after-call-error.*.*", self._after_error),
+        )
+
+    def attach(self, client):
+        for event, handler in self._handlers():
+            client.meta.events.register(event, handler)
+        with self._lock:
+            self._clients.append(client)
+
+    def stop(self):
+        remove_client_hook(self.attach)
+        with self._lock:
+            clients, self._clients = self._clients, []
+        for client in clients:
+            for event, handler in self._handlers():
+                client.meta.events.unregister(event, handler)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _before(self, params, model, context, **kwargs):
+        operation = xform_name(model.name)
+        context[_CONTEXT_KEY] = {
+            "Operation": operation,
+            "Service": model.service_model.service_name,
+            "Phase": PHASES.get(operation, "other"),
+            "Region": context.get("client_region"),
+            "Start": time.perf_counter() - self._origin,
+            "Page": any(params.get(p) for p in TOKEN_PARAMS),
+            "Attempts": 0,
+            "Throttles": 0,
+            "Error": None,
+            "Thread": threading.get_ident(),
+        }
+
+    def _attempt(self, context, parsed_response=None, exception=None, **kwargs):
+        call = context.get(_CONTEXT_KEY)
+        if call is None:
+            return
+        call["Attempts"] += 1
+        code = ((parsed_response or {}).get("Error") or {}).get("Code")
+        if code in THROTTLE_CODES:
+            call["Throttles"] += 1
+
+    def _finish(self, context, error=None):
+        call = context.pop(_CONTEXT_KEY, None)
+        if call is None:
+            return
+        call["Seconds"] = time.perf_counter() - self._origin - call["Start"]
+        call["Retries"] = max(call.pop("Attempts") - 1, 0)
+        call["Error"] = error
+        with self._lock:
+            self.records.append(call)
+
+    def _after(self, http_response, parsed, context, **kwargs):
+        error = None
+        if http_response.status_code >= 300:
+            error = (parsed.get("Error") or {}).get("Code", str(http_response.status_code))
+        self._finish(context, error)
+
+    def _after_error(self, exception, context, **kwargs):
+        self._finish(context, type(exception).__name__)
+
+    # --- reports ---
+
+    def summary(self, key="Operation"):
+        """Aggregate records by key (Operation or Phase), busiest first."""
+        groups = {}
+        for record in self.records:
+            groups.setdefault(record[key], []).append(record)
+        rows = []
+        for name, records in groups.items():
+            durations = sorted(r["Seconds"] for r in records)
+            rows.append({
+                key: name,
+                "Calls": len(records),
+                "Requests": sum(1 for r in records if not r["Page"]),
+                "Retries": sum(r["Retries"] for r in records),
+                "Throttles": sum(r["Throttles"] for r in records),
+                "Errors": sum(1 for r in records if r["Error"]),
+                "TotalSeconds": sum(durations),
+                "P50Ms": durations[len(durations) // 2] * 1000,
+                "P95Ms": durations[min(int(len(durations) * 0.95), len(durations) - 1)] * 1000,
+                "MaxMs": durations[-1] * 1000,
+            })
+        return sorted(rows, key=lambda row: row["TotalSeconds"], reverse=True)
+
+    def summary_table(self, key="Operation"):
+        """The summary as an aligned text table."""
+        columns = (key, "Calls", "Requests", "Retries", "Throttles", "Errors", "TotalSeconds", "P50Ms", "P95Ms", "MaxMs")
+        rows = [
+            [f"{row[c]:.2f}" if c == "TotalSeconds" else f"{row[c]:.1f}" if isinstance(row[c], float) else str(row[c])
+             for c in columns]
+            for row in self.summary(key)
+        ]
+        widths = [max([len(c)] + [len(r[i]) for r in rows]) for i, c in enumerate(columns)]
+        lines = ["  ".join(c.ljust(w) if i == 0 else c.rjust(w) for i, (c, w) in enumerate(zip(columns, widths)))]
+        for r in rows:
+            lines.append("  ".join(v.ljust(w) if i == 0 else v.rjust(w) for i, (v, w) in enumerate(zip(r, widths))))
+        return "\n".join(lines)
+
+    def write_trace(self, path):
+        """Write the calls as a Chrome trace (chrome://tracing, Perfetto), one row per thread."""
+        events = [
+            {
+                "name": r["Operation"],
+                "cat": r["Phase"],
+                "ph": "X",
+                "ts": round(r["Start"] * 1e6),
+                "dur": round(r["Seconds"] * 1e6),
+                "pid": os.getpid(),
+                "tid": r["Thread"],
+                "args": {k: r[k] for k in ("Service", "Region", "Page", "Retries", "Throttles", "Error")},
+            }
+            for r in self.records
+        ]
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+
+def record_api_calls():
+    """Start recording every call made by clients from network_topology.session.
+
+    Call stop() on the returned recorder, or use it as a context manager,
+    to stop recording.
+    """
+    recorder = ApiRecorder()
+    on_new_client(recorder.attach)
+    return recorder
@@ -0,0 +1,49 @@
+# ==== Join Stage ====
+# Each resource collection is grouped by its foreign key in a single pass, so
+# assembling the topology is a dict lookup per entity instead of a scan of
+# the global list.
+
+
+def group_by(items, key):
+    groups = {}
+    for item in items:
+        groups.setdefault(item.get(key), []).append(item)
+    return groups
+
+
+def group_peerings_by_vpc(peerings):
+    # A peering is listed under both its requester and accepter VPC
+    by_vpc = {}
+    for p in peerings:
+        endpoints = {p["RequesterVpcInfo"].get("VpcId"), p["AccepterVpcInfo"].get("VpcId")}
+        endpoints.discard(None)
+        for vpc_id in endpoints:
+            by_vpc.setdefault(vpc_id, []).append(p)
+    return by_vpc
+
+
+def index_vpns_by_vpc(vpn_connections, vpn_gateways):
+    # VpcId -> VPN connections terminating on a VGW attached to that VPC,
+    # in the same order as vpn_connections
+    vgws_by_id = {vgw["VpnGatewayId"]: vgw for vgw in vpn_gateways}
+    vpns_by_vpc = {}
+    for vpn in vpn_connections:
+        vgw = vgws_by_id.get(vpn.get("VpnGatewayId"))
+        if not vgw:
+            continue
+        for att in vgw.get("VpcAttachments", []):
+            vpns_by_vpc.setdefault(att["VpcId"], []).append(vpn)
+    return vpns_by_vpc
+
+
+def build_indexes(attachments, tgw_route_tables, subnets, route_tables,
+                  vpn_connections, peerings, virtual_interfaces):
+    return {
+        "attachments_by_tgw": group_by(attachments, "TransitGatewayId"),
+        "tgw_route_tables_by_tgw": group_by(tgw_route_tables, "TransitGatewayId"),
+        "vpns_by_tgw": group_by(vpn_connections, "TransitGatewayId"),
+        "subnets_by_vpc": group_by(subnets, "VpcId"),
+        "route_tables_by_vpc": group_by(route_tables, "VpcId"),
+        "peerings_by_vpc": group_peerings_by_vpc(peerings),
+        "vifs_by_dxgw": group_by(virtual_interfaces, "directConnectGatewayId"),
+    }
@@ -0,0 +1,163 @@
+import socket
+
+import numpy as np
+
+from network_topology.snapshot import vpc_cidrs
+
+# ==== CIDR Overlap Analysis ====
+# Prefixes are encoded as int64 [start, end] address ranges and overlaps are
+# found with one sort and a binary-search sweep instead of comparing every
+# pair. Only IPv4 prefixes are analysed; IPv6 ranges don't fit in int64.
+
+
+def encode_cidrs(cidrs, groups=None):
+    """Encode IPv4 CIDR strings as inclusive int64 start/end arrays.
+
+    groups, if given, is one non-negative int per CIDR stored above the
+    32 address bits, so prefixes in different groups never overlap. Returns
+    (starts, ends, kept) where kept holds the positions in cidrs that were
+    IPv4 and so appear in the arrays.
+    """
+    starts, ends, kept = [], [], []
+    for i, cidr in enumerate(cidrs):
+        # inet_aton is several times cheaper than building an IPv4Network
+        address, _, prefixlen = cidr.partition("/")
+        if ":" in address:
+            continue
+        try:
+            start = int.from_bytes(socket.inet_aton(address), "big")
+        except OSError:
+            continue
+        size = 1 << (32 - int(prefixlen or 32))
+        start &= ~(size - 1)
+        base = (groups[i] << 32) if groups is not None else 0
+        starts.append(base | start)
+        ends.append(base | (start + size - 1))
+        kept.append(i)
+    return np.array(starts, dtype=np.int64), np.array(ends, dtype=np.int64), np.array(kept, dtype=np.int64)
+
+
+def overlapping_pairs(starts, ends):
+    """Every pair (i, j) of ranges that overlap, as two index arrays.
+
+    Ranges are sorted by start (widest first on ties), after which the
+    ranges overlapping range k are exactly the ones that follow it and start
+    no later than its end, found with a single searchsorted. In each pair i
+    is the range that sorts first, so for nested CIDRs i is the wider one.
+    """
+    order = np.lexsort((-ends, starts))
+    s, e = starts[order], ends[order]
+    position = np.arange(len(s))
+    stop = np.searchsorted(s, e, side="right")
+    counts = stop - position - 1
+
+    first = np.repeat(position, counts)
+    # Offset of each pair within its run, so the partner is first + 1 + offset
+    run_start = np.repeat(np.cumsum(counts) - counts, counts)
+    second = first + 1 + (np.arange(len(first)) - run_start)
+    return order[first], order[second]
+
+
+def vpc_overlaps(topology):
+    """Overlapping CIDRs between VPCs that are peered or share a TGW.
+
+    VPCs with overlapping CIDRs that have no path between them are left
+    out, since they can't conflict.
+    """
+    vpc_ids, cidrs = [], []
+    for vpc in topology.get("VPCs", []):
+        # IPv6 blocks are skipped by encode_cidrs
+        for cidr in vpc_cidrs(vpc):
+            vpc_ids.append(vpc["VpcId"])
+            cidrs.append(cidr)
+
+    tgws_by_vpc = {}
+    for tgw in topology.get("TransitGateways", []):
+        for att in tgw.get("Attachments", []):
+            if att.get("ResourceType") == "vpc":
+                tgws_by_vpc.setdefault(att["ResourceId"], set()).add(tgw["TransitGatewayId"])
+    peerings = {}
+    for vpc in topology.get("VPCs", []):
+        for p in vpc.get("PeeringConnections", []):
+            pair = frozenset((p["RequesterVpcInfo"].get("VpcId"), p["AccepterVpcInfo"].get("VpcId")))
+            peerings[pair] = p["VpcPeeringConnectionId"]
+
+    starts, ends, kept = encode_cidrs(cidrs)
+    first, second = overlapping_pairs(starts, ends)
+    conflicts = []
+    for i, j in zip(kept[first].tolist(), kept[second].tolist()):
+        a, b = vpc_ids[i], vpc_ids[j]
+        if a == b:
+            continue
+        via = sorted(tgws_by_vpc.get(a, set()) & tgws_by_vpc.get(b, set()))
+        pcx = peerings.get(frozenset((a, b)))
+        if pcx:
+            via.append(pcx)
+        if via:
+            conflicts.append({"VpcIds": [a, b], "CidrBlocks": [cidrs[i], cidrs[j]], "ConnectedVia": via})
+    return conflicts
+
+
+def _route_target(route):
+    return tuple(sorted(a["TransitGatewayAttachmentId"] for a in route.get("TransitGatewayAttachments", [])))
+
+
+def shadowed_tgw_routes(topology):
+    """TGW routes that more-specific routes in the same table pull traffic away from.
+
+    A route is reported when a more-specific route in its table sends part
+    of its range to a different attachment. FullyShadowed is set when the
+    more-specific routes cover the whole range, so the route is never used.
+    """
+    routes, rtb_ids, cidrs = [], [], []
+    for tgw in topology.get("TransitGateways", []):
+        for rtb in tgw.get("RouteTables", []):
+            for route in rtb.get("Routes", []):
+                if not route.get("DestinationCidrBlock"):
+                    continue
+                routes.append(route)
+                rtb_ids.append(rtb["TransitGatewayRouteTableId"])
+                cidrs.append(route["DestinationCidrBlock"])
+    # One group per route table, so routes of different tables never overlap
+    table_index = {}
+    groups = [table_index.setdefault(rtb_id, len(table_index)) for rtb_id in rtb_ids]
+
+    starts, ends, kept = encode_cidrs(cidrs, groups)
+    outer, inner = overlapping_pairs(starts, ends)
+
+    # The direct parent of a route is the most specific route containing it,
+    # which is the containing route with the largest start, then smallest end
+    parent = np.full(len(starts), -1, dtype=np.int64)
+    if len(outer):
+        order = np.lexsort((-ends[outer], starts[outer], inner))
+        last = np.r_[inner[order][1:] != inner[order][:-1], True]
+        parent[inner[order][last]] = outer[order][last]
+    # Address space of each route taken by its direct children; CIDRs nest,
+    # so the children of one parent never overlap each other
+    covered = np.zeros(len(starts), dtype=np.int64)
+    children = np.flatnonzero(parent >= 0)
+    np.add.at(covered, parent[children], ends[children] - starts[children] + 1)
+    fully = covered == ends - starts + 1
+
+    shadowed = {}
+    for i, j in zip(outer.tolist(), inner.tolist()):
+        wide, narrow = routes[kept[i]], routes[kept[j]]
+        if _route_target(wide) == _route_target(narrow):
+            continue
+        entry = shadowed.get(i)
+        if entry is None:
+            entry = shadowed[i] = {
+                "TransitGatewayRouteTableId": rtb_ids[kept[i]],
+                "DestinationCidrBlock": wide["DestinationCidrBlock"],
+                "ShadowedBy": [],
+                "FullyShadowed": bool(fully[i])
+            }
+        entry["ShadowedBy"].append(narrow["DestinationCidrBlock"])
+    return list(shadowed.values())
+
+
+def find_conflicts(topology):
+    return {
+        "OverlappingVpcs": vpc_overlaps(topology),
+        "ShadowedTgwRoutes": shadowed_tgw_routes(topology)
+    }
@@ -0,0 +1,242 @@
+import ipaddress
+
+from network_topology.snapshot import ASSOCIATED_STATES, vpc_cidrs
+
+# Private address space an internet exit (IGW, egress-only IGW, NAT) can
+# never deliver to: RFC 1918 and IPv6 unique local addresses
+PRIVATE_SPACE = ("10.0.0.0/8", "172.16.0.0/12", "192.168.0.0/16", "fc00::/7")
+# Route targets that leave the VPC for the internet
+INTERNET_TARGETS = ("NatGatewayId", "EgressOnlyInternetGatewayId")
+
+
+class PrefixTrie:
+    """Binary radix trie over integer-encoded prefixes, for longest-prefix match.
+
+    Each node is a list [zero child, one child, value]. A lookup walks at
+    most one node per address bit and remembers the deepest value it passed.
+    """
+
+    def __init__(self, bits):
+        self.bits = bits
+        self.root = [None, None, None]
+
+    def insert(self, network, prefixlen, value):
+        node = self.root
+        for i in range(prefixlen):
+            bit = (network >> (self.bits - 1 - i)) & 1
+            if node[bit] is None:
+                node[bit] = [None, None, None]
+            node = node[bit]
+        node[2] = value
+
+    def lookup(self, address):
+        node, best = self.root, self.root[2]
+        for i in range(self.bits):
+            node = node[(address >> (self.bits - 1 - i)) & 1]
+            if node is None:
+                break
+            if node[2] is not None:
+                best = node[2]
+        return best
+
+
+class RouteIndex:
+    # One trie per address family, so IPv4 and IPv6 routes can share a table
+    def __init__(self):
+        self.tries = {4: PrefixTrie(32), 6: PrefixTrie(128)}
+
+    def add(self, cidr, route):
+        net = ipaddress.ip_network(cidr, strict=False)
+        self.tries[net.version].insert(int(net.network_address), net.prefixlen, route)
+
+    def lookup(self, ip):
+        return self.tries[ip.version].lookup(int(ip))
+
+
+def _subnet_index(vpc):
+    index = RouteIndex()
+    for sn in vpc.get("Subnets", []):
+        if sn.get("CidrBlock"):
+            index.add(sn["CidrBlock"], sn["SubnetId"])
+        for assoc in sn.get("Ipv6CidrBlockAssociationSet", []):
+            if assoc.get("Ipv6CidrBlockState", {}).get("State") in ASSOCIATED_STATES:
+                index.add(assoc["Ipv6CidrBlock"], sn["SubnetId"])
+    return index
+
+
+def _internet_exit(route):
+    # The route's target, if it sends traffic to the internet
+    if (route.get("GatewayId") or "").startswith("igw-"):
+        return route["GatewayId"]
+    return next((route[k] for k in INTERNET_TARGETS if route.get(k)), None)
+
+
+class ReachabilityIndex:
+    """Answers "can subnet A reach IP B, and along which hops?" over a topology.
+
+    Works on the document written by the topology scripts, so it runs
+    offline from a saved snapshot. A query walks
+    subnet -> VPC route table -> TGW attachment -> TGW route table ->
+    destination attachment -> destination subnet, using a longest-prefix
+    match at every route table.
+    """
+
+    def __init__(self, topology):
+        self.subnet_vpc = {}       # SubnetId -> VpcId
+        self.subnet_rtb = {}       # SubnetId -> RouteTableId (explicit association)
+        self.main_rtb = {}         # VpcId -> main RouteTableId
+        self.vpc_routes = {}       # RouteTableId -> RouteIndex of VPC routes
+        self.vpc_subnets = {}      # VpcId -> RouteIndex of subnet CIDRs
+        self.vpc_attachment = {}   # (TransitGatewayId, VpcId) -> TGW attachment id
+        self.attachment_rtb = {}   # TGW attachment id -> TGW route table id
+        self.tgw_routes = {}       # TGW route table id -> RouteIndex of TGW routes
+        self.peering_vpcs = {}     # VpcPeeringConnectionId -> (requester VpcId, accepter VpcId)
+        # Private ranges and every known VPC's CIDRs -> owner, for internet exits
+        self.private_space = RouteIndex()
+        for cidr in PRIVATE_SPACE:
+            self.private_space.add(cidr, "private address space")
+
+        for vpc in topology.get("VPCs", []):
+            vpc_id = vpc["VpcId"]
+            self.vpc_subnets[vpc_id] = _subnet_index(vpc)
+            for cidr in vpc_cidrs(vpc):
+                self.private_space.add(cidr, vpc_id)
+            for sn in vpc.get("Subnets", []):
+                self.subnet_vpc[sn["SubnetId"]] = vpc_id
+            for rt in vpc.get("RouteTables", []):
+                routes = RouteIndex()
+                for route in rt.get("Routes", []):
+                    cidr = route.get("DestinationCidrBlock") or route.get("DestinationIpv6CidrBlock")
+                    if cidr:
+                        routes.add(cidr, route)
+                self.vpc_routes[rt["RouteTableId"]] = routes
+                for assoc in rt.get("Associations", []):
+                    if assoc.get("Main"):
+                        self.main_rtb[vpc_id] = rt["RouteTableId"]
+                    elif assoc.get("SubnetId"):
+                        self.subnet_rtb[assoc["SubnetId"]] = rt["RouteTableId"]
+            for p in vpc.get("PeeringConnections", []):
+                self.peering_vpcs[p["VpcPeeringConnectionId"]] = (
+                    p["RequesterVpcInfo"].get("VpcId"),
+                    p["AccepterVpcInfo"].get("VpcId")
+                )
+
+        for tgw in topology.get("TransitGateways", []):
+            tgw_id = tgw["TransitGatewayId"]
+            for att in tgw.get("Attachments", []):
+                if att.get("ResourceType") == "vpc":
+                    self.vpc_attachment[(tgw_id, att["ResourceId"])] = att["TransitGatewayAttachmentId"]
+                assoc = att.get("Association") or {}
+                if assoc.get("TransitGatewayRouteTableId"):
+                    self.attachment_rtb[att["TransitGatewayAttachmentId"]] = assoc["TransitGatewayRouteTableId"]
+            for rtb in tgw.get("RouteTables", []):
+                rtb_id = rtb["TransitGatewayRouteTableId"]
+                routes = RouteIndex()
+                # A blackhole route still wins the longest-prefix match and drops the packet
+                for route in rtb.get("Routes", []) + rtb.get("BlackholeRoutes", []):
+                    if route.get("DestinationCidrBlock"):
+                        routes.add(route["DestinationCidrBlock"], route)
+                self.tgw_routes[rtb_id] = routes
+                for assoc in rtb.get("Associations", []):
+                    self.attachment_rtb.setdefault(assoc["TransitGatewayAttachmentId"], rtb_id)
+
+    def _arrive(self, vpc_id, ip, hops):
+        hops.append(vpc_id)
+        subnets = self.vpc_subnets.get(vpc_id)
+        subnet_id = subnets.lookup(ip) if subnets else None
+        if subnet_id is None:
+            return {"Reachable": False, "Hops": hops, "Reason": f"{ip} is in no subnet of {vpc_id}"}
+        hops.append(subnet_id)
+        return {"Reachable": True, "Hops": hops, "Reason": "delivered"}
+
+    def _via_tgw(self, tgw_id, vpc_id, ip, hops):
+        att_id = self.vpc_attachment.get((tgw_id, vpc_id))
+        if att_id is None:
+            return {"Reachable": False, "Hops": hops, "Reason": f"{vpc_id} has no attachment on {tgw_id}"}
+        hops.append(att_id)
+        tgw_rtb = self.attachment_rtb.get(att_id)
+        if tgw_rtb is None:
+            return {"Reachable": False, "Hops": hops, "Reason": f"{att_id} is not associated with a route table"}
+        hops.append(tgw_rtb)
+
+        routes = self.tgw_routes.get(tgw_rtb)
+        route = routes.lookup(ip) if routes else None
+        if route is None:
+            return {"Reachable": False, "Hops": hops, "Reason": f"no route to {ip} in {tgw_rtb}"}
+        if route.get("State") == "blackhole":
+            return {"Reachable": False, "Hops": hops, "Reason": f"blackhole route {route['DestinationCidrBlock']}"}
+        targets = route.get("TransitGatewayAttachments", [])
+        if not targets:
+            return {"Reachable": False, "Hops": hops, "Reason": f"route {route['DestinationCidrBlock']} has no attachment"}
+
+        target = targets[0]
+        hops.append(target["TransitGatewayAttachmentId"])
+        if target.get("ResourceType") != "vpc":
+            return {"Reachable": True, "Hops": hops + [target.get("ResourceId")],
+                    "Reason": f"leaves via {target.get('ResourceType')} attachment"}
+        return self._arrive(target["ResourceId"], ip, hops)
+
+    def query(self, subnet_id, destination):
+        """Trace one packet from subnet_id to the destination IP address."""
+        hops = [subnet_id]
+        try:
+            ip = ipaddress.ip_address(destination)
+        except ValueError:
+            return {"Reachable": False, "Hops": hops, "Reason": f"{destination!r} is not an IP address"}
+        vpc_id = self.subnet_vpc.get(subnet_id)
+        if vpc_id is None:
+            return {"Reachable": False, "Hops": hops, "Reason": f"unknown subnet {subnet_id}"}
+
+        rtb_id = self.subnet_rtb.get(subnet_id) or self.main_rtb.get(vpc_id)
+        routes = self.vpc_routes.get(rtb_id)
+        if routes is None:
+            return {"Reachable": False, "Hops": hops, "Reason": f"no route table for {subnet_id}"}
+        hops.append(rtb_id)
+
+        route = routes.lookup(ip)
+        if route is None:
+            return {"Reachable": False, "Hops": hops, "Reason": f"no route to {ip} in {rtb_id}"}
+        if route.get("State") == "blackhole":
+            return {"Reachable": False, "Hops": hops, "Reason": "blackhole route"}
+
+        if route.get("GatewayId") == "local":
+            return self._arrive(vpc_id, ip, hops)
+        if route.get("TransitGatewayId"):
+            hops.append(route["TransitGatewayId"])
+            return self._via_tgw(route["TransitGatewayId"], vpc_id, ip, hops)
+        if route.get("VpcPeeringConnectionId"):
+            pcx = route["VpcPeeringConnectionId"]
+            hops.append(pcx)
+            requester, accepter = self.peering_vpcs.get(pcx, (None, None))
+            peer = accepter if requester == vpc_id else requester
+            if peer is None:
+                return {"Reachable": False, "Hops": hops, "Reason": f"unknown peering {pcx}"}
+            return self._arrive(peer, ip, hops)
+
+        exit_id = _internet_exit(route)
+        if exit_id is not None:
+            hops.append(exit_id)
+            owner = self.private_space.lookup(ip)
+            if owner is not None:
+                # Typically only the default route matched: the packet leaves,
+                # but the internet cannot carry it to private or VPC space
+                return {"Reachable": False, "Hops": hops, "EgressOnly": True,
+                        "Reason": f"{ip} is in {owner}, but its route leaves for the internet via {exit_id}"}
+            return {"Reachable": True, "Hops": hops, "Reason": f"leaves the VPC via {exit_id}"}
+
+        target = next((route[k] for k in ("GatewayId", "NatGatewayId", "NetworkInterfaceId",
+                                          "VpcEndpointId", "InstanceId") if route.get(k)), None)
+        return {"Reachable": True, "Hops": hops + [target], "Reason": f"leaves the VPC via {target}"}
+
+    def query_many(self, pairs):
+        """Answer a batch of (subnet_id, destination IP) pairs, in order.
+
+        Pairs that repeat share one trace.
+        """
+        results, cache = [], {}
+        for pair in pairs:
+            pair = tuple(pair)
+            if pair not in cache:
+                cache[pair] = self.query(*pair)
+            results.append(cache[pair])
+        return results
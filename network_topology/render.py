@@ -0,0 +1,389 @@
+import json
+
+from network_topology.svg import layout, render_html, render_svg
+
+# ==== Renderers ====
+# Every renderer takes the topology dict built by collect() and returns the
+# file content as a string, so one crawl can feed any number of outputs.
+
+STYLE_CLASSES = [
+    "classDef tgw fill:#5DADE2,stroke:#1B4F72,stroke-width:2px,color:#fff,font-weight:bold",
+    "classDef vpc fill:#58D68D,stroke:#145A32,stroke-width:2px,color:#fff,font-weight:bold",
+    "classDef subnet fill:#E5E8E8,stroke:#626567,stroke-width:1px,color:#000",
+    "classDef rtb fill:#F9E79F,stroke:#7D6608,stroke-width:1px,color:#000",
+    "classDef route fill:#FAD7A0,stroke:#935116,stroke-width:1px,color:#000,font-size:10px",
+    "classDef vpn fill:#F5B041,stroke:#784212,stroke-width:2px,color:#fff,font-weight:bold",
+    "classDef dxgw fill:#AF7AC5,stroke:#512E5F,stroke-width:2px,color:#fff,font-weight:bold",
+    "classDef vif fill:#F1948A,stroke:#641E16,stroke-width:2px,color:#fff,font-weight:bold",
+]
+
+
+def unique_peerings(topology):
+    # Each peering is listed under both of its VPCs; yield it once
+    seen = set()
+    for vpc in topology.get("VPCs", []):
+        for p in vpc.get("PeeringConnections", []):
+            if p["VpcPeeringConnectionId"] not in seen:
+                seen.add(p["VpcPeeringConnectionId"])
+                yield p
+
+
+def _peering_lines(topology, link):
+    lines = []
+    for p in unique_peerings(topology):
+        req = p["RequesterVpcInfo"].get("VpcId")
+        acc = p["AccepterVpcInfo"].get("VpcId")
+        if req and acc:
+            lines.append(f'{req} {link} {acc} %% Peering {p["VpcPeeringConnectionId"]}')
+    return lines
+
+
+def _dx_lines(topology, style=""):
+    lines = []
+    for dxgw in topology.get("DirectConnectGateways", []):
+        dxgw_id = dxgw["DirectConnectGatewayId"]
+        lines.append(f'{dxgw_id}["DXGW: {dxgw_id}"]{style and ":::dxgw"}')
+        for vif in dxgw["VirtualInterfaces"]:
+            lines.append(f'{dxgw_id} --> {vif["virtualInterfaceId"]}["VIF: {vif["virtualInterfaceId"]}"]{style and ":::vif"}')
+    return lines
+
+
+def _mermaid(topology, styled):
+    style = ":::" if styled else ""
+    lines = ["graph LR"]
+    if styled:
+        lines += [c for c in STYLE_CLASSES if not c.startswith(("classDef rtb", "classDef route"))]
+        lines.append("linkStyle default stroke-width:2px")
+
+    # TGW ↔ VPC/VPN
+    for tgw in topology.get("TransitGateways", []):
+        tgw_id = tgw["TransitGatewayId"]
+        lines.append(f'{tgw_id}["TGW: {tgw_id}"]{style and ":::tgw"}')
+        for att in tgw["Attachments"]:
+            if att["ResourceType"] == "vpc":
+                lines.append(f'{tgw_id} --- {att["ResourceId"]}["VPC: {att["ResourceId"]}"]{style and ":::vpc"}')
+            elif att["ResourceType"] == "vpn":
+                lines.append(f'{tgw_id} --- {att["ResourceId"]}["VPN: {att["ResourceId"]}"]{style and ":::vpn"}')
+
+    # VPC ↔ Subnet
+    for vpc in topology.get("VPCs", []):
+        lines.append(f'{vpc["VpcId"]}["VPC: {vpc["VpcId"]}"]{style and ":::vpc"}')
+        for sn in vpc["Subnets"]:
+            lines.append(f'{vpc["VpcId"]} --> {sn["SubnetId"]}["Subnet: {sn["SubnetId"]}"]{style and ":::subnet"}')
+
+    # VPC ↔ VPC Peering (dashed when styled)
+    lines += _peering_lines(topology, "-.->" if styled else "---")
+    # DXGW ↔ VIF
+    lines += _dx_lines(topology, style)
+    return "\n".join(lines)
+
+
+def render_mermaid(topology):
+    """Plain Mermaid graph: TGWs, VPCs, subnets, peerings and DX."""
+    return _mermaid(topology, styled=False)
+
+
+def render_mermaid_styled(topology):
+    """The plain graph with a colour class per resource type."""
+    return _mermaid(topology, styled=True)
+
+
+def render_mermaid_clustered(topology):
+    """Styled graph with one subgraph per VPC holding its route tables and subnets."""
+    lines = ["graph LR", *STYLE_CLASSES, "linkStyle default stroke-width:2px"]
+
+    # TGW ↔ Attachments
+    for tgw in topology.get("TransitGateways", []):
+        tgw_id = tgw["TransitGatewayId"]
+        lines.append(f'{tgw_id}["TGW: {tgw_id}"]:::tgw')
+        for att in tgw["Attachments"]:
+            if att["ResourceType"] == "vpc":
+                lines.append(f'{tgw_id} --- {att["ResourceId"]}')
+            elif att["ResourceType"] == "vpn":
+                lines.append(f'{tgw_id} --- {att["ResourceId"]}["VPN: {att["ResourceId"]}"]:::vpn')
+
+    # VPC clusters with RTBs, Subnets, and associations
+    for vpc in topology.get("VPCs", []):
+        lines.append(f"subgraph cluster_{vpc['VpcId']}[\"VPC: {vpc['VpcId']}\"]:::vpc")
+        lines.append("direction TB")
+
+        for rtb in vpc["RouteTables"]:
+            lines.append(f'{rtb["RouteTableId"]}["RTB: {rtb["RouteTableId"]}"]:::rtb')
+
+            # Show routes inside RTB
+            for route in rtb.get("Routes", []):
+                target = route.get("GatewayId") or route.get("TransitGatewayId") or route.get("VpcPeeringConnectionId")
+                if target:
+                    lines.append(f'{rtb["RouteTableId"]} --> "{target}":::route')
+
+            # Link RTB to associated subnets
+            for assoc in rtb.get("Associations", []):
+                if "SubnetId" in assoc:
+                    lines.append(f'{assoc["SubnetId"]} --> {rtb["RouteTableId"]}')
+
+        # Subnets
+        for sn in vpc["Subnets"]:
+            lines.append(f'{sn["SubnetId"]}["Subnet: {sn["SubnetId"]}"]:::subnet')
+
+        lines.append("end")  # Close VPC cluster
+
+    # VPC Peering (dashed)
+    lines += _peering_lines(topology, "-.->")
+    # DXGW ↔ VIF
+    lines += _dx_lines(topology, ":::")
+    return "\n".join(lines)
+
+
+# ==== Level-of-Detail Rendering ====
+# Large estates are drawn as aggregates: subnets collapse into one node per
+# VPC and AZ, and VPC routes fold into one edge per target labelled with the
+# route count. Every level is built in a single pass over the topology.
+
+# Detail levels of render_mermaid_summary, most detailed first
+LEVELS = ("az", "vpc", "tgw")
+
+# Default maximum number of nodes in a summary diagram
+NODE_BUDGET = 500
+
+# Route target keys, in the order a route is checked for them
+ROUTE_TARGETS = (
+    "TransitGatewayId", "VpcPeeringConnectionId", "GatewayId", "NatGatewayId",
+    "NetworkInterfaceId", "VpcEndpointId", "InstanceId",
+)
+
+
+def _route_target(route):
+    return next((route[k] for k in ROUTE_TARGETS if route.get(k)), None)
+
+
+def _route_counts(vpc):
+    # Route target -> number of routes to it across the VPC's route tables;
+    # local routes stay inside the VPC and are left out
+    counts = {}
+    for rtb in vpc.get("RouteTables", []):
+        for route in rtb.get("Routes", []):
+            target = _route_target(route)
+            if target and target != "local":
+                counts[target] = counts.get(target, 0) + 1
+    return counts
+
+
+def _az_counts(vpc):
+    counts = {}
+    for sn in vpc.get("Subnets", []):
+        az = sn.get("AvailabilityZone", "unknown")
+        counts[az] = counts.get(az, 0) + 1
+    return counts
+
+
+def _plural(count, noun):
+    return f"{count} {noun}" + ("" if count == 1 else "s")
+
+
+def _attachment_counts(tgw):
+    counts = {}
+    for att in tgw.get("Attachments", []):
+        counts[att["ResourceType"]] = counts.get(att["ResourceType"], 0) + 1
+    return counts
+
+
+def _summary_lines(topology, level, peer_of):
+    lines = ["graph LR", *STYLE_CLASSES, "linkStyle default stroke-width:2px"]
+    detailed = level != "tgw"
+
+    for tgw in topology.get("TransitGateways", []):
+        tgw_id = tgw["TransitGatewayId"]
+        if detailed:
+            lines.append(f'{tgw_id}["TGW: {tgw_id}"]:::tgw')
+            for att in tgw.get("Attachments", []):
+                if att["ResourceType"] == "vpc":
+                    lines.append(f'{tgw_id} --- {att["ResourceId"]}')
+                elif att["ResourceType"] == "vpn":
+                    lines.append(f'{tgw_id} --- {att["ResourceId"]}["VPN: {att["ResourceId"]}"]:::vpn')
+        else:
+            counts = ", ".join(_plural(n, kind) for kind, n in sorted(_attachment_counts(tgw).items()))
+            lines.append(f'{tgw_id}["TGW: {tgw_id}<br/>{counts or "no attachments"}"]:::tgw')
+
+    if detailed:
+        for vpc in topology.get("VPCs", []):
+            vpc_id = vpc["VpcId"]
+            azs = _az_counts(vpc)
+            if level == "az":
+                lines.append(f'{vpc_id}["VPC: {vpc_id}"]:::vpc')
+                for az, count in azs.items():
+                    lines.append(f'{vpc_id} --> {vpc_id}_{az}["{_plural(count, "subnet")} in {az}"]:::subnet')
+            else:
+                subnets = _plural(sum(azs.values()), "subnet")
+                lines.append(f'{vpc_id}["VPC: {vpc_id}<br/>{subnets} in {_plural(len(azs), "AZ")}"]:::vpc')
+
+            for target, count in _route_counts(vpc).items():
+                label = _plural(count, "route")
+                if target.startswith("tgw-"):
+                    lines.append(f'{vpc_id} -->|"{label}"| {target}')
+                elif target in peer_of:
+                    # Peered VPCs are drawn as themselves, not as the pcx
+                    peer = peer_of[target].get(vpc_id)
+                    if peer:
+                        lines.append(f'{vpc_id} -.->|"{label}"| {peer}')
+                else:
+                    lines.append(f'{vpc_id} -->|"{label}"| {vpc_id}_{target}["{target}"]:::route')
+
+    for dxgw in topology.get("DirectConnectGateways", []):
+        dxgw_id = dxgw["DirectConnectGatewayId"]
+        vifs = _plural(len(dxgw.get("VirtualInterfaces", [])), "VIF")
+        lines.append(f'{dxgw_id}["DXGW: {dxgw_id}<br/>{vifs}"]:::dxgw')
+    return lines
+
+
+def _node_counts(topology, peer_of):
+    # Number of nodes _summary_lines draws at each level. Mermaid also creates
+    # a node for every edge end it has not seen, such as a VPC attached to a
+    # TGW but not in the topology, so node ids are collected, not counted.
+    base = {tgw["TransitGatewayId"] for tgw in topology.get("TransitGateways", [])}
+    base.update(dxgw["DirectConnectGatewayId"] for dxgw in topology.get("DirectConnectGateways", []))
+    nodes = set(base)
+    for tgw in topology.get("TransitGateways", []):
+        nodes.update(att["ResourceId"] for att in tgw.get("Attachments", []) if att["ResourceType"] in ("vpc", "vpn"))
+    azs = 0
+    for vpc in topology.get("VPCs", []):
+        vpc_id = vpc["VpcId"]
+        nodes.add(vpc_id)
+        azs += len(_az_counts(vpc))
+        for target in _route_counts(vpc):
+            if target.startswith("tgw-"):
+                nodes.add(target)
+            elif target in peer_of:
+                peer = peer_of[target].get(vpc_id)
+                if peer:
+                    nodes.add(peer)
+            else:
+                nodes.add(f"{vpc_id}_{target}")
+    return {"az": len(nodes) + azs, "vpc": len(nodes), "tgw": len(base)}
+
+
+def _peers(topology):
+    # VpcPeeringConnectionId -> {VpcId: the VPC on the other side}
+    peer_of = {}
+    for p in unique_peerings(topology):
+        req = p["RequesterVpcInfo"].get("VpcId")
+        acc = p["AccepterVpcInfo"].get("VpcId")
+        if req and acc:
+            peer_of[p["VpcPeeringConnectionId"]] = {req: acc, acc: req}
+    return peer_of
+
+
+def render_mermaid_summary(topology, node_budget=NODE_BUDGET, level=None):
+    """Aggregated Mermaid graph that stays renderable for large estates.
+
+    Draws the most detailed of LEVELS whose node count fits node_budget:
+    "az" collapses subnets to one node per VPC and AZ, "vpc" folds them into
+    the VPC label, and "tgw" keeps only TGWs and DX gateways with attachment
+    and VIF counts. VPC routes become one edge per target labelled with the
+    number of routes. If even "tgw" has too many nodes, the first
+    node_budget - 1 are drawn and a last node says how many were left out.
+    Pass level to force a level regardless of the budget.
+    """
+    peer_of = _peers(topology)
+    truncate = False
+    if level is None:
+        counts = _node_counts(topology, peer_of)
+        level = next((lvl for lvl in LEVELS if counts[lvl] <= node_budget), None)
+        if level is None:
+            level, truncate = LEVELS[-1], True
+    lines = _summary_lines(topology, level, peer_of)
+    if truncate:
+        # At the "tgw" level every line after the graph header and styles draws one node
+        start = 2 + len(STYLE_CLASSES)
+        header, nodes = lines[:start], lines[start:]
+        kept = max(node_budget - 1, 0)
+        lines = header + nodes[:kept] + [f'more_nodes["+{len(nodes) - kept} more"]']
+    lines.insert(1, f"%% level of detail: {level}")
+    return "\n".join(lines)
+
+
+def render_tgw_diagram(topology, tgw_id, vpcs_by_id=None):
+    """Sub-diagram of one TGW: its route tables, attachments and attached VPCs by AZ."""
+    if vpcs_by_id is None:
+        vpcs_by_id = {vpc["VpcId"]: vpc for vpc in topology.get("VPCs", [])}
+    tgw = next(t for t in topology.get("TransitGateways", []) if t["TransitGatewayId"] == tgw_id)
+    lines = ["graph LR", *STYLE_CLASSES, "linkStyle default stroke-width:2px"]
+    lines.append(f'{tgw_id}["TGW: {tgw_id}"]:::tgw')
+
+    resource_of = {}
+    for att in tgw.get("Attachments", []):
+        resource = att["ResourceId"]
+        resource_of[att["TransitGatewayAttachmentId"]] = resource
+        kind = att["ResourceType"]
+        style = ":::vpc" if kind == "vpc" else ":::vpn" if kind == "vpn" else ""
+        lines.append(f'{tgw_id} --- {resource}["{kind.upper()}: {resource}"]{style}')
+        vpc = vpcs_by_id.get(resource) if kind == "vpc" else None
+        if vpc:
+            for az, count in _az_counts(vpc).items():
+                lines.append(f'{resource} --> {resource}_{az}["{_plural(count, "subnet")} in {az}"]:::subnet')
+
+    for rtb in tgw.get("RouteTables", []):
+        rtb_id = rtb["TransitGatewayRouteTableId"]
+        lines.append(f'{tgw_id} --> {rtb_id}["TGW RTB: {rtb_id}"]:::rtb')
+        counts = {}
+        for route in rtb.get("Routes", []):
+            for target in route.get("TransitGatewayAttachments", []):
+                resource = resource_of.get(target["TransitGatewayAttachmentId"], target.get("ResourceId"))
+                if resource:
+                    counts[resource] = counts.get(resource, 0) + 1
+        for resource, count in counts.items():
+            lines.append(f'{rtb_id} -->|"{_plural(count, "route")}"| {resource}')
+    return "\n".join(lines)
+
+
+def render_vpc_diagram(topology, vpc_id, vpcs_by_id=None):
+    """Sub-diagram of one VPC with every route table, route and subnet."""
+    if vpcs_by_id is None:
+        vpcs_by_id = {vpc["VpcId"]: vpc for vpc in topology.get("VPCs", [])}
+    return render_mermaid_clustered({"VPCs": [vpcs_by_id[vpc_id]]})
+
+
+def iter_subdiagrams(topology):
+    """Yield (entity id, Mermaid text) for every TGW and every VPC."""
+    vpcs_by_id = {vpc["VpcId"]: vpc for vpc in topology.get("VPCs", [])}
+    for tgw in topology.get("TransitGateways", []):
+        yield tgw["TransitGatewayId"], render_tgw_diagram(topology, tgw["TransitGatewayId"], vpcs_by_id)
+    for vpc_id in vpcs_by_id:
+        yield vpc_id, render_vpc_diagram(topology, vpc_id, vpcs_by_id)
+
+
+def render_json(topology):
+    return json.dumps(topology, indent=2, default=str)
+
+
+# Renderer name -> (render function, file suffix)
+RENDERERS = {
+    "json": (render_json, ".json"),
+    "mermaid": (render_mermaid, ".mmd"),
+    "mermaid-styled": (render_mermaid_styled, ".styled.mmd"),
+    "mermaid-clustered": (render_mermaid_clustered, ".clustered.mmd"),
+    "mermaid-summary": (render_mermaid_summary, ".summary.mmd"),
+    "svg": (render_svg, ".svg"),
+    "html": (render_html, ".html"),
+}
+# Renderers that draw the same placed layout
+LAYOUT_RENDERERS = ("svg", "html")
+
+
+def render_all(topology, basename, names=None):
+    """Write topology through each named renderer (all by default) to basename + suffix.
+
+    The SVG/HTML layout is computed once and shared by both. Returns the
+    list of files written.
+    """
+    written, placed = [], None
+    for name in names or RENDERERS:
+        render, suffix = RENDERERS[name]
+        path = basename + suffix
+        kwargs = {}
+        if name in LAYOUT_RENDERERS:
+            placed = placed or layout(topology)
+            kwargs["placed"] = placed
+        with open(path, "w") as f:
+            f.write(render(topology, **kwargs))
+        written.append(path)
+    return written
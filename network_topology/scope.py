@@ -0,0 +1,121 @@
+from network_topology.fetch import paginate
+
+# ==== Scoped Collection ====
+# Fetches only the slice of an account around selected TGWs and VPCs. The
+# selection is pushed down into EC2 Filters, and the crawl follows edges
+# outward one hop from the seeds:
+#   - a selected TGW brings in its attachments, route tables and VPNs, and
+#     the VPCs and DX gateways attached to it
+#   - a selected VPC brings in its subnets, route tables, peerings and VGW
+#     VPNs, and the TGWs it is attached to (but not their other VPCs)
+# A scope is a dict with any of:
+#   {"TransitGatewayIds": [...], "VpcIds": [...], "Tags": {"key": ["value", ...]}}
+# Tag selectors pick TGWs and VPCs with all the given tags; an empty value
+# list matches any value of that key.
+
+# Most values EC2 accepts in one filter
+FILTER_VALUE_LIMIT = 200
+
+
+def tag_filters(tags):
+    return [
+        {"Name": f"tag:{key}", "Values": list(values)} if values else {"Name": "tag-key", "Values": [key]}
+        for key, values in tags.items()
+    ]
+
+
+def _filtered(client, operation, result_key, name, values):
+    # paginate() with a Filter on name, one call per FILTER_VALUE_LIMIT values.
+    # Nothing is fetched for an empty selection: an unfiltered call would return everything
+    values = sorted(set(values))
+    for start in range(0, len(values), FILTER_VALUE_LIMIT):
+        filters = [{"Name": name, "Values": values[start:start + FILTER_VALUE_LIMIT]}]
+        yield from paginate(client, operation, result_key, Filters=filters)
+
+
+def _unique(items, key):
+    # Items fetched by several filtered calls, each kept once in first-seen order
+    unique = {}
+    for item in items:
+        unique.setdefault(item[key], item)
+    return list(unique.values())
+
+
+def fetch_scoped(ec2, dx, scope):
+    """The base collections iter_topology assembles, limited to scope.
+
+    Returns the same keys as an unscoped fetch; collections that cannot be
+    filtered server-side (DX virtual interfaces) are filtered after the call.
+    """
+    seed_tgws = set(scope.get("TransitGatewayIds", []))
+    seed_vpcs = set(scope.get("VpcIds", []))
+    tags = tag_filters(scope.get("Tags") or {})
+    if tags:
+        seed_tgws.update(t["TransitGatewayId"] for t in paginate(
+            ec2, "describe_transit_gateways", "TransitGateways", Filters=tags))
+        seed_vpcs.update(v["VpcId"] for v in paginate(ec2, "describe_vpcs", "Vpcs", Filters=tags))
+
+    # --- TGWs: the selected ones plus those the selected VPCs attach to ---
+    tgw_ids = set(seed_tgws)
+    tgw_ids.update(att["TransitGatewayId"] for att in _filtered(
+        ec2, "describe_transit_gateway_attachments", "TransitGatewayAttachments", "resource-id", seed_vpcs))
+    tgws = list(_filtered(ec2, "describe_transit_gateways", "TransitGateways", "transit-gateway-id", tgw_ids))
+    attachments = list(_filtered(
+        ec2, "describe_transit_gateway_attachments", "TransitGatewayAttachments", "transit-gateway-id", tgw_ids))
+    route_tables = list(_filtered(
+        ec2, "describe_transit_gateway_route_tables", "TransitGatewayRouteTables", "transit-gateway-id", tgw_ids))
+
+    # --- VPCs and DX gateways hanging off the selected TGWs ---
+    vpc_ids, dxgw_ids = set(seed_vpcs), set()
+    for att in attachments:
+        if att["TransitGatewayId"] in seed_tgws and att.get("ResourceType") == "vpc":
+            vpc_ids.add(att["ResourceId"])
+        elif att["TransitGatewayId"] in seed_tgws and att.get("ResourceType") == "direct-connect-gateway":
+            dxgw_ids.add(att["ResourceId"])
+
+    # --- VPNs on the TGWs or on VGWs attached to the VPCs ---
+    vpn_gateways = list(_filtered(ec2, "describe_vpn_gateways", "VpnGateways", "attachment.vpc-id", vpc_ids))
+    vpn_connections = _unique(
+        list(_filtered(ec2, "describe_vpn_connections", "VpnConnections", "transit-gateway-id", tgw_ids))
+        + list(_filtered(ec2, "describe_vpn_connections", "VpnConnections", "vpn-gateway-id",
+                         [vgw["VpnGatewayId"] for vgw in vpn_gateways])),
+        "VpnConnectionId"
+    )
+    customer_gateways = list(_filtered(
+        ec2, "describe_customer_gateways", "CustomerGateways", "customer-gateway-id",
+        [vpn["CustomerGatewayId"] for vpn in vpn_connections if vpn.get("CustomerGatewayId")]))
+
+    # --- Peerings with either end in scope ---
+    peerings = _unique(
+        list(_filtered(ec2, "describe_vpc_peering_connections", "VpcPeeringConnections",
+                       "requester-vpc-info.vpc-id", vpc_ids))
+        + list(_filtered(ec2, "describe_vpc_peering_connections", "VpcPeeringConnections",
+                         "accepter-vpc-info.vpc-id", vpc_ids)),
+        "VpcPeeringConnectionId"
+    )
+
+    # --- DX gateways; VIFs cannot be filtered by gateway, so they are filtered here ---
+    dx_gateways, dx_virtual_interfaces = [], []
+    if dxgw_ids:
+        for dxgw_id in sorted(dxgw_ids):
+            dx_gateways.extend(paginate(
+                dx, "describe_direct_connect_gateways", "directConnectGateways", directConnectGatewayId=dxgw_id))
+        dx_virtual_interfaces = [
+            vif for vif in paginate(dx, "describe_virtual_interfaces", "virtualInterfaces")
+            if vif.get("directConnectGatewayId") in dxgw_ids
+        ]
+
+    return {
+        "TransitGateways": tgws,
+        "TransitGatewayAttachments": attachments,
+        "TransitGatewayRouteTables": route_tables,
+        "Vpcs": list(_filtered(ec2, "describe_vpcs", "Vpcs", "vpc-id", vpc_ids)),
+        "Subnets": _filtered(ec2, "describe_subnets", "Subnets", "vpc-id", vpc_ids),
+        "RouteTables": _filtered(ec2, "describe_route_tables", "RouteTables", "vpc-id", vpc_ids),
+        "VpnConnections": vpn_connections,
+        "CustomerGateways": customer_gateways,
+        "VpnGateways": vpn_gateways,
+        "VpcPeeringConnections": peerings,
+        "DirectConnectGateways": dx_gateways,
+        "VirtualInterfaces": dx_virtual_interfaces,
+    }
@@ -0,0 +1,140 @@
+import threading
+import time
+
+import boto3
+import botocore.session
+from botocore.credentials import CredentialProvider, CredentialResolver, RefreshableCredentials
+
+# Refresh assumed-role credentials once they are this close to expiry
+ADVISORY_REFRESH_SECONDS = 15 * 60
+# After this, callers block until fresh credentials arrive
+MANDATORY_REFRESH_SECONDS = 5 * 60
+# How often the background thread checks cached credentials
+REFRESH_CHECK_SECONDS = 60
+
+_lock = threading.Lock()
+_key_locks = {}
+_sessions = {}  # (role_arn, session_name, region) -> boto3 Session
+_clients = {}   # (role_arn, session_name, region, service) -> client
+_client_hooks = []  # called with every client this module builds
+_refresher = None
+
+
+def _key_lock(key):
+    with _lock:
+        return _key_locks.setdefault(key, threading.Lock())
+
+
+def _run_client_hooks(client):
+    for hook in list(_client_hooks):
+        hook(client)
+    return client
+
+
+def on_new_client(hook):
+    """Call hook(client) for every cached client and every client built from now on."""
+    with _lock:
+        _client_hooks.append(hook)
+        existing = list(_clients.values())
+    for client in existing:
+        hook(client)
+
+
+def remove_client_hook(hook):
+    """Stop calling hook for new clients; clients it already ran on are left as they are."""
+    with _lock:
+        if hook in _client_hooks:
+            _client_hooks.remove(hook)
+
+
+def _assume_role_fetcher(role_arn, session_name, region):
+    sts = _run_client_hooks(boto3.session.Session().client("sts", region_name=region))
+
+    def fetch():
+        creds = sts.assume_role(
+            RoleArn=role_arn,
+            RoleSessionName=session_name
+        )["Credentials"]
+        return {
+            "access_key": creds["AccessKeyId"],
+            "secret_key": creds["SecretAccessKey"],
+            "token": creds["SessionToken"],
+            "expiry_time": creds["Expiration"].isoformat()
+        }
+
+    return fetch
+
+
+class _AssumeRoleProvider(CredentialProvider):
+    # The session's only credential source: assume the role, then keep
+    # re-assuming it ahead of expiry
+    METHOD = "sts-assume-role"
+
+    def __init__(self, fetch):
+        super().__init__()
+        self._fetch = fetch
+
+    def load(self):
+        return RefreshableCredentials.create_from_metadata(
+            metadata=self._fetch(),
+            refresh_using=self._fetch,
+            method=self.METHOD,
+            advisory_timeout=ADVISORY_REFRESH_SECONDS,
+            mandatory_timeout=MANDATORY_REFRESH_SECONDS
+        )
+
+
+def _refresh_loop():
+    # Touching the credentials inside the advisory window refreshes them, so
+    # request threads find fresh tokens instead of waiting on STS
+    while True:
+        time.sleep(REFRESH_CHECK_SECONDS)
+        with _lock:
+            cached = list(_sessions.values())
+        for session in cached:
+            try:
+                session.get_credentials().get_frozen_credentials()
+            except Exception as e:
+                print(f"⚠️ Background credential refresh failed: {e}")
+
+
+def _start_refresher():
+    global _refresher
+    with _lock:
+        if _refresher is None:
+            _refresher = threading.Thread(target=_refresh_loop, name="sts-refresh", daemon=True)
+            _refresher.start()
+
+
+def assumed_role_session(role_arn, session_name, region=None):
+    """Return a cached boto3 session for role_arn whose credentials refresh themselves."""
+    key = (role_arn, session_name, region)
+    with _key_lock(key):
+        if key not in _sessions:
+            core = botocore.session.get_session()
+            provider = _AssumeRoleProvider(_assume_role_fetcher(role_arn, session_name, region))
+            core.register_component("credential_provider", CredentialResolver(providers=[provider]))
+            if region:
+                core.set_config_variable("region", region)
+            session = boto3.session.Session(botocore_session=core)
+            # Assume the role now, so a bad role ARN fails here rather than
+            # on the first API call
+            session.get_credentials()
+            _sessions[key] = session
+    _start_refresher()
+    return _sessions[key]
+
+
+def get_client(service, role_arn, session_name, region=None, config=None):
+    """Return a cached client for service under role_arn in region.
+
+    Clients are thread safe and keep their connection pool between calls,
+    so every caller for the same account/region/service shares one warm
+    pool. config is only applied when the client is first built.
+    """
+    key = (role_arn, session_name, region, service)
+    with _key_lock(key):
+        if key not in _clients:
+            session = assumed_role_session(role_arn, session_name, region)
+            _clients[key] = _run_client_hooks(session.client(service, config=config))
+    return _clients[key]
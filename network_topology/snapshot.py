@@ -0,0 +1,421 @@
+import glob
+import gzip
+import hashlib
+import json
+import os
+import time
+from datetime import datetime, timezone
+from functools import partial
+
+# Resource types compared by diff_topologies: name -> (walk, id key)
+# where walk(topology) yields every resource of that type.
+DIFF_TYPES = {
+    "TransitGateways": (lambda t: (_tgw_content(tgw) for tgw in t.get("TransitGateways", [])), "TransitGatewayId"),
+    "TransitGatewayAttachments": (
+        lambda t: (a for tgw in t.get("TransitGateways", []) for a in tgw.get("Attachments", [])),
+        "TransitGatewayAttachmentId"
+    ),
+    "TransitGatewayRouteTables": (
+        lambda t: (_route_table_content(r) for tgw in t.get("TransitGateways", []) for r in tgw.get("RouteTables", [])),
+        "TransitGatewayRouteTableId"
+    ),
+    "VPCs": (lambda t: t.get("VPCs", []), "VpcId"),
+    "Subnets": (lambda t: (sn for vpc in t.get("VPCs", []) for sn in vpc.get("Subnets", [])), "SubnetId"),
+    "RouteTables": (lambda t: (rt for vpc in t.get("VPCs", []) for rt in vpc.get("RouteTables", [])), "RouteTableId"),
+    "PeeringConnections": (
+        lambda t: (p for vpc in t.get("VPCs", []) for p in vpc.get("PeeringConnections", [])),
+        "VpcPeeringConnectionId"
+    ),
+    "VPNConnections": (
+        lambda t: (
+            vpn
+            for section in ("TransitGateways", "VPCs")
+            for entity in t.get(section, [])
+            for vpn in entity.get("VPNConnections", [])
+        ),
+        "VpnConnectionId"
+    ),
+    "DirectConnectGateways": (lambda t: t.get("DirectConnectGateways", []), "DirectConnectGatewayId"),
+    "VirtualInterfaces": (
+        lambda t: (v for dxgw in t.get("DirectConnectGateways", []) for v in dxgw.get("VirtualInterfaces", [])),
+        "virtualInterfaceId"
+    ),
+}
+
+ROUTE_TABLE_DETAILS = ("Routes", "BlackholeRoutes", "Associations", "Propagations", "LastSearched")
+
+# Reused TGW route tables are searched again once their routes are this old.
+# Static route and blackhole changes show up nowhere but in the routes
+# themselves, so this bounds how long such a change can go unseen.
+MAX_ROUTE_AGE_SECONDS = 6 * 3600
+
+# Clock for LastSearched stamps and their age; tests replace it
+_now = time.time
+
+# CIDR association states in which a VPC block is routed
+ASSOCIATED_STATES = {"associated", "associating"}
+
+
+# One shared encoder; json.dumps builds a new one per call when given options
+_compact = json.JSONEncoder(separators=(",", ":"), default=str).encode
+
+
+def _route_table_content(rtb):
+    # LastSearched is bookkeeping, not a change to the route table
+    if "LastSearched" not in rtb:
+        return rtb
+    return {k: v for k, v in rtb.items() if k != "LastSearched"}
+
+
+def _tgw_content(tgw):
+    if not any("LastSearched" in rtb for rtb in tgw.get("RouteTables", [])):
+        return tgw
+    return dict(tgw, RouteTables=[_route_table_content(rtb) for rtb in tgw["RouteTables"]])
+
+
+def search_stamp():
+    """LastSearched value for TGW route tables searched now (UTC, ISO 8601)."""
+    return datetime.fromtimestamp(_now(), timezone.utc).isoformat(timespec="seconds")
+
+
+def normalize(obj):
+    # Same shape the object has after a json.dump(default=str) / json.load round trip
+    return json.loads(json.dumps(obj, default=str))
+
+
+def open_snapshot(path):
+    # Snapshots may be plain, gzip or zstd compressed JSON
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt")
+    if path.endswith(".zst"):
+        import zstandard
+        return zstandard.open(path, "rt")
+    return open(path)
+
+
+def load_snapshot(path):
+    """Load a JSON (plain, .gz or .zst) or columnar (.cols directory) snapshot."""
+    if os.path.isdir(path):
+        from network_topology.columnar import load_columnar
+        return load_columnar(path).to_topology()
+    with open_snapshot(path) as f:
+        return json.load(f)
+
+
+def snapshot_basename(path):
+    # network_topology_<ts>.json.gz / network_topology_<ts>.cols -> network_topology_<ts>
+    return path.rstrip("/").split(".json")[0].split(".cols")[0]
+
+
+def merge_accounts(topology):
+    """Flatten a multi-account crawl into one topology; others are returned as is.
+
+    Shared TGWs connect VPCs across accounts, so estate-wide analyses look
+    at every account and region together.
+    """
+    if "Accounts" not in topology:
+        return topology
+    merged = {section: [] for section in ("TransitGateways", "VPCs", "DirectConnectGateways")}
+    for regions in topology["Accounts"].values():
+        for regional in regions.values():
+            for section in merged:
+                merged[section].extend((regional or {}).get(section, []))
+    # A stitched global crawl keeps its DX gateways at the top level
+    merged["DirectConnectGateways"].extend(topology.get("DirectConnectGateways", []))
+    return merged
+
+
+def latest_snapshot_path(pattern="network_topology_*.json*", max_age_seconds=None):
+    """Path of the newest single-account snapshot matching pattern, or None.
+
+    Snapshots older than max_age_seconds are ignored, which forces a full
+    refresh now and then.
+    """
+    # Diffs and analysis reports share the snapshot name prefix but add a
+    # suffix of their own (network_topology_<ts>.diff.json), and multi-account
+    # crawls add _multi_ (network_topology_multi_<ts>.json)
+    paths = [
+        p for p in glob.glob(pattern)
+        if "." not in os.path.basename(snapshot_basename(p)) and "_multi_" not in os.path.basename(p)
+    ]
+    if not paths:
+        return None
+    path = max(paths, key=os.path.getmtime)
+    if max_age_seconds is not None and time.time() - os.path.getmtime(path) > max_age_seconds:
+        return None
+    return path
+
+
+def load_latest_snapshot(pattern="network_topology_*.json*", max_age_seconds=None):
+    """Return (path, topology) of the newest single-account snapshot matching pattern, or (None, None)."""
+    path = latest_snapshot_path(pattern, max_age_seconds)
+    if path is None:
+        return None, None
+    topology = load_snapshot(path)
+    # A crawl or stitched document has nothing to reuse or diff against
+    if "Accounts" in topology or "TransitGateways" not in topology:
+        return None, None
+    return path, topology
+
+
+_decoder = json.JSONDecoder()
+
+
+def iter_snapshot(path, chunk_size=1 << 20):
+    """Yield (key, item) for every item of every top-level list in a JSON snapshot.
+
+    The file is read chunk_size characters at a time and each item is
+    decoded on its own, so memory holds one item rather than the document.
+    Top-level values that are not lists are yielded whole, as (key, value).
+    Columnar snapshots are loaded and walked.
+    """
+    if os.path.isdir(path):
+        for key, value in load_snapshot(path).items():
+            yield from ((key, item) for item in value) if isinstance(value, list) else [(key, value)]
+        return
+
+    with open_snapshot(path) as f:
+        buf, pos, eof = "", 0, False
+
+        def fill():
+            nonlocal buf, pos, eof
+            data = f.read(chunk_size)
+            eof = not data
+            buf, pos = buf[pos:] + data, 0
+
+        def peek():
+            # Next non-whitespace character, without consuming it; "" at the end
+            nonlocal pos
+            while True:
+                while pos < len(buf) and buf[pos].isspace():
+                    pos += 1
+                if pos < len(buf) or eof:
+                    return buf[pos:pos + 1]
+                fill()
+
+        def take(expected):
+            nonlocal pos
+            char = peek()
+            if char not in expected:
+                raise ValueError(f"{path}: expected one of {expected!r}, found {char!r}")
+            pos += 1
+            return char
+
+        def value():
+            # A value may run past the buffer (or, for a number, stop at its end): read on and retry
+            nonlocal pos
+            peek()
+            while True:
+                try:
+                    item, end = _decoder.raw_decode(buf, pos)
+                    if end < len(buf) or eof:
+                        pos = end
+                        return item
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                fill()
+
+        take("{")
+        if peek() == "}":
+            return
+        while True:
+            key = value()
+            take(":")
+            if peek() == "[":
+                take("[")
+                if peek() == "]":
+                    take("]")
+                else:
+                    while True:
+                        yield key, value()
+                        if take(",]") == "]":
+                            break
+            else:
+                yield key, value()
+            if take(",}") == "}":
+                return
+
+
+def _attachment_fingerprint(attachments):
+    # What decides a TGW's propagated routes: which attachments exist, their
+    # state and the route table each one is associated with
+    fingerprint = []
+    for att in attachments:
+        assoc = att.get("Association") or {}
+        fingerprint.append((
+            att["TransitGatewayAttachmentId"],
+            att.get("State"),
+            assoc.get("TransitGatewayRouteTableId"),
+            assoc.get("State")
+        ))
+    return sorted(fingerprint)
+
+
+def vpc_cidrs(vpc):
+    """Sorted IPv4 and IPv6 blocks associated with a VPC, from DescribeVpcs or a snapshot.
+
+    Snapshots taken before association sets were collected fall back to
+    the primary CidrBlock.
+    """
+    blocks = {
+        a["CidrBlock"] for a in vpc.get("CidrBlockAssociationSet", [])
+        if a.get("CidrBlockState", {}).get("State") in ASSOCIATED_STATES
+    }
+    blocks.update(
+        a["Ipv6CidrBlock"] for a in vpc.get("Ipv6CidrBlockAssociationSet", [])
+        if a.get("Ipv6CidrBlockState", {}).get("State") in ASSOCIATED_STATES
+    )
+    if not vpc.get("CidrBlockAssociationSet") and vpc.get("CidrBlock"):
+        blocks.add(vpc["CidrBlock"])
+    return sorted(blocks)
+
+
+def _kept_routes(old_rtb, old_cidrs, cidrs, associations, propagations):
+    # The previous Routes and BlackholeRoutes, if nothing that feeds them has changed
+    if normalize(associations) != old_rtb.get("Associations", []):
+        return None
+    if normalize(propagations) != old_rtb.get("Propagations", []):
+        return None
+    for prop in propagations:
+        if prop.get("State") != "enabled":
+            continue
+        # VPN, DX gateway and Connect propagations carry BGP-learned routes,
+        # which change without any change visible here
+        if prop.get("ResourceType") != "vpc":
+            return None
+        # A VPC propagates its CIDRs; VPCs in other accounts can't be checked
+        vpc_id = prop.get("ResourceId")
+        if vpc_id not in cidrs or cidrs[vpc_id] != old_cidrs.get(vpc_id):
+            return None
+    routes = {"Routes": json.loads(old_rtb["Routes"]), "BlackholeRoutes": old_rtb.get("BlackholeRoutes", [])}
+    return routes, old_rtb["LastSearched"]
+
+
+def _add_to_state(state, topology):
+    for tgw in topology.get("TransitGateways", []):
+        state["Attachments"][tgw["TransitGatewayId"]] = _attachment_fingerprint(tgw.get("Attachments", []))
+        for rtb in tgw.get("RouteTables", []):
+            # Routes as text take a fraction of the memory of the parsed dicts
+            state["RouteTables"][rtb["TransitGatewayRouteTableId"]] = dict(rtb, Routes=_compact(rtb.get("Routes", [])))
+    for vpc in topology.get("VPCs", []):
+        state["VpcCidrs"][vpc["VpcId"]] = vpc_cidrs(vpc)
+    return state
+
+
+def previous_state(topology):
+    """What an incremental refresh needs from the previous snapshot.
+
+    Holding this instead of the snapshot lets the snapshot be freed before
+    the new one is collected. Returns a dict with:
+    - Attachments: TGW id -> _attachment_fingerprint of its attachments
+    - RouteTables: TGW route table id -> the route table as saved, with
+      Routes kept as compact JSON text until they are reused
+    - VpcCidrs: VPC id -> vpc_cidrs
+    """
+    return _add_to_state({"Attachments": {}, "RouteTables": {}, "VpcCidrs": {}}, topology)
+
+
+def scan_snapshot(path):
+    """(previous_state, fingerprint) of the snapshot at path, read one entity at a time.
+
+    Unlike load_snapshot, the whole document is never in memory at once.
+    Returns (None, None) for a document that is not a single-account
+    topology, such as a multi-account crawl.
+    """
+    from network_topology.collect import SECTIONS
+    state, fingerprints = previous_state({}), {}
+    for section, entity in iter_snapshot(path):
+        if section not in SECTIONS:
+            return None, None
+        _add_to_state(state, {section: [entity]})
+        fingerprint({section: [entity]}, fingerprints)
+    return state, fingerprints
+
+
+def reusable_route_tables(previous, tgw_route_tables, attachments_by_tgw, vpcs, max_age_seconds=MAX_ROUTE_AGE_SECONDS):
+    """Map route table id -> check for route tables whose Routes may be reused.
+
+    previous is a previous_state. A route table is a candidate if it exists
+    in the previous snapshot with the same describe record, was last
+    searched less than max_age_seconds ago, and its TGW's attachments (ids,
+    states and associations) are unchanged. Its Associations and
+    Propagations are still fetched; check(associations, propagations)
+    returns ({"Routes": ..., "BlackholeRoutes": ...} as saved, their
+    LastSearched) only if both match the previous snapshot and every
+    enabled propagation is from a VPC in vpcs whose CIDRs are unchanged,
+    and None otherwise. Tables with dynamic (BGP) propagations are always
+    re-searched.
+    """
+    old_rtbs = previous["RouteTables"]
+    old_attachments = previous["Attachments"]
+    cidrs = {vpc["VpcId"]: vpc_cidrs(vpc) for vpc in vpcs}
+    now = _now()
+
+    reusable = {}
+    for rtb in tgw_route_tables:
+        rtb_id, tgw_id = rtb["TransitGatewayRouteTableId"], rtb["TransitGatewayId"]
+        old_rtb = old_rtbs.get(rtb_id)
+        if not old_rtb or tgw_id not in old_attachments:
+            continue
+        # Snapshots from before LastSearched was kept count as expired
+        searched = old_rtb.get("LastSearched")
+        if not searched or now - datetime.fromisoformat(searched).timestamp() >= max_age_seconds:
+            continue
+        if old_attachments[tgw_id] != _attachment_fingerprint(normalize(attachments_by_tgw.get(tgw_id, []))):
+            continue
+        old_record = {k: v for k, v in old_rtb.items() if k not in ROUTE_TABLE_DETAILS}
+        if old_record != normalize(rtb):
+            continue
+        reusable[rtb_id] = partial(_kept_routes, old_rtb, previous["VpcCidrs"], cidrs)
+    return reusable
+
+
+def _digest(item):
+    return hashlib.sha1(json.dumps(item, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def fingerprint(topology, into=None):
+    """Map resource type -> {id: content digest} for every resource in topology."""
+    fingerprints = into if into is not None else {}
+    for name, (walk, id_key) in DIFF_TYPES.items():
+        bucket = fingerprints.setdefault(name, {})
+        for item in walk(topology):
+            bucket[item[id_key]] = _digest(item)
+    return fingerprints
+
+
+def fingerprint_stream(entities, into):
+    """Pass (section, entity) pairs through, fingerprinting each one into `into`.
+
+    Lets a streamed topology be diffed without keeping it in memory.
+    """
+    for section, entity in entities:
+        fingerprint({section: [entity]}, into)
+        yield section, entity
+
+
+def diff_fingerprints(old, new):
+    """Structural diff: added/removed/modified ids per resource type.
+
+    Types without changes are left out, so an unchanged estate diffs to {}.
+    """
+    diff = {}
+    for name in DIFF_TYPES:
+        old_items, new_items = old.get(name, {}), new.get(name, {})
+        changes = {
+            "added": sorted(new_items.keys() - old_items.keys()),
+            "removed": sorted(old_items.keys() - new_items.keys()),
+            "modified": sorted(
+                key for key in new_items.keys() & old_items.keys()
+                if new_items[key] != old_items[key]
+            ),
+        }
+        changes = {k: v for k, v in changes.items() if v}
+        if changes:
+            diff[name] = changes
+    return diff
+
+
+def diff_topologies(old, new):
+    return diff_fingerprints(fingerprint(old), fingerprint(new))
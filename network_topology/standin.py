@@ -0,0 +1,377 @@
+import datetime
+import ipaddress
+import json
+import random
+import threading
+import time
+from urllib.parse import parse_qs
+from xml.sax.saxutils import escape
+
+import boto3
+from botocore.awsrequest import AWSResponse
+
+# ==== Local EC2 / Direct Connect Stand-in ====
+# Answers the describe/search/get calls the collectors make from an
+# in-memory estate, so they can be run and timed without AWS. Real boto3
+# clients are used: requests are built, signed, retried and parsed as
+# usual, and only the HTTP round-trip is replaced, with optional latency
+# and throttling injected per attempt.
+
+# Operations whose items belong to one parent: operation -> request parameter naming it
+KEYED_BY = {
+    "SearchTransitGatewayRoutes": "TransitGatewayRouteTableId",
+    "GetTransitGatewayRouteTableAssociations": "TransitGatewayRouteTableId",
+    "GetTransitGatewayRouteTablePropagations": "TransitGatewayRouteTableId",
+}
+
+# EC2 filter name -> the values an item has for it; tag:<key> filters are built in
+FILTER_FIELDS = {
+    "transit-gateway-id": lambda item: [item.get("TransitGatewayId")],
+    "vpc-id": lambda item: [item.get("VpcId")],
+    "resource-id": lambda item: [item.get("ResourceId")],
+    "vpn-gateway-id": lambda item: [item.get("VpnGatewayId")],
+    "customer-gateway-id": lambda item: [item.get("CustomerGatewayId")],
+    "state": lambda item: [item.get("State")],
+    "attachment.vpc-id": lambda item: [att.get("VpcId") for att in item.get("VpcAttachments", [])],
+    "requester-vpc-info.vpc-id": lambda item: [item.get("RequesterVpcInfo", {}).get("VpcId")],
+    "accepter-vpc-info.vpc-id": lambda item: [item.get("AccepterVpcInfo", {}).get("VpcId")],
+    "tag-key": lambda item: [tag["Key"] for tag in item.get("Tags", [])],
+}
+
+# Direct Connect parameters that select items by id
+ID_PARAMS = ("directConnectGatewayId", "virtualInterfaceId", "connectionId")
+
+PAGE_SIZE_PARAMS = ("MaxResults", "maxResults")
+TOKEN_PARAMS = ("NextToken", "nextToken")
+
+# Throttling responses by protocol: (status, error code)
+THROTTLE_RESPONSES = {
+    "ec2": (503, "RequestLimitExceeded"),
+    "json": (400, "ThrottlingException"),
+}
+
+
+class _Body:
+    def __init__(self, body):
+        self.body = body
+
+    def stream(self, **kwargs):
+        yield self.body
+
+
+def _xml(shape, value):
+    # Inverse of botocore's EC2 response parser for the shapes it reads
+    if shape.type_name == "structure":
+        parts = []
+        for name, member in shape.members.items():
+            if name in value and value[name] is not None:
+                tag = member.serialization.get("name", name)
+                parts.append(f"<{tag}>{_xml(member, value[name])}</{tag}>")
+        return "".join(parts)
+    if shape.type_name == "list":
+        tag = shape.member.serialization.get("name", "member")
+        return "".join(f"<{tag}>{_xml(shape.member, item)}</{tag}>" for item in value)
+    if shape.type_name == "boolean":
+        return "true" if value else "false"
+    if shape.type_name == "timestamp":
+        return value.isoformat() if isinstance(value, datetime.datetime) else str(value)
+    return escape(str(value))
+
+
+def _filters(params):
+    # Filter.N.Name / Filter.N.Value.M query parameters -> [(name, values)]
+    filters = {}
+    for key, value in params.items():
+        parts = key.split(".")
+        if parts[0] == "Filter" and parts[2] == "Name":
+            filters.setdefault(parts[1], [None, []])[0] = value
+        elif parts[0] == "Filter" and parts[2] == "Value":
+            filters.setdefault(parts[1], [None, []])[1].append(value)
+    return list(filters.values())
+
+
+def _field(name):
+    if name.startswith("tag:"):
+        key = name[4:]
+        return lambda item: [tag["Value"] for tag in item.get("Tags", []) if tag["Key"] == key]
+    return FILTER_FIELDS[name]
+
+
+def _json_default(value):
+    if isinstance(value, datetime.datetime):
+        return value.timestamp()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+class StandIn:
+    """Serves the collectors' EC2 and Direct Connect calls from an estate.
+
+    estate maps service name -> API operation name -> items, or for the
+    KEYED_BY operations -> parent id -> items (see synthetic_estate). EC2
+    Filters in FILTER_FIELDS and the DX ID_PARAMS are applied. Each
+    attempt sleeps latency plus up to jitter seconds, then fails with the
+    service's throttling error with probability throttle_rate.
+    """
+
+    def __init__(self, estate, latency=0.0, jitter=0.0, throttle_rate=0.0, seed=0):
+        self.estate = estate
+        self.latency = latency
+        self.jitter = jitter
+        self.throttle_rate = throttle_rate
+        self.requests = self.throttled = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def attach(self, client):
+        service_model = client.meta.service_model
+
+        def send(request, **kwargs):
+            return self._send(service_model, request)
+
+        client.meta.events.register("before-send", send)
+
+    def _params(self, service_model, request):
+        body = request.body or b""
+        if isinstance(body, bytes):
+            body = body.decode()
+        if service_model.protocol == "ec2":
+            params = {k: v[0] for k, v in parse_qs(body, keep_blank_values=True).items()}
+            return params.pop("Action"), params
+        target = request.headers["X-Amz-Target"]
+        target = target.decode() if isinstance(target, bytes) else target
+        return target.split(".", 1)[1], json.loads(body or "{}")
+
+    def _send(self, service_model, request):
+        with self._lock:
+            self.requests += 1
+            delay = self.latency + self._random.uniform(0, self.jitter)
+            throttle = self._random.random() < self.throttle_rate
+            self.throttled += throttle
+        if delay:
+            time.sleep(delay)
+
+        protocol = service_model.protocol
+        if throttle:
+            return self._error(request, protocol, *THROTTLE_RESPONSES[protocol], "Rate exceeded")
+
+        operation, params = self._params(service_model, request)
+        output = service_model.operation_model(operation).output_shape
+        try:
+            result = self._page(service_model.service_name, operation, params, output)
+        except KeyError as e:
+            return self._error(request, protocol, 400, "InvalidParameterValue", f"Unknown filter: {e}")
+        if protocol == "ec2":
+            body = (f'<{operation}Response xmlns="http://ec2.amazonaws.com/doc/{service_model.api_version}/">'
+                    f"<requestId>standin</requestId>{_xml(output, result)}</{operation}Response>")
+        else:
+            body = json.dumps(result, default=_json_default)
+        return AWSResponse(request.url, 200, {}, _Body(body.encode()))
+
+    def _error(self, request, protocol, status, code, message):
+        if protocol == "ec2":
+            body = (f"<Response><Errors><Error><Code>{code}</Code><Message>{escape(message)}</Message>"
+                    f"</Error></Errors><RequestID>standin</RequestID></Response>")
+        else:
+            body = json.dumps({"__type": code, "message": message})
+        return AWSResponse(request.url, status, {}, _Body(body.encode()))
+
+    def _page(self, service, operation, params, output):
+        items = self.estate.get(service, {}).get(operation, [])
+        if operation in KEYED_BY:
+            items = items.get(params.get(KEYED_BY[operation]), [])
+        for name, values in _filters(params):
+            field, wanted = _field(name), set(values)
+            items = [item for item in items if wanted.intersection(field(item))]
+        for name in ID_PARAMS:
+            if name in params:
+                items = [item for item in items if item.get(name) == params[name]]
+
+        result_key = next(name for name, shape in output.members.items() if shape.type_name == "list")
+        token_key = next((t for t in TOKEN_PARAMS if t in output.members), None)
+        if token_key is None:
+            return {result_key: items}
+
+        # Page tokens are just the offset of the next item
+        start = int(params.get(token_key) or 0)
+        size = next((int(params[p]) for p in PAGE_SIZE_PARAMS if p in params), len(items) or 1)
+        result = {result_key: items[start:start + size]}
+        more = start + size < len(items)
+        if more:
+            result[token_key] = str(start + size)
+        # SearchTransitGatewayRoutes pages only while this flag is set, whatever the token says
+        if "AdditionalRoutesAvailable" in output.members:
+            result["AdditionalRoutesAvailable"] = more
+        return result
+
+
+def standin_clients(standin, region="us-east-1", config=None):
+    """An (ec2, directconnect) client pair answered by standin instead of AWS."""
+    session = boto3.session.Session(
+        aws_access_key_id="standin", aws_secret_access_key="standin", region_name=region
+    )
+    clients = []
+    for service in ("ec2", "directconnect"):
+        client = session.client(service, config=config)
+        standin.attach(client)
+        clients.append(client)
+    return tuple(clients)
+
+
+def _tags(name):
+    return [{"Key": "Name", "Value": name}]
+
+
+def synthetic_estate(tgws=2, route_tables=2, routes=20, vpcs=50, subnets=4, vpns=10,
+                     dx_gateways=2, vifs=2, peerings=10, seed=0):
+    """A random but internally consistent estate for StandIn.
+
+    route_tables and routes are per TGW and per TGW route table, subnets
+    per VPC (at most 16, one /28 each of the VPC's /24) and vifs per DX
+    gateway. Every VPC is attached to a TGW, associated with and
+    propagating into one of its route tables, and has a main and a private
+    route table. VPNs alternate between TGWs and VGWs, and each DX gateway
+    is attached to a TGW.
+    """
+    rng = random.Random(seed)
+    now = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+    account = "123456789012"
+
+    tgw_items, tgw_rtbs = [], []
+    for t in range(tgws):
+        tgw_id = f"tgw-{t:017x}"
+        tgw_items.append({"TransitGatewayId": tgw_id, "State": "available", "OwnerId": account,
+                          "Description": f"tgw {t}", "CreationTime": now, "Tags": _tags(f"tgw-{t}")})
+        for r in range(route_tables):
+            tgw_rtbs.append({"TransitGatewayRouteTableId": f"tgw-rtb-{t:08x}{r:09x}", "TransitGatewayId": tgw_id,
+                             "State": "available", "DefaultAssociationRouteTable": r == 0,
+                             "DefaultPropagationRouteTable": r == 0, "CreationTime": now})
+
+    vpc_items, subnet_items, rtb_items, attachments = [], [], [], []
+    associations, propagations = {}, {}
+    for v in range(vpcs):
+        vpc_id = f"vpc-{v:017x}"
+        cidr = ipaddress.ip_network((0x0A000000 + v % 65536 * 256, 24))
+        vpc_items.append({"VpcId": vpc_id, "CidrBlock": str(cidr), "State": "available", "IsDefault": False,
+                          "CidrBlockAssociationSet": [{"AssociationId": f"vpc-cidr-assoc-{v:017x}",
+                                                       "CidrBlock": str(cidr),
+                                                       "CidrBlockState": {"State": "associated"}}],
+                          "OwnerId": account, "Tags": _tags(f"vpc-{v}")})
+        subnet_ids = []
+        for s, net in enumerate(cidr.subnets(new_prefix=28)):
+            if s == subnets:
+                break
+            subnet_ids.append(f"subnet-{v:09x}{s:08x}")
+            subnet_items.append({"SubnetId": subnet_ids[-1], "VpcId": vpc_id, "CidrBlock": str(net),
+                                 "AvailabilityZone": f"us-east-1{'abc'[s % 3]}", "State": "available",
+                                 "Tags": _tags(f"vpc-{v}-subnet-{s}")})
+
+        if tgws:
+            t = v % tgws
+            tgw_id = tgw_items[t]["TransitGatewayId"]
+            rtb_id = tgw_rtbs[t * route_tables + v % route_tables]["TransitGatewayRouteTableId"] if route_tables else None
+            att_id = f"tgw-attach-{v:017x}"
+            attachments.append({"TransitGatewayAttachmentId": att_id, "TransitGatewayId": tgw_id,
+                                "TransitGatewayOwnerId": account, "ResourceOwnerId": account,
+                                "ResourceType": "vpc", "ResourceId": vpc_id, "State": "available",
+                                "Association": {"TransitGatewayRouteTableId": rtb_id, "State": "associated"}
+                                if rtb_id else None, "CreationTime": now})
+            if rtb_id:
+                ref = {"TransitGatewayAttachmentId": att_id, "ResourceId": vpc_id, "ResourceType": "vpc"}
+                associations.setdefault(rtb_id, []).append(dict(ref, State="associated"))
+                propagations.setdefault(rtb_id, []).append(dict(ref, State="enabled"))
+
+        local = {"DestinationCidrBlock": str(cidr), "GatewayId": "local", "Origin": "CreateRouteTable",
+                 "State": "active"}
+        default = {"DestinationCidrBlock": "0.0.0.0/0", "Origin": "CreateRoute", "State": "active"}
+        if tgws:
+            default["TransitGatewayId"] = tgw_items[v % tgws]["TransitGatewayId"]
+        else:
+            default["GatewayId"] = f"igw-{v:017x}"
+        rtb_items.append({"RouteTableId": f"rtb-{v:08x}000000000", "VpcId": vpc_id, "OwnerId": account,
+                          "Routes": [local], "Associations": [{"Main": True, "RouteTableId": f"rtb-{v:08x}000000000",
+                                                               "RouteTableAssociationId": f"rtbassoc-{v:08x}000000000"}]})
+        rtb_items.append({"RouteTableId": f"rtb-{v:08x}000000001", "VpcId": vpc_id, "OwnerId": account,
+                          "Routes": [local, default],
+                          "Associations": [{"Main": False, "RouteTableId": f"rtb-{v:08x}000000001", "SubnetId": sn,
+                                            "RouteTableAssociationId": f"rtbassoc-{v:08x}{i + 1:09x}"}
+                                           for i, sn in enumerate(subnet_ids)]})
+
+    routes_by_rtb = {}
+    for rtb in tgw_rtbs:
+        rtb_id = rtb["TransitGatewayRouteTableId"]
+        targets = propagations.get(rtb_id) or [{"TransitGatewayAttachmentId": a["TransitGatewayAttachmentId"],
+                                                "ResourceId": a["ResourceId"], "ResourceType": "vpc"}
+                                               for a in attachments if a["TransitGatewayId"] == rtb["TransitGatewayId"]]
+        routes_by_rtb[rtb_id] = [
+            {"DestinationCidrBlock": str(ipaddress.ip_network(
+                (0x0A000000 + rng.randrange(65536) * 256, rng.choice((16, 20, 24))), strict=False)),
+             "Type": rng.choice(("propagated", "static")),
+             "State": "blackhole" if not targets or rng.random() < 0.02 else "active",
+             "TransitGatewayAttachments": [{k: v for k, v in rng.choice(targets).items() if k != "State"}]
+             if targets else []}
+            for _ in range(routes)
+        ]
+
+    peering_items = []
+    for p in range(peerings if vpcs > 1 else 0):
+        req, acc = rng.sample(vpc_items, 2)
+        peering_items.append({"VpcPeeringConnectionId": f"pcx-{p:017x}",
+                              "RequesterVpcInfo": {"VpcId": req["VpcId"], "CidrBlock": req["CidrBlock"], "OwnerId": account},
+                              "AccepterVpcInfo": {"VpcId": acc["VpcId"], "CidrBlock": acc["CidrBlock"], "OwnerId": account},
+                              "Status": {"Code": "active", "Message": "Active"}})
+
+    vpn_items, cgw_items, vgw_items = [], [], []
+    for n in range(vpns):
+        cgw_id, vpn_id = f"cgw-{n:017x}", f"vpn-{n:017x}"
+        cgw_items.append({"CustomerGatewayId": cgw_id, "IpAddress": f"203.0.{n // 256 % 256}.{n % 256}",
+                          "BgpAsn": str(65000 + n % 1000), "Type": "ipsec.1", "State": "available"})
+        vpn = {"VpnConnectionId": vpn_id, "CustomerGatewayId": cgw_id, "State": "available", "Type": "ipsec.1",
+               "VgwTelemetry": [{"OutsideIpAddress": f"198.51.{n % 256}.{i}", "Status": "UP",
+                                 "LastStatusChange": now} for i in (1, 2)]}
+        if n % 2 == 0 and tgws:
+            vpn["TransitGatewayId"] = tgw_items[n % tgws]["TransitGatewayId"]
+        elif vpc_items:
+            vgw_id = f"vgw-{n:017x}"
+            vpn["VpnGatewayId"] = vgw_id
+            vgw_items.append({"VpnGatewayId": vgw_id, "State": "available", "Type": "ipsec.1",
+                              "VpcAttachments": [{"VpcId": vpc_items[n % len(vpc_items)]["VpcId"], "State": "attached"}]})
+        vpn_items.append(vpn)
+
+    dxgw_items, vif_items = [], []
+    for d in range(dx_gateways):
+        dxgw_id = f"{d:08x}-0000-0000-0000-000000000000"
+        dxgw_items.append({"directConnectGatewayId": dxgw_id, "directConnectGatewayName": f"dxgw-{d}",
+                           "amazonSideAsn": 64512 + d, "ownerAccount": account,
+                           "directConnectGatewayState": "available"})
+        if tgws:
+            attachments.append({"TransitGatewayAttachmentId": f"tgw-attach-dx{d:015x}",
+                                "TransitGatewayId": tgw_items[d % tgws]["TransitGatewayId"],
+                                "TransitGatewayOwnerId": account, "ResourceType": "direct-connect-gateway",
+                                "ResourceId": dxgw_id, "State": "available", "CreationTime": now})
+        for i in range(vifs):
+            vif_items.append({"virtualInterfaceId": f"dxvif-{d:04x}{i:04x}", "virtualInterfaceType": "private",
+                              "virtualInterfaceName": f"vif-{d}-{i}", "virtualInterfaceState": "available",
+                              "directConnectGatewayId": dxgw_id, "vlan": 100 + i, "asn": 65100 + i,
+                              "ownerAccount": account, "connectionId": f"dxcon-{d:04x}{i:04x}"})
+
+    return {
+        "ec2": {
+            "DescribeTransitGateways": tgw_items,
+            "DescribeTransitGatewayAttachments": attachments,
+            "DescribeTransitGatewayRouteTables": tgw_rtbs,
+            "SearchTransitGatewayRoutes": routes_by_rtb,
+            "GetTransitGatewayRouteTableAssociations": associations,
+            "GetTransitGatewayRouteTablePropagations": propagations,
+            "DescribeVpcs": vpc_items,
+            "DescribeSubnets": subnet_items,
+            "DescribeRouteTables": rtb_items,
+            "DescribeVpnConnections": vpn_items,
+            "DescribeCustomerGateways": cgw_items,
+            "DescribeVpnGateways": vgw_items,
+            "DescribeVpcPeeringConnections": peering_items,
+        },
+        "directconnect": {
+            "DescribeDirectConnectGateways": dxgw_items,
+            "DescribeVirtualInterfaces": vif_items,
+        },
+    }
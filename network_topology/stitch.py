@@ -0,0 +1,104 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from network_topology.fetch import MAX_WORKERS, paginate
+
+# ==== Cross-Region Stitching ====
+# A multi-region crawl sees each TGW peering from both of its regions and
+# every DX gateway (a global object) once per region it is collected in.
+# Stitching turns the peerings and DX gateway associations into explicit
+# global edges and keeps one copy of each DX gateway, with the virtual
+# interfaces found in every region merged into it.
+
+# Peering attachment and DX association states that no longer carry traffic
+GONE_STATES = {"deleted", "deleting", "rejected", "failed", "disassociated", "disassociating"}
+
+
+def fetch_peering_attachments(ec2):
+    return list(paginate(
+        ec2, "describe_transit_gateway_peering_attachments", "TransitGatewayPeeringAttachments"
+    ))
+
+
+def fetch_dx_associations(dx, dxgw_ids, max_workers=MAX_WORKERS):
+    """DX gateway id -> its associations with TGWs and VGWs, in any region."""
+    def associations(dxgw_id):
+        return list(paginate(
+            dx, "describe_direct_connect_gateway_associations", "directConnectGatewayAssociations",
+            directConnectGatewayId=dxgw_id
+        ))
+
+    dxgw_ids = sorted(set(dxgw_ids))
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return dict(zip(dxgw_ids, pool.map(associations, dxgw_ids)))
+
+
+def _peering_edge(att):
+    req, acc = att["RequesterTgwInfo"], att["AccepterTgwInfo"]
+    return {
+        "Type": "tgw-peering",
+        "Id": att["TransitGatewayAttachmentId"],
+        "State": att.get("State"),
+        "From": {"Id": req.get("TransitGatewayId"), "AccountId": req.get("OwnerId"), "Region": req.get("Region")},
+        "To": {"Id": acc.get("TransitGatewayId"), "AccountId": acc.get("OwnerId"), "Region": acc.get("Region")},
+    }
+
+
+def _association_edge(assoc):
+    gateway = assoc.get("associatedGateway") or {}
+    return {
+        "Type": "dxgw-association",
+        "Id": assoc.get("associationId"),
+        "State": assoc.get("associationState"),
+        # DX gateways are global, so their end has no region
+        "From": {"Id": assoc["directConnectGatewayId"], "AccountId": assoc.get("directConnectGatewayOwnerAccount"),
+                 "Region": None},
+        "To": {"Id": gateway.get("id"), "Type": gateway.get("type"), "AccountId": gateway.get("ownerAccount"),
+               "Region": gateway.get("region")},
+        "AllowedPrefixes": [p["cidr"] for p in assoc.get("allowedPrefixesToDirectConnectGateway", [])],
+    }
+
+
+def stitch_regions(merged, dx_associations=None):
+    """Turn a crawl() result into one global topology, in place.
+
+    Each regional topology's TransitGatewayPeeringAttachments and
+    DirectConnectGateways are removed. In their place merged gets:
+    - DirectConnectGateways: one entry per DX gateway, whose
+      VirtualInterfaces are the union of every region's
+    - GlobalEdges: one tgw-peering edge per peering (deduplicated across
+      its two regions) and one dxgw-association edge per association in
+      dx_associations. Resolved is True when both ends were crawled.
+    """
+    tgw_ids, dxgws, peerings = set(), {}, []
+    for account_id, regions in merged["Accounts"].items():
+        for region, regional in regions.items():
+            tgw_ids.update(tgw["TransitGatewayId"] for tgw in regional.get("TransitGateways", []))
+            peerings.extend(regional.pop("TransitGatewayPeeringAttachments", []))
+            for dxgw in regional.pop("DirectConnectGateways", []):
+                entry = dxgws.setdefault(dxgw["DirectConnectGatewayId"], dict(dxgw, VirtualInterfaces=[]))
+                known = {vif["virtualInterfaceId"] for vif in entry["VirtualInterfaces"]}
+                entry["VirtualInterfaces"].extend(
+                    vif for vif in dxgw.get("VirtualInterfaces", []) if vif["virtualInterfaceId"] not in known
+                )
+
+    edges, seen = [], set()
+    for att in peerings:
+        # The accepter region reports the same peering under its own attachment id
+        ids = {att["TransitGatewayAttachmentId"], att.get("AccepterTransitGatewayAttachmentId")} - {None}
+        if att.get("State") in GONE_STATES or ids & seen:
+            continue
+        seen.update(ids)
+        edges.append(_peering_edge(att))
+
+    for dxgw_id, associations in (dx_associations or {}).items():
+        for assoc in associations:
+            if assoc.get("associationState") not in GONE_STATES:
+                edges.append(_association_edge(assoc))
+
+    known_ids = tgw_ids | set(dxgws)
+    for edge in edges:
+        edge["Resolved"] = edge["From"]["Id"] in known_ids and edge["To"]["Id"] in known_ids
+
+    merged["DirectConnectGateways"] = list(dxgws.values())
+    merged["GlobalEdges"] = edges
+    return merged
@@ -0,0 +1,155 @@
+from html import escape
+
+# ==== Static SVG / HTML Rendering ====
+# A layered layout of the TGW -> VPC -> subnet hierarchy, drawn straight to
+# SVG so no browser or Mermaid CLI is needed. TGWs and DX gateways form the
+# top layer, VPCs the second, and each VPC's subnets sit in a block below it
+# with one column per AZ.
+
+NODE_WIDTH = 160
+NODE_HEIGHT = 28
+GAP = 12
+LAYER_GAP = 90
+MAX_COLUMN_ROWS = 8  # subnets per column before an AZ wraps to another column
+
+STYLES = {
+    "tgw": ("#5DADE2", "#1B4F72", "#fff"),
+    "dxgw": ("#AF7AC5", "#512E5F", "#fff"),
+    "vpc": ("#58D68D", "#145A32", "#fff"),
+    "subnet": ("#E5E8E8", "#626567", "#000"),
+}
+
+
+def _block_layout(subnets):
+    # Subnet offsets inside a VPC block: one column per AZ, wrapping tall AZs
+    by_az = {}
+    for sn in subnets:
+        by_az.setdefault(sn.get("AvailabilityZone", "unknown"), []).append(sn["SubnetId"])
+    cells, column = [], 0
+    for az in sorted(by_az):
+        ids = by_az[az]
+        for start in range(0, len(ids), MAX_COLUMN_ROWS):
+            for row, subnet_id in enumerate(ids[start:start + MAX_COLUMN_ROWS]):
+                cells.append([subnet_id, column * (NODE_WIDTH + GAP), (row + 1) * (NODE_HEIGHT + GAP)])
+            column += 1
+    width = max(column, 1) * (NODE_WIDTH + GAP) - GAP
+    rows = min(max((len(ids) for ids in by_az.values()), default=0), MAX_COLUMN_ROWS)
+    return {"width": width, "height": (rows + 1) * (NODE_HEIGHT + GAP) - GAP, "cells": cells}
+
+
+def layout(topology):
+    """Place every TGW, DX gateway, VPC and subnet; returns nodes, edges and canvas size.
+
+    nodes maps id -> (x, y, width, height, kind, label, tooltip) and edges
+    are (from id, to id, dashed) tuples.
+    """
+    tgws = topology.get("TransitGateways", [])
+    tgw_order = {tgw["TransitGatewayId"]: i for i, tgw in enumerate(tgws)}
+    tgws_by_vpc = {}
+    for tgw in tgws:
+        for att in tgw.get("Attachments", []):
+            if att.get("ResourceType") == "vpc":
+                tgws_by_vpc.setdefault(att["ResourceId"], []).append(tgw["TransitGatewayId"])
+
+    # VPC blocks are ordered by the first TGW they attach to, so each TGW's
+    # VPCs sit next to each other and edges stay short
+    vpcs = sorted(
+        topology.get("VPCs", []),
+        key=lambda v: min((tgw_order[t] for t in tgws_by_vpc.get(v["VpcId"], [])), default=len(tgws))
+    )
+
+    nodes, edges = {}, []
+    vpc_y = GAP + NODE_HEIGHT + LAYER_GAP
+    x, height = GAP, vpc_y
+    for vpc in vpcs:
+        vpc_id = vpc["VpcId"]
+        subnets = vpc.get("Subnets", [])
+        block = _block_layout(subnets)
+        nodes[vpc_id] = (x, vpc_y, block["width"], NODE_HEIGHT, "vpc",
+                         f"VPC: {vpc_id}", vpc.get("CidrBlock", ""))
+        cidrs = {sn["SubnetId"]: f'{sn.get("CidrBlock", "")} {sn.get("AvailabilityZone", "")}' for sn in subnets}
+        for subnet_id, dx, dy in block["cells"]:
+            nodes[subnet_id] = (x + dx, vpc_y + dy, NODE_WIDTH, NODE_HEIGHT, "subnet",
+                                subnet_id, cidrs.get(subnet_id, ""))
+        height = max(height, vpc_y + block["height"])
+        x += block["width"] + 2 * GAP
+
+    # TGWs go above the middle of their VPCs, then get pushed right to stop overlaps
+    wanted = []
+    for tgw in tgws:
+        tgw_id = tgw["TransitGatewayId"]
+        centres = [nodes[v][0] + nodes[v][2] / 2 for v in dict.fromkeys(
+            att["ResourceId"] for att in tgw.get("Attachments", []) if att.get("ResourceId") in nodes
+        )]
+        centre = sum(centres) / len(centres) if centres else x
+        wanted.append((centre - NODE_WIDTH / 2, tgw_id, len(tgw.get("Attachments", []))))
+    top_x = GAP
+    for want, tgw_id, count in sorted(wanted):
+        top_x = max(top_x, want)
+        nodes[tgw_id] = (top_x, GAP, NODE_WIDTH, NODE_HEIGHT, "tgw", f"TGW: {tgw_id}", f"{count} attachments")
+        top_x += NODE_WIDTH + GAP
+    for dxgw in topology.get("DirectConnectGateways", []):
+        dxgw_id = dxgw["DirectConnectGatewayId"]
+        nodes[dxgw_id] = (top_x, GAP, NODE_WIDTH, NODE_HEIGHT, "dxgw", f"DXGW: {dxgw_id}",
+                          f'{len(dxgw.get("VirtualInterfaces", []))} VIFs')
+        top_x += NODE_WIDTH + GAP
+
+    for tgw in tgws:
+        for vpc_id in dict.fromkeys(att["ResourceId"] for att in tgw.get("Attachments", [])):
+            if vpc_id in nodes:
+                edges.append((tgw["TransitGatewayId"], vpc_id, False))
+    seen = set()
+    for vpc in vpcs:
+        for p in vpc.get("PeeringConnections", []):
+            req, acc = p["RequesterVpcInfo"].get("VpcId"), p["AccepterVpcInfo"].get("VpcId")
+            if p["VpcPeeringConnectionId"] not in seen and req in nodes and acc in nodes:
+                seen.add(p["VpcPeeringConnectionId"])
+                edges.append((req, acc, True))
+
+    return {"nodes": nodes, "edges": edges, "width": max(x, top_x) + GAP, "height": height + GAP}
+
+
+def _svg(placed):
+    nodes = placed["nodes"]
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{placed["width"]:.0f}" height="{placed["height"]:.0f}" '
+        f'font-family="sans-serif" font-size="11">'
+    ]
+    for source, target, dashed in placed["edges"]:
+        sx, sy, sw, sh = nodes[source][:4]
+        tx, ty, tw, _ = nodes[target][:4]
+        if dashed:
+            # Peerings join two VPCs on the same layer, so arc over them
+            x1, x2 = sx + sw / 2, tx + tw / 2
+            parts.append(f'<path d="M{x1:.0f},{sy:.0f} Q{(x1 + x2) / 2:.0f},{sy - LAYER_GAP / 2:.0f} {x2:.0f},{ty:.0f}" '
+                         f'fill="none" stroke="#888" stroke-dasharray="4 3"/>')
+        else:
+            parts.append(f'<line x1="{sx + sw / 2:.0f}" y1="{sy + sh:.0f}" x2="{tx + tw / 2:.0f}" y2="{ty:.0f}" stroke="#888"/>')
+    for node_id, (x, y, w, h, kind, label, tooltip) in nodes.items():
+        fill, stroke, colour = STYLES[kind]
+        parts.append(
+            f'<g><title>{escape(node_id)} {escape(str(tooltip))}</title>'
+            f'<rect x="{x:.0f}" y="{y:.0f}" width="{w:.0f}" height="{h:.0f}" rx="4" fill="{fill}" stroke="{stroke}"/>'
+            f'<text x="{x + w / 2:.0f}" y="{y + h / 2 + 4:.0f}" text-anchor="middle" fill="{colour}">{escape(label)}</text></g>'
+        )
+    parts.append("</svg>")
+    return "\n".join(parts)
+
+
+def render_svg(topology, placed=None):
+    """Standalone SVG of the topology; hover a node for its CIDR or counts.
+
+    placed is the topology's layout() when the caller already has it.
+    """
+    return _svg(placed or layout(topology))
+
+
+def render_html(topology, placed=None):
+    """The SVG in a scrollable HTML page."""
+    return "\n".join([
+        "<!DOCTYPE html>",
+        '<html><head><meta charset="utf-8"><title>Network topology</title>',
+        "<style>body{margin:0;overflow:auto;background:#fafafa}</style></head><body>",
+        _svg(placed or layout(topology)),
+        "</body></html>",
+    ])
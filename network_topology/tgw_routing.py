@@ -0,0 +1,167 @@
+import ipaddress
+
+# ==== TGW Routing Analytics ====
+# Indexes the Routes, Associations and Propagations collected for every TGW
+# route table, so the usual incident questions become lookups: what does an
+# attachment's traffic see, which attachments are misconfigured, and who
+# can reach a given CIDR.
+
+
+def index_tgw_routing(topology):
+    """Index attachments and route tables across every TGW in topology.
+
+    Returns {"Attachments": {attachment id: {...}}, "RouteTables": {rtb id: {...}}}.
+    Each attachment records the route table it is associated with and the
+    ones it propagates into; each route table the reverse, plus its routes
+    (Routes and BlackholeRoutes together).
+    """
+    attachments, route_tables = {}, {}
+    for tgw in topology.get("TransitGateways", []):
+        tgw_id = tgw["TransitGatewayId"]
+        for att in tgw.get("Attachments", []):
+            attachments[att["TransitGatewayAttachmentId"]] = {
+                "TransitGatewayId": tgw_id,
+                "ResourceType": att.get("ResourceType"),
+                "ResourceId": att.get("ResourceId"),
+                "State": att.get("State"),
+                "AssociatedWith": None,
+                "PropagatesTo": []
+            }
+
+    for tgw in topology.get("TransitGateways", []):
+        for rtb in tgw.get("RouteTables", []):
+            rtb_id = rtb["TransitGatewayRouteTableId"]
+            entry = route_tables[rtb_id] = {
+                "TransitGatewayId": tgw["TransitGatewayId"],
+                "Routes": rtb.get("Routes", []) + rtb.get("BlackholeRoutes", []),
+                "Associated": [],
+                "Propagating": []
+            }
+            for assoc in rtb.get("Associations", []):
+                if assoc.get("State", "associated") == "associated":
+                    entry["Associated"].append(assoc["TransitGatewayAttachmentId"])
+                    if assoc["TransitGatewayAttachmentId"] in attachments:
+                        attachments[assoc["TransitGatewayAttachmentId"]]["AssociatedWith"] = rtb_id
+            for prop in rtb.get("Propagations", []):
+                if prop.get("State", "enabled") == "enabled":
+                    entry["Propagating"].append(prop["TransitGatewayAttachmentId"])
+                    if prop["TransitGatewayAttachmentId"] in attachments:
+                        attachments[prop["TransitGatewayAttachmentId"]]["PropagatesTo"].append(rtb_id)
+
+    # The attachment's own describe record also names its route table
+    for tgw in topology.get("TransitGateways", []):
+        for att in tgw.get("Attachments", []):
+            assoc = att.get("Association") or {}
+            rtb_id = assoc.get("TransitGatewayRouteTableId")
+            entry = attachments[att["TransitGatewayAttachmentId"]]
+            if rtb_id and assoc.get("State", "associated") == "associated" and entry["AssociatedWith"] is None:
+                entry["AssociatedWith"] = rtb_id
+                if rtb_id in route_tables:
+                    route_tables[rtb_id]["Associated"].append(att["TransitGatewayAttachmentId"])
+
+    return {"Attachments": attachments, "RouteTables": route_tables}
+
+
+def _targets(route):
+    return [a["TransitGatewayAttachmentId"] for a in route.get("TransitGatewayAttachments", [])]
+
+
+def effective_routes(index, attachment_id):
+    """Routes that traffic entering the TGW from attachment_id is forwarded by.
+
+    That is the route table the attachment is associated with; an
+    unassociated attachment gets an empty list, as the TGW drops its traffic.
+    """
+    return route_table_routes(index, index["Attachments"][attachment_id]["AssociatedWith"])
+
+
+def route_table_routes(index, rtb_id):
+    """Routes of route table rtb_id in the form effective_routes returns; [] for an unknown table."""
+    rtb = index["RouteTables"].get(rtb_id)
+    if rtb is None:
+        return []
+    return [
+        {
+            "RouteTableId": rtb_id,
+            "DestinationCidrBlock": route.get("DestinationCidrBlock"),
+            "PrefixListId": route.get("PrefixListId"),
+            "Type": route.get("Type"),
+            "State": route.get("State"),
+            "Targets": _targets(route)
+        }
+        for route in rtb["Routes"]
+    ]
+
+
+def find_routing_problems(index):
+    """Attachments and routes that are likely misconfigured.
+
+    - Unassociated: available attachments with no route table, so the TGW
+      drops everything they send.
+    - Unreachable: available attachments that propagate nowhere and are
+      the target of no static route, so nothing can send traffic to them.
+    - BlackholeRoutes: routes in blackhole state.
+    - RoutesToMissingAttachments: routes whose target attachment is not
+      among the TGW's attachments (deleted, or owned by another account).
+    """
+    attachments = index["Attachments"]
+    targeted = set()
+    blackholes, missing = [], []
+    for rtb_id, rtb in index["RouteTables"].items():
+        for route in rtb["Routes"]:
+            cidr = route.get("DestinationCidrBlock") or route.get("PrefixListId")
+            if route.get("State") == "blackhole":
+                blackholes.append({"RouteTableId": rtb_id, "DestinationCidrBlock": cidr, "Type": route.get("Type")})
+            for att_id in _targets(route):
+                targeted.add(att_id)
+                if att_id not in attachments:
+                    missing.append({"RouteTableId": rtb_id, "DestinationCidrBlock": cidr, "AttachmentId": att_id})
+
+    available = {att_id: att for att_id, att in attachments.items() if att["State"] in (None, "available")}
+    return {
+        "Unassociated": [att_id for att_id, att in available.items() if att["AssociatedWith"] is None],
+        "Unreachable": [
+            att_id for att_id, att in available.items()
+            if not att["PropagatesTo"] and att_id not in targeted
+        ],
+        "BlackholeRoutes": blackholes,
+        "RoutesToMissingAttachments": missing
+    }
+
+
+def attachments_reaching(index, cidr):
+    """Which attachments can send traffic to cidr, and over which route.
+
+    One pass over every route finds, per route table, the most specific
+    route containing cidr. Unless that route is a blackhole, every
+    attachment associated with the table can reach cidr through its targets.
+    """
+    query = ipaddress.ip_network(cidr, strict=False)
+    best = {}
+    for rtb_id, rtb in index["RouteTables"].items():
+        for route in rtb["Routes"]:
+            dest = route.get("DestinationCidrBlock")
+            if not dest:
+                continue
+            net = ipaddress.ip_network(dest, strict=False)
+            if net.version != query.version or not net.supernet_of(query):
+                continue
+            current = best.get(rtb_id)
+            if current is None or net.prefixlen > current[0].prefixlen:
+                best[rtb_id] = (net, route)
+
+    reaching = []
+    for rtb_id, (net, route) in best.items():
+        # The most specific match decides, so a blackhole there blocks the whole table
+        if route.get("State") == "blackhole":
+            continue
+        for att_id in index["RouteTables"][rtb_id]["Associated"]:
+            att = index["Attachments"].get(att_id, {})
+            reaching.append({
+                "AttachmentId": att_id,
+                "ResourceId": att.get("ResourceId"),
+                "RouteTableId": rtb_id,
+                "Via": str(net),
+                "Targets": _targets(route)
+            })
+    return reaching
@@ -0,0 +1,73 @@
+import gzip
+import json
+
+from network_topology.collect import SECTIONS
+
+# File suffix appended for each compression mode
+COMPRESSION_SUFFIX = {None: "", "gzip": ".gz", "zstd": ".zst"}
+
+
+def _open_output(path, compression):
+    if compression is None:
+        return open(path, "w")
+    if compression == "gzip":
+        return gzip.open(path, "wt")
+    if compression == "zstd":
+        try:
+            import zstandard
+        except ImportError:
+            raise RuntimeError("zstd output needs the zstandard package (pip install zstandard)")
+        return zstandard.open(path, "wt")
+    raise ValueError(f"Unknown compression: {compression}")
+
+
+def write_topology(path, entities, sections=SECTIONS, compact=False, compression=None):
+    """Stream (section, entity) pairs to path as one topology JSON document.
+
+    Each entity is serialized as soon as it arrives and then dropped, so
+    only one entity is held at a time. entities must come grouped by
+    section in sections order; sections with no entities are written as
+    empty lists. The indented output is byte-for-byte what
+    json.dump(topology, f, indent=2, default=str) would write, while
+    compact drops all optional whitespace.
+    """
+    if compact:
+        def dump(entity):
+            return json.dumps(entity, separators=(",", ":"), default=str)
+        open_section, item_sep, close_section, section_sep = "[", ",", "]", ","
+        head, key_sep, tail = "{", ":", "}"
+    else:
+        def dump(entity):
+            text = json.dumps(entity, indent=2, default=str)
+            return "\n    " + text.replace("\n", "\n    ")
+        open_section, item_sep, close_section, section_sep = "[", ",", "\n  ]", ",\n  "
+        head, key_sep, tail = "{\n  ", ": ", "\n}"
+
+    with _open_output(path, compression) as f:
+        f.write(head)
+        position = -1  # index in sections of the section currently open
+        count = 0      # entities written to it so far
+
+        def advance_to(target):
+            nonlocal position, count
+            while position < target:
+                if position >= 0:
+                    f.write(close_section if count else "]")
+                    f.write(section_sep)
+                position += 1
+                count = 0
+                f.write(json.dumps(sections[position]) + key_sep + open_section)
+
+        for section, entity in entities:
+            target = sections.index(section)
+            if target < position:
+                raise ValueError(f"Section {section} arrived after {sections[position]}")
+            advance_to(target)
+            if count:
+                f.write(item_sep)
+            f.write(dump(entity))
+            count += 1
+
+        advance_to(len(sections) - 1)
+        f.write(close_section if count else "]")
+        f.write(tail)
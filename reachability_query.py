@@ -0,0 +1,41 @@
+import json
+import sys
+import time
+
+from network_topology.reachability import ReachabilityIndex
+from network_topology.snapshot import load_snapshot, merge_accounts
+
+# Answers reachability queries offline against a saved snapshot:
+#   python reachability_query.py <snapshot.json[.gz|.zst] | snapshot.cols> [queries.txt]
+# Each query line is "<subnet-id> <destination ip>"; queries are read from
+# stdin when no file is given. One JSON result is printed per query; a
+# malformed line gets a result saying why instead of stopping the run.
+
+if len(sys.argv) not in (2, 3):
+    sys.exit(f"Usage: {sys.argv[0]} <snapshot.json | snapshot.cols> [queries.txt]")
+
+source = sys.argv[1].rstrip("/")
+# A multi-account crawl is queried as one estate, across shared TGWs
+topology = merge_accounts(load_snapshot(source))
+
+start = time.perf_counter()
+index = ReachabilityIndex(topology)
+build_seconds = time.perf_counter() - start
+
+queries_file = open(sys.argv[2]) if len(sys.argv) == 3 else sys.stdin
+with queries_file:
+    # A line without a destination is traced to "", which reports it
+    pairs = [tuple((line.split() + [""])[:2]) for line in queries_file if line.strip()]
+
+start = time.perf_counter()
+results = index.query_many(pairs)
+query_seconds = time.perf_counter() - start
+
+for (subnet_id, destination), result in zip(pairs, results):
+    print(json.dumps({"Source": subnet_id, "Destination": destination, **result}))
+
+qps = len(pairs) / query_seconds if query_seconds else 0
+print(
+    f"✅ Index built in {build_seconds:.3f}s; {len(pairs)} queries in {query_seconds:.3f}s ({qps:,.0f} q/s)",
+    file=sys.stderr
+)
@@ -0,0 +1,48 @@
+import os
+import sys
+from datetime import datetime
+
+from network_topology.collect import collect
+from network_topology.render import RENDERERS, iter_subdiagrams, render_all
+from network_topology.snapshot import load_snapshot, merge_accounts, snapshot_basename
+
+# Writes every output (JSON, plain / styled / clustered Mermaid) from one crawl:
+#   python render_topology.py
+# or re-renders a saved snapshot without touching AWS:
+#   python render_topology.py <snapshot.json[.gz|.zst] | snapshot.cols>
+
+ROLE_ARN = "arn:aws:iam::123456789012:role/CrossAccountTGWReadRole"
+SESSION_NAME = "FullNetworkTopologySession"
+MAX_WORKERS = 16  # concurrent TGW route table calls
+OUTPUTS = list(RENDERERS)  # any subset of RENDERERS
+SUBDIAGRAMS = False  # True also writes one Mermaid diagram per TGW and per VPC
+SCOPE = None  # e.g. {"TransitGatewayIds": ["tgw-0123456789abcdef0"]} to draw just that slice
+
+if len(sys.argv) > 2:
+    sys.exit(f"Usage: {sys.argv[0]} [snapshot.json | snapshot.cols]")
+
+if len(sys.argv) == 2:
+    source = sys.argv[1].rstrip("/")
+    # A multi-account crawl is drawn as one estate
+    topology = merge_accounts(load_snapshot(source))
+    # Don't overwrite the snapshot being rendered
+    outputs = [name for name in OUTPUTS if name != "json"]
+    basename = snapshot_basename(source)
+else:
+    topology = collect(ROLE_ARN, SESSION_NAME, max_workers=MAX_WORKERS, scope=SCOPE)
+    outputs = OUTPUTS
+    prefix = "scoped_network_topology" if SCOPE else "network_topology"
+    basename = f"{prefix}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+
+for path in render_all(topology, basename, outputs):
+    print(f"✅ Saved: {path}")
+
+if SUBDIAGRAMS:
+    diagram_dir = f"{basename}.diagrams"
+    os.makedirs(diagram_dir, exist_ok=True)
+    count = 0
+    for entity_id, diagram in iter_subdiagrams(topology):
+        with open(os.path.join(diagram_dir, f"{entity_id}.mmd"), "w") as f:
+            f.write(diagram)
+        count += 1
+    print(f"✅ {count} TGW / VPC diagrams saved to: {diagram_dir}")
@@ -0,0 +1,242 @@
+import boto3
+import os
+import json
+import time
+from urllib.parse import urlencode
+from concurrent.futures import ThreadPoolExecutor
+from botocore.config import Config
+
+# Copy engine and event handling shared by the copy Lambdas (lambda.py,
+# lambda1.py, lambda_function.py); each Lambda zip ships this file next to
+# its handler, which only decides where an object is copied to.
+
+MB = 1024 * 1024
+GB = 1024 * MB
+
+# Objects larger than this are copied in parts; CopyObject itself stops at 5 GiB
+MULTIPART_THRESHOLD = min(int(os.environ.get('MULTIPART_THRESHOLD_MB', '256')) * MB, 5 * GB)
+# Size of each UploadPartCopy range (5 MiB to 5 GiB), raised if needed to stay within 10,000 parts
+PART_SIZE = min(max(int(os.environ.get('COPY_PART_SIZE_MB', '128')) * MB, 5 * MB), 5 * GB)
+# Parts copied at once for one object
+COPY_CONCURRENCY = int(os.environ.get('COPY_CONCURRENCY', '8'))
+MAX_PARTS = 10000
+# Event records copied at once; each may also copy COPY_CONCURRENCY parts
+RECORD_CONCURRENCY = int(os.environ.get('RECORD_CONCURRENCY', '8'))
+
+# Queued mode: set when the Lambda consumes S3 events from SQS, so an
+# invocation can pull more of a backlog than its delivered batch
+QUEUE_URL = os.environ.get('QUEUE_URL') or None
+# Most extra messages one invocation pulls from the backlog
+MAX_BATCH_MESSAGES = int(os.environ.get('MAX_BATCH_MESSAGES', '1000'))
+# Smaller backlogs are left to the event source mapping's own batches
+DRAIN_MIN_BACKLOG = int(os.environ.get('DRAIN_MIN_BACKLOG', '100'))
+# Time kept free at the end of an invocation that drains the backlog
+DRAIN_RESERVE_SECONDS = float(os.environ.get('DRAIN_RESERVE_SECONDS', '15'))
+
+# Settings CreateMultipartUpload does not copy from the source, unlike CopyObject;
+# multipart copies take them from the source HEAD (tags come from GetObjectTagging).
+# Encryption and storage class are carried over too, so a large object is not
+# stored differently from a small one. Left to the destination bucket, as
+# CopyObject leaves them: WebsiteRedirectLocation and object-lock retention and
+# legal hold. SSE-C objects cannot be copied at all without their key.
+COPIED_HEADERS = (
+    "ContentType", "ContentEncoding", "ContentDisposition", "ContentLanguage", "CacheControl", "Metadata",
+    "Expires", "StorageClass", "ServerSideEncryption", "SSEKMSKeyId", "BucketKeyEnabled"
+)
+
+# One client shared by every thread, with a connection for each concurrent call
+s3_client = boto3.client('s3', config=Config(max_pool_connections=max(RECORD_CONCURRENCY * COPY_CONCURRENCY, 10)))
+sqs_client = boto3.client('sqs') if QUEUE_URL else None
+
+def object_size(record, bucket, key):
+    # S3 events carry the object size; HEAD only when it is missing
+    size = record["s3"]["object"].get("size")
+    if size is None:
+        size = s3_client.head_object(Bucket=bucket, Key=key)["ContentLength"]
+    return size
+
+def multipart_copy(copy_source, dest_bucket, dest_key):
+    """Copy an object with UploadPartCopy, COPY_CONCURRENCY parts at a time.
+
+    Parts are planned from the object HEAD returns, and every part is read
+    with CopySourceIfMatch on its ETag. If the source is overwritten
+    mid-copy, the remaining parts fail with 412 instead of stitching old and
+    new bytes together. The upload is aborted if any part fails, so no
+    incomplete upload is left behind to be billed. Headers, encryption,
+    storage class and tags are carried over as COPIED_HEADERS describes.
+    """
+    head = s3_client.head_object(**copy_source)
+    extra = {k: head[k] for k in COPIED_HEADERS if head.get(k)}
+    tags = s3_client.get_object_tagging(**copy_source)["TagSet"]
+    if tags:
+        extra["Tagging"] = urlencode([(tag["Key"], tag["Value"]) for tag in tags])
+    upload_id = s3_client.create_multipart_upload(Bucket=dest_bucket, Key=dest_key, **extra)["UploadId"]
+
+    size = head["ContentLength"]
+    part_size = max(PART_SIZE, -(-size // MAX_PARTS))
+    ranges = [(number, start, min(start + part_size, size) - 1)
+              for number, start in enumerate(range(0, size, part_size), 1)]
+
+    def copy_part(part):
+        number, first, last = part
+        result = s3_client.upload_part_copy(
+            Bucket=dest_bucket, Key=dest_key, UploadId=upload_id, PartNumber=number,
+            CopySource=copy_source, CopySourceRange=f"bytes={first}-{last}", CopySourceIfMatch=head["ETag"]
+        )
+        return {"ETag": result["CopyPartResult"]["ETag"], "PartNumber": number}
+
+    try:
+        pool = ThreadPoolExecutor(max_workers=COPY_CONCURRENCY)
+        try:
+            parts = list(pool.map(copy_part, ranges))
+        finally:
+            # After a failure, parts not yet started are skipped
+            pool.shutdown(cancel_futures=True)
+        s3_client.complete_multipart_upload(
+            Bucket=dest_bucket, Key=dest_key, UploadId=upload_id, MultipartUpload={"Parts": parts}
+        )
+    except Exception:
+        s3_client.abort_multipart_upload(Bucket=dest_bucket, Key=dest_key, UploadId=upload_id)
+        raise
+    return len(parts)
+
+def copy_object(copy_source, size, dest_bucket, dest_key):
+    """Copy with one CopyObject call, or in parallel parts above MULTIPART_THRESHOLD."""
+    if size <= MULTIPART_THRESHOLD:
+        s3_client.copy_object(CopySource=copy_source, Bucket=dest_bucket, Key=dest_key)
+        return 1
+    return multipart_copy(copy_source, dest_bucket, dest_key)
+
+def s3_records(record):
+    # A record from SQS wraps a whole S3 event notification; S3's test event has no Records
+    if record.get("eventSource") == "aws:sqs":
+        return json.loads(record["body"]).get("Records", [])
+    return [record]
+
+def _item_id(record):
+    # SQS messageId, or the object key for records delivered straight from S3
+    return record.get("messageId") or record.get("s3", {}).get("object", {}).get("key")
+
+def _sequencer(s3_record):
+    # S3 orders events for one key by sequencer, a hex string of varying length
+    return int(s3_record["s3"]["object"].get("sequencer") or "0", 16)
+
+def process_records(records, copy_record):
+    """Copy every object in records, RECORD_CONCURRENCY at a time.
+
+    Direct S3 records and SQS messages go through the same path. Each
+    (bucket, key) is copied once per batch, from its newest event, however
+    many records carried it. A failed copy fails every record that carried
+    it. Failures come back in the SQS partial-batch-failure format.
+
+    Records delivered straight from S3 have no batch to report into: S3
+    invokes asynchronously and ignores the response, so if any of those
+    failed the invocation raises once every record has been tried, and
+    Lambda retries the event.
+    """
+    failed, carriers, latest = {}, {}, {}
+    events = 0
+    for index, record in enumerate(records):
+        try:
+            unwrapped = s3_records(record)
+        except Exception as e:
+            failed[index] = _item_id(record)
+            print(f"❌ Failed {failed[index]}: {type(e).__name__}: {e}")
+            continue
+        for s3_record in unwrapped:
+            events += 1
+            key = (s3_record["s3"]["bucket"]["name"], s3_record["s3"]["object"]["key"])
+            carriers.setdefault(key, []).append(index)
+            if key not in latest or _sequencer(s3_record) > _sequencer(latest[key]):
+                latest[key] = s3_record
+
+    def copy(key):
+        try:
+            copy_record(latest[key])
+        except Exception as e:
+            print(f"❌ Failed {key[0]}/{key[1]}: {type(e).__name__}: {e}")
+            return False
+        return True
+
+    with ThreadPoolExecutor(max_workers=max(min(RECORD_CONCURRENCY, len(latest)), 1)) as pool:
+        for key, ok in zip(list(latest), pool.map(copy, list(latest))):
+            if not ok:
+                for index in carriers[key]:
+                    failed[index] = _item_id(records[index])
+    if events > len(latest):
+        print(f"🔁 {events} object event(s) in {len(records)} record(s), {len(latest)} unique key(s) copied")
+
+    direct = [item for index, item in failed.items() if records[index].get("eventSource") != "aws:sqs"]
+    if direct:
+        raise RuntimeError(f"Failed to copy {len(direct)} object(s): {', '.join(direct)}")
+    return {"batchItemFailures": [{"itemIdentifier": failed[index]} for index in sorted(failed)]}
+
+def _receive_messages(count):
+    # ReceiveMessage returns at most 10 messages per call
+    messages = []
+    while len(messages) < count:
+        batch = sqs_client.receive_message(
+            QueueUrl=QUEUE_URL, MaxNumberOfMessages=min(10, count - len(messages)), WaitTimeSeconds=0
+        ).get("Messages", [])
+        if not batch:
+            break
+        messages.extend(batch)
+    return messages
+
+def _delete_messages(messages):
+    for start in range(0, len(messages), 10):
+        sqs_client.delete_message_batch(QueueUrl=QUEUE_URL, Entries=[
+            {"Id": str(i), "ReceiptHandle": m["ReceiptHandle"]} for i, m in enumerate(messages[start:start + 10])
+        ])
+
+def drain_backlog(context, copy, seconds_per_message):
+    """Keep pulling messages from QUEUE_URL while the queue is backed up.
+
+    Each round is sized to the backlog (ApproximateNumberOfMessages), up
+    to MAX_BATCH_MESSAGES in total. It is also capped by how many messages
+    the time left fits, at the rate measured so far. A burst is worked
+    through in large batches, while a quiet queue costs one
+    GetQueueAttributes call. The event source mapping does not know about
+    the pulled messages. So this function deletes the ones that were
+    copied, and failed ones become visible again for a retry.
+    """
+    pulled = 0
+    while pulled < MAX_BATCH_MESSAGES:
+        backlog = int(sqs_client.get_queue_attributes(
+            QueueUrl=QUEUE_URL, AttributeNames=["ApproximateNumberOfMessages"]
+        )["Attributes"]["ApproximateNumberOfMessages"])
+        seconds_left = context.get_remaining_time_in_millis() / 1000 - DRAIN_RESERVE_SECONDS
+        size = min(backlog, MAX_BATCH_MESSAGES - pulled, int(seconds_left / max(seconds_per_message, 0.001)))
+        if size < DRAIN_MIN_BACKLOG:
+            break
+        messages = _receive_messages(size)
+        if not messages:
+            break
+        started = time.monotonic()
+        failures = process_records([
+            {"messageId": m["MessageId"], "body": m["Body"], "eventSource": "aws:sqs"} for m in messages
+        ], copy)
+        failed = {f["itemIdentifier"] for f in failures["batchItemFailures"]}
+        _delete_messages([m for m in messages if m["MessageId"] not in failed])
+        seconds_per_message = (time.monotonic() - started) / len(messages)
+        pulled += len(messages)
+    if pulled:
+        print(f"📥 Pulled {pulled} message(s) from the backlog")
+
+def handle_records(records, context, copy_record):
+    """Copy the objects in a Lambda event's records with copy_record(s3_record).
+
+    Returns the delivered batch's SQS partial-batch failures. In queued
+    mode the backlog is drained afterwards. Pulled messages are settled by
+    drain_backlog, so a drain that fails part way is logged and the
+    delivered batch is still reported; pulled messages it did not delete
+    become visible again.
+    """
+    started = time.monotonic()
+    result = process_records(records, copy_record)
+    if QUEUE_URL and records and records[0].get("eventSource") == "aws:sqs":
+        try:
+            drain_backlog(context, copy_record, (time.monotonic() - started) / len(records))
+        except Exception as e:
+            print(f"⚠️ Backlog drain stopped: {type(e).__name__}: {e}")
+    return result
@@ -0,0 +1,28 @@
+import json
+import os
+import sys
+
+from network_topology.columnar import load_columnar, write_columnar
+from network_topology.snapshot import open_snapshot
+
+# Converts between the JSON topology snapshot and the columnar format:
+#   python snapshot_columnar.py network_topology_<ts>.json[.gz|.zst]   -> network_topology_<ts>.cols/
+#   python snapshot_columnar.py network_topology_<ts>.cols             -> network_topology_<ts>.json
+
+if len(sys.argv) != 2:
+    sys.exit(f"Usage: {sys.argv[0]} <snapshot.json | snapshot.cols>")
+
+source = sys.argv[1].rstrip("/")
+
+if os.path.isdir(source):
+    output_file = source[:-len(".cols")] + ".json" if source.endswith(".cols") else source + ".json"
+    topology = load_columnar(source).to_topology()
+    with open(output_file, "w") as f:
+        json.dump(topology, f, indent=2)
+else:
+    output_file = source.split(".json")[0] + ".cols"
+    with open_snapshot(source) as f:
+        topology = json.load(f)
+    write_columnar(topology, output_file)
+
+print(f"✅ {source} converted to: {output_file}")
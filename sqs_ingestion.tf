@@ -0,0 +1,110 @@
+# Queued ingestion: S3 events go to an SQS queue, and the copy Lambda consumes
+# them in batches. Bursts are buffered instead of throttled, and repeated keys
+# in a batch are copied once. "direct" keeps S3 invoking the Lambda per event.
+variable "ingestion_mode" {
+  type    = string
+  default = "direct"
+
+  validation {
+    condition     = contains(["direct", "queued"], var.ingestion_mode)
+    error_message = "ingestion_mode must be \"direct\" or \"queued\"."
+  }
+}
+
+# Messages the event source mapping delivers per invocation
+variable "ingestion_batch_size" {
+  type    = number
+  default = 100
+}
+
+# Seconds the mapping waits to fill a batch
+variable "ingestion_batching_window" {
+  type    = number
+  default = 5
+}
+
+# Most copy Lambdas the queue keeps busy at once
+variable "ingestion_max_concurrency" {
+  type    = number
+  default = 20
+}
+
+locals {
+  queued = var.ingestion_mode == "queued"
+  # The handler pulls more from a backed-up queue, so messages stay hidden
+  # for well over the function timeout
+  copy_lambda_timeout = 300
+}
+
+resource "aws_sqs_queue" "copy_events_dlq" {
+  count                     = local.queued ? 1 : 0
+  name                      = "s3-subfolder-copy-events-dlq"
+  message_retention_seconds = 1209600
+  sqs_managed_sse_enabled   = true
+}
+
+resource "aws_sqs_queue" "copy_events" {
+  count                      = local.queued ? 1 : 0
+  name                       = "s3-subfolder-copy-events"
+  visibility_timeout_seconds = local.copy_lambda_timeout * 6
+  message_retention_seconds  = 345600
+  sqs_managed_sse_enabled    = true
+
+  redrive_policy = jsonencode({
+    deadLetterTargetArn = aws_sqs_queue.copy_events_dlq[0].arn
+    maxReceiveCount     = 5
+  })
+}
+
+resource "aws_sqs_queue_policy" "copy_events" {
+  count     = local.queued ? 1 : 0
+  queue_url = aws_sqs_queue.copy_events[0].id
+  policy = jsonencode({
+    Version = "2012-10-17"
+    Statement = [{
+      Effect    = "Allow"
+      Principal = { Service = "s3.amazonaws.com" }
+      Action    = "sqs:SendMessage"
+      Resource  = aws_sqs_queue.copy_events[0].arn
+      Condition = { ArnEquals = { "aws:SourceArn" = "arn:aws:s3:::${local.config.source_bucket}" } }
+    }]
+  })
+}
+
+# Consume the queue
+resource "aws_iam_policy" "queue_consume" {
+  count  = local.queued ? 1 : 0
+  name   = "lambda-copy-queue-consume"
+  policy = jsonencode({
+    Version = "2012-10-17"
+    Statement = [
+      {
+        Effect   = "Allow"
+        Action   = ["sqs:ReceiveMessage", "sqs:DeleteMessage", "sqs:GetQueueAttributes"]
+        Resource = aws_sqs_queue.copy_events[0].arn
+      }
+    ]
+  })
+}
+
+resource "aws_iam_role_policy_attachment" "queue_consume_attach" {
+  count      = local.queued ? 1 : 0
+  role       = aws_iam_role.lambda_role.name
+  policy_arn = aws_iam_policy.queue_consume[0].arn
+}
+
+resource "aws_lambda_event_source_mapping" "copy_events" {
+  count                              = local.queued ? 1 : 0
+  event_source_arn                   = aws_sqs_queue.copy_events[0].arn
+  function_name                      = aws_lambda_function.s3_copy.arn
+  batch_size                         = var.ingestion_batch_size
+  maximum_batching_window_in_seconds = var.ingestion_batching_window
+  # Only the messages the handler lists are retried
+  function_response_types = ["ReportBatchItemFailures"]
+
+  scaling_config {
+    maximum_concurrency = var.ingestion_max_concurrency
+  }
+
+  depends_on = [aws_iam_role_policy_attachment.queue_consume_attach]
+}
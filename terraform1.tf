@@ -37,7 +37,7 @@ resource "aws_iam_policy" "dest_rw" {
     Version = "2012-10-17",
     Statement = [{
       Effect   = "Allow",
-      Action   = ["s3:PutObject", "s3:GetObject", "s3:ListBucket", "s3:PutObjectAcl"],
+      Action   = ["s3:PutObject", "s3:GetObject", "s3:ListBucket", "s3:PutObjectAcl", "s3:AbortMultipartUpload"],
       Resource = [
         "arn:aws:s3:::${local.config.dest_bucket}",
         "arn:aws:s3:::${local.config.dest_bucket}/*"
@@ -56,6 +56,22 @@ resource "aws_iam_role_policy_attachment" "dest_attach" {
   policy_arn = aws_iam_policy.dest_rw.arn
 }
 
+# The per-mapping handler and the copy engine it imports
+data "archive_file" "s3_copy" {
+  type        = "zip"
+  output_path = "${path.module}/build/lambda_function.zip"
+
+  source {
+    content  = file("${path.module}/lambda_function.py")
+    filename = "lambda_function.py"
+  }
+
+  source {
+    content  = file("${path.module}/s3_copy.py")
+    filename = "s3_copy.py"
+  }
+}
+
 # Create one Lambda per mapping
 resource "aws_lambda_function" "s3_copy" {
   for_each = local.mappings
@@ -64,9 +80,14 @@ resource "aws_lambda_function" "s3_copy" {
   role          = aws_iam_role.lambda_role.arn
   handler       = "lambda_function.lambda_handler"
   runtime       = "python3.9"
+  # The 3 second default ends multi-GB part copies part way through
+  timeout = 300
+  # Copies run server-side, but up to RECORD_CONCURRENCY x COPY_CONCURRENCY
+  # (64) requests are in flight; Lambda scales CPU and network with memory
+  memory_size = 512
 
-  filename         = "lambda_function.zip"
-  source_code_hash = filebase64sha256("lambda_function.zip")
+  filename         = data.archive_file.s3_copy.output_path
+  source_code_hash = data.archive_file.s3_copy.output_base64sha256
 
   environment {
     variables = {
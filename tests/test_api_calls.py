@@ -0,0 +1,57 @@
+from collections import Counter
+
+import pytest
+
+from network_topology.collect import collect_topology
+from network_topology.instrument import ApiRecorder
+from network_topology.standin import StandIn, standin_clients, synthetic_estate
+
+# Counts the API requests collect_topology makes against the stand-in, so a
+# return to per-VPC or per-VGW describe calls fails here.
+
+# Each collection is described once per crawl, whatever the estate size
+BULK_CALLS = (
+    "describe_transit_gateways", "describe_transit_gateway_attachments", "describe_transit_gateway_route_tables",
+    "describe_vpcs", "describe_subnets", "describe_route_tables",
+    "describe_vpn_connections", "describe_customer_gateways", "describe_vpn_gateways",
+    "describe_vpc_peering_connections", "describe_direct_connect_gateways", "describe_virtual_interfaces",
+)
+# Made once per TGW route table
+ROUTE_TABLE_CALLS = (
+    "search_transit_gateway_routes", "get_transit_gateway_route_table_associations",
+    "get_transit_gateway_route_table_propagations",
+)
+
+ESTATES = {
+    "small": dict(tgws=2, route_tables=2, routes=10, vpcs=10, subnets=2, vpns=10, dx_gateways=1, vifs=2),
+    "large": dict(tgws=2, route_tables=2, routes=10, vpcs=300, subnets=4, vpns=200, dx_gateways=4, vifs=4),
+}
+
+
+def _requests(size):
+    estate = synthetic_estate(**size)
+    ec2, dx = standin_clients(StandIn(estate))
+    recorder = ApiRecorder()
+    recorder.attach(ec2)
+    recorder.attach(dx)
+    topology = collect_topology(ec2, dx)
+    # Follow-on pages grow with the estate; requests must not
+    return Counter(r["Operation"] for r in recorder.records if not r["Page"]), estate, topology
+
+
+@pytest.mark.parametrize("name", ESTATES)
+def test_requests_do_not_grow_with_vpcs_or_vpns(name):
+    requests, estate, _ = _requests(ESTATES[name])
+    route_tables = len(estate["ec2"]["DescribeTransitGatewayRouteTables"])
+    expected = Counter({op: 1 for op in BULK_CALLS})
+    expected.update({op: route_tables for op in ROUTE_TABLE_CALLS})
+    assert requests == expected
+
+
+def test_vgw_vpns_are_joined_to_their_vpcs():
+    _, estate, topology = _requests(ESTATES["large"])
+    vgw_vpcs = {vgw["VpnGatewayId"]: vgw["VpcAttachments"][0]["VpcId"] for vgw in estate["ec2"]["DescribeVpnGateways"]}
+    expected = Counter(vgw_vpcs[vpn["VpnGatewayId"]] for vpn in estate["ec2"]["DescribeVpnConnections"]
+                       if vpn.get("VpnGatewayId"))
+    joined = Counter({vpc["VpcId"]: len(vpc["VPNConnections"]) for vpc in topology["VPCs"] if vpc["VPNConnections"]})
+    assert joined == expected
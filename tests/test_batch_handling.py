@@ -0,0 +1,92 @@
+import json
+
+import boto3
+import pytest
+from botocore.stub import Stubber
+
+import s3_copy
+
+# Batch handling shared by the copy Lambdas, with copy_record replaced by
+# a recorder and SQS by a stubbed client in queued mode.
+
+QUEUE_URL = "https://sqs.us-east-1.amazonaws.com/123456789012/copy-events"
+
+
+class Context:
+    def get_remaining_time_in_millis(self):
+        return 600000
+
+
+def _s3_record(key, sequencer="0A", source="aws:s3"):
+    return {"eventSource": source, "s3": {"bucket": {"name": "src"},
+                                          "object": {"key": key, "size": 1, "sequencer": sequencer}}}
+
+
+def _message(message_id, *s3_records):
+    return {"messageId": message_id, "eventSource": "aws:sqs", "body": json.dumps({"Records": list(s3_records)})}
+
+
+def _copier(failing=()):
+    copied = []
+
+    def copy_record(record):
+        key = record["s3"]["object"]["key"]
+        copied.append((key, record["s3"]["object"]["sequencer"]))
+        if key in failing:
+            raise RuntimeError(f"cannot copy {key}")
+    return copied, copy_record
+
+
+@pytest.fixture
+def sqs(monkeypatch):
+    client = boto3.client("sqs", region_name="us-east-1")
+    monkeypatch.setattr(s3_copy, "QUEUE_URL", QUEUE_URL)
+    monkeypatch.setattr(s3_copy, "sqs_client", client)
+    with Stubber(client) as stubber:
+        yield stubber
+        stubber.assert_no_pending_responses()
+
+
+def test_batch_is_reported_when_the_drain_fails(sqs, capsys):
+    records = [
+        _message("m1", _s3_record("a", "0A")),
+        _message("m2", _s3_record("a", "0B"), _s3_record("b")),
+        _message("m3", _s3_record("c")),
+    ]
+    sqs.add_client_error("get_queue_attributes", "AWS.SimpleQueueService.NonExistentQueue")
+    copied, copy_record = _copier(failing={"c"})
+    result = s3_copy.handle_records(records, Context(), copy_record)
+
+    assert sorted(copied) == [("a", "0B"), ("b", "0A"), ("c", "0A")]
+    assert result == {"batchItemFailures": [{"itemIdentifier": "m3"}]}
+    assert "Backlog drain stopped: ClientError" in capsys.readouterr().out
+
+
+def test_newest_event_wins_across_sequencer_lengths():
+    # As strings "FF" sorts after "0100"; as numbers it is older
+    copied, copy_record = _copier()
+    s3_copy.process_records([_s3_record("a", "0100"), _s3_record("a", "FF")], copy_record)
+    assert copied == [("a", "0100")]
+
+
+def test_failed_direct_records_fail_the_invocation():
+    copied, copy_record = _copier(failing={"b"})
+    with pytest.raises(RuntimeError, match="Failed to copy 1 object"):
+        s3_copy.process_records([_s3_record("a"), _s3_record("b")], copy_record)
+    assert sorted(copied) == [("a", "0A"), ("b", "0A")]
+
+
+def test_drain_deletes_only_the_copied_messages(sqs, monkeypatch):
+    monkeypatch.setattr(s3_copy, "DRAIN_MIN_BACKLOG", 1)
+    monkeypatch.setattr(s3_copy, "MAX_BATCH_MESSAGES", 3)
+    bodies = {key: json.dumps({"Records": [_s3_record(key)]}) for key in "abc"}
+    sqs.add_response("get_queue_attributes", {"Attributes": {"ApproximateNumberOfMessages": "3"}})
+    sqs.add_response("receive_message", {"Messages": [
+        {"MessageId": f"m-{key}", "ReceiptHandle": f"rh-{key}", "Body": body} for key, body in bodies.items()
+    ]}, {"QueueUrl": QUEUE_URL, "MaxNumberOfMessages": 3, "WaitTimeSeconds": 0})
+    sqs.add_response("delete_message_batch", {"Successful": [], "Failed": []}, {"QueueUrl": QUEUE_URL, "Entries": [
+        {"Id": "0", "ReceiptHandle": "rh-a"}, {"Id": "1", "ReceiptHandle": "rh-c"}]})
+
+    copied, copy_record = _copier(failing={"b"})
+    s3_copy.drain_backlog(Context(), copy_record, 0.01)
+    assert sorted(copied) == [("a", "0A"), ("b", "0A"), ("c", "0A")]
@@ -0,0 +1,57 @@
+import json
+import os
+
+from network_topology.collect import collect_topology
+from network_topology.columnar import load_columnar, write_columnar
+from network_topology.snapshot import normalize
+from network_topology.standin import StandIn, standin_clients, synthetic_estate
+
+# JSON -> columnar -> JSON must give back the same document, byte for byte.
+
+
+def _round_trip(topology, path):
+    write_columnar(topology, path)
+    return load_columnar(path).to_topology()
+
+
+def test_synthetic_estate_round_trips(tmp_path):
+    estate = synthetic_estate(tgws=2, route_tables=2, routes=10, vpcs=8, subnets=2, vpns=2, dx_gateways=1)
+    topology = normalize(collect_topology(*standin_clients(StandIn(estate))))
+    assert json.dumps(_round_trip(topology, str(tmp_path / "estate.cols"))) == json.dumps(topology)
+
+
+def test_missing_keys_scalar_types_empty_lists_and_nulls_round_trip(tmp_path):
+    topology = {
+        "TransitGateways": [
+            {"TransitGatewayId": "tgw-1", "RouteTables": [
+                {"TransitGatewayRouteTableId": "tgw-rtb-1", "Routes": [], "Associations": [{}]},
+                # No Routes, Associations or Propagations at all
+                {"TransitGatewayRouteTableId": "tgw-rtb-2"},
+            ]},
+            {"TransitGatewayId": "tgw-2", "Attachments": [], "RouteTables": []},
+        ],
+        "VPCs": [
+            {"VpcId": "vpc-1", "Subnets": [
+                {"SubnetId": "subnet-1", "Flag": True, "Count": 1, "Weight": 1.0, "CidrBlock": None},
+                {"Flag": 1, "SubnetId": "subnet-2", "Weight": 1},
+                {"SubnetId": "subnet-3", "Flag": 1.0, "Count": False, "Tags": [], "Extra": {"Nested": [1, True, None]}},
+            ], "RouteTables": [{"RouteTableId": "rtb-1", "Routes": [{"GatewayId": None}]}]},
+            {"VpcId": "vpc-2", "Subnets": []},
+            {"VpcId": "vpc-3"},
+        ],
+        "DirectConnectGateways": [],
+    }
+    assert json.dumps(_round_trip(topology, str(tmp_path / "edge.cols"))) == json.dumps(topology)
+
+
+def test_rewriting_leaves_no_stale_columns(tmp_path):
+    path = str(tmp_path / "snapshot.cols")
+    vpc = {"VpcId": "vpc-1", "Subnets": [{"SubnetId": "subnet-1", "Extra": "x"}]}
+    write_columnar({"TransitGateways": [], "VPCs": [vpc], "DirectConnectGateways": []}, path)
+    assert "Subnets.Extra.npy" in os.listdir(path)
+
+    topology = {"TransitGateways": [], "VPCs": [{"VpcId": "vpc-1", "Subnets": [{"SubnetId": "subnet-1"}]}],
+                "DirectConnectGateways": []}
+    assert _round_trip(topology, path + "/") == topology
+    assert "Subnets.Extra.npy" not in os.listdir(path)
+    assert os.listdir(tmp_path) == ["snapshot.cols"]
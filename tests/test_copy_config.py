@@ -0,0 +1,82 @@
+import importlib
+import io
+import json
+import os
+from types import SimpleNamespace
+
+import pytest
+from botocore.response import StreamingBody
+from botocore.stub import Stubber
+
+os.environ.setdefault("CONFIG_BUCKET", "config-bucket")
+os.environ.setdefault("CONFIG_KEY", "copy/config.json")
+
+import s3_copy  # noqa: E402
+
+copy_lambda = importlib.import_module("lambda")
+
+# The mapping config cache in lambda.py against a stubbed S3 client and a
+# clock the test moves forward.
+
+CONFIG = {"source_bucket": "src", "dest_bucket": "dst", "mappings": [{"source_prefix": "in/", "dest_prefix": "out/"}]}
+LOCATION = {"Bucket": os.environ["CONFIG_BUCKET"], "Key": os.environ["CONFIG_KEY"]}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(copy_lambda, "time", SimpleNamespace(monotonic=lambda: now[0]))
+    monkeypatch.setattr(copy_lambda, "_config_cache", {"config": None, "trie": None, "etag": None, "checked_at": 0.0})
+    return now
+
+
+@pytest.fixture
+def s3():
+    with Stubber(s3_copy.s3_client) as stubber:
+        yield stubber
+        stubber.assert_no_pending_responses()
+
+
+def _config_object(config, etag):
+    body = json.dumps(config).encode()
+    return {"Body": StreamingBody(io.BytesIO(body), len(body)), "ETag": etag}
+
+
+def test_cached_config_is_trusted_until_the_ttl_expires(clock, s3):
+    s3.add_response("get_object", _config_object(CONFIG, '"v1"'), LOCATION)
+    assert copy_lambda.load_config() == (CONFIG, "miss")
+    clock[0] += copy_lambda.CONFIG_TTL_SECONDS - 1
+    assert copy_lambda.load_config() == (CONFIG, "hit")
+
+    changed = dict(CONFIG, dest_bucket="dst-2")
+    s3.add_response("get_object", _config_object(changed, '"v2"'), dict(LOCATION, IfNoneMatch='"v1"'))
+    clock[0] += 1
+    assert copy_lambda.load_config() == (changed, "miss")
+    assert copy_lambda.match_rule(copy_lambda._config_cache["trie"], "in/a")["dest_prefix"] == "out/"
+
+
+def test_not_modified_keeps_the_cached_config(clock, s3):
+    s3.add_response("get_object", _config_object(CONFIG, '"v1"'), LOCATION)
+    copy_lambda.load_config()
+    trie = copy_lambda._config_cache["trie"]
+
+    s3.add_client_error("get_object", "304", http_status_code=304, expected_params=dict(LOCATION, IfNoneMatch='"v1"'))
+    clock[0] += copy_lambda.CONFIG_TTL_SECONDS
+    config, outcome = copy_lambda.load_config()
+    assert (config, outcome) == (CONFIG, "not_modified")
+    assert copy_lambda._config_cache["trie"] is trie
+    # The revalidation restarts the TTL
+    clock[0] += 1
+    assert copy_lambda.load_config()[1] == "hit"
+
+
+def test_failed_revalidation_serves_the_stale_config(clock, s3):
+    s3.add_response("get_object", _config_object(CONFIG, '"v1"'), LOCATION)
+    copy_lambda.load_config()
+
+    s3.add_client_error("get_object", "AccessDenied", http_status_code=403)
+    clock[0] += copy_lambda.CONFIG_TTL_SECONDS
+    assert copy_lambda.load_config() == (CONFIG, "stale")
+    # Not counted as a check, so the next call tries again
+    s3.add_response("get_object", _config_object(CONFIG, '"v1"'), dict(LOCATION, IfNoneMatch='"v1"'))
+    assert copy_lambda.load_config() == (CONFIG, "miss")
@@ -0,0 +1,41 @@
+import json
+import os
+
+import pytest
+from botocore.stub import Stubber
+
+for name, value in (("SOURCE_BUCKET", "src"), ("DEST_BUCKET", "dst"), ("SOURCE_PREFIX", "in/"), ("DEST_PREFIX", "out/")):
+    os.environ.setdefault(name, value)
+
+import lambda_function  # noqa: E402
+import s3_copy  # noqa: E402
+
+# A batch of SQS-wrapped S3 events through lambda_function, with S3
+# stubbed: only the records that fail are reported back.
+
+
+def _message(message_id, key):
+    body = {"Records": [{"eventSource": "aws:s3", "s3": {"bucket": {"name": "src"},
+                                                         "object": {"key": key, "size": 10, "sequencer": "01"}}}]}
+    return {"messageId": message_id, "eventSource": "aws:sqs", "body": json.dumps(body)}
+
+
+@pytest.fixture
+def s3(monkeypatch):
+    # One record at a time, so the stubbed calls come in order
+    monkeypatch.setattr(s3_copy, "RECORD_CONCURRENCY", 1)
+    monkeypatch.setattr(s3_copy, "QUEUE_URL", None)
+    with Stubber(s3_copy.s3_client) as stubber:
+        yield stubber
+        stubber.assert_no_pending_responses()
+
+
+def test_each_bad_record_reports_only_itself(s3):
+    records = [_message("m1", "in/a"), _message("m2", "in/b"), _message("m3", "in/c"),
+               {"messageId": "m4", "eventSource": "aws:sqs", "body": "not json"}]
+    s3.add_response("copy_object", {}, {"CopySource": {"Bucket": "src", "Key": "in/a"}, "Bucket": "dst", "Key": "out/a"})
+    s3.add_client_error("copy_object", "AccessDenied", http_status_code=403)
+    s3.add_response("copy_object", {}, {"CopySource": {"Bucket": "src", "Key": "in/c"}, "Bucket": "dst", "Key": "out/c"})
+
+    result = lambda_function.lambda_handler({"Records": records}, None)
+    assert result == {"batchItemFailures": [{"itemIdentifier": "m2"}, {"itemIdentifier": "m4"}]}
@@ -0,0 +1,47 @@
+import importlib
+import os
+
+os.environ.setdefault("CONFIG_BUCKET", "config-bucket")
+os.environ.setdefault("CONFIG_KEY", "copy/config.json")
+
+copy_lambda = importlib.import_module("lambda")
+
+# Copy rule matching in lambda.py: first match in config order, or the
+# longest matching prefix.
+
+MAPPINGS = [
+    {"source_prefix": "data/", "dest_prefix": "all/"},
+    {"source_prefix": "data/raw/", "dest_prefix": "raw/"},
+    {"source_prefix": "data/", "dest_prefix": "duplicate/"},
+    {"source_prefix": "logs/", "dest_prefix": "logs/"},
+]
+
+
+def _dest(mappings, key, longest=False):
+    rule = copy_lambda.match_rule(copy_lambda.compile_mappings(mappings), key, longest)
+    return rule and rule["dest_prefix"]
+
+
+def test_first_match_follows_config_order():
+    assert _dest(MAPPINGS, "data/raw/x.csv") == "all/"
+    assert _dest(MAPPINGS[1:], "data/raw/x.csv") == "raw/"
+    assert _dest(MAPPINGS, "logs/app.log") == "logs/"
+    assert _dest(MAPPINGS, "other/x") is None
+
+
+def test_longest_match_takes_the_most_specific_prefix():
+    assert _dest(MAPPINGS, "data/raw/x.csv", longest=True) == "raw/"
+    # A duplicated prefix keeps its first rule
+    assert _dest(MAPPINGS, "data/x.csv", longest=True) == "all/"
+    assert _dest(MAPPINGS, "data/ra", longest=True) == "all/"
+
+
+def test_empty_prefix_matches_every_key():
+    mappings = MAPPINGS + [{"source_prefix": "", "dest_prefix": "rest/"}]
+    assert _dest(mappings, "other/x") == "rest/"
+    assert _dest(mappings, "") == "rest/"
+    assert _dest(mappings, "data/raw/x.csv") == "all/"
+    assert _dest(mappings, "data/raw/x.csv", longest=True) == "raw/"
+    # First in config order, it shadows every other rule
+    assert _dest(mappings[-1:] + MAPPINGS, "data/raw/x.csv") == "rest/"
+    assert _dest(mappings[-1:] + MAPPINGS, "data/raw/x.csv", longest=True) == "raw/"
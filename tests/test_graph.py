@@ -0,0 +1,50 @@
+import xml.etree.ElementTree as ET
+
+import numpy as np
+
+from network_topology.graph import build_graph, write_gexf, write_graphml
+from network_topology.standin import synthetic_estate
+
+# Graph exports read back without pickling and carry the per-kind
+# attribute tables.
+
+
+def _topology():
+    estate = synthetic_estate(tgws=1, route_tables=1, routes=1, vpcs=3, subnets=2, vpns=0, dx_gateways=0)
+    ec2 = estate["ec2"]
+    return {
+        "TransitGateways": [],
+        "DirectConnectGateways": [],
+        "VPCs": [{**vpc, "Subnets": [sn for sn in ec2["DescribeSubnets"] if sn["VpcId"] == vpc["VpcId"]]}
+                 for vpc in ec2["DescribeVpcs"]],
+    }
+
+
+def test_npz_loads_without_pickle_and_keeps_attributes(tmp_path):
+    topology = _topology()
+    graph = build_graph(topology)
+    path = tmp_path / "graph.npz"
+    np.savez_compressed(path, **graph.to_arrays())
+    with np.load(path) as arrays:
+        assert arrays["ids"].tolist() == graph.ids
+        vpcs = {graph.ids[n]: cidr for n, cidr in zip(arrays["vpc.node"], arrays["vpc.CidrBlock"])}
+    assert vpcs == {vpc["VpcId"]: vpc["CidrBlock"] for vpc in topology["VPCs"]}
+
+
+def test_graphml_and_gexf_carry_attributes(tmp_path):
+    topology = _topology()
+    graph = build_graph(topology)
+    subnet = topology["VPCs"][0]["Subnets"][0]
+
+    write_graphml(graph, tmp_path / "graph.graphml")
+    ns = {"g": "http://graphml.graphdrawing.org/xmlns"}
+    node = ET.parse(tmp_path / "graph.graphml").find(f'.//g:node[@id="{subnet["SubnetId"]}"]', ns)
+    assert node.find('g:data[@key="AvailabilityZone"]', ns).text == subnet["AvailabilityZone"]
+
+    write_gexf(graph, tmp_path / "graph.gexf")
+    ns = {"g": "http://gexf.net/1.3"}
+    root = ET.parse(tmp_path / "graph.gexf").getroot()
+    titles = {a.get("id"): a.get("title") for a in root.find("g:graph/g:attributes[@class='node']", ns)}
+    node = root.find(f'.//g:node[@label="{subnet["SubnetId"]}"]', ns)
+    values = {titles[v.get("for")]: v.get("value") for v in node.find("g:attvalues", ns)}
+    assert values["CidrBlock"] == subnet["CidrBlock"]
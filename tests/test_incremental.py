@@ -0,0 +1,137 @@
+import json
+import os
+
+import pytest
+
+from network_topology import snapshot
+from network_topology.collect import SECTIONS, collect_topology
+from network_topology.instrument import ApiRecorder
+from network_topology.snapshot import (
+    fingerprint, iter_snapshot, load_latest_snapshot, normalize, previous_state, scan_snapshot
+)
+from network_topology.standin import StandIn, standin_clients, synthetic_estate
+from network_topology.writer import COMPRESSION_SUFFIX, write_topology
+
+# Incremental refresh against the stand-in: which TGW route tables keep
+# their previous routes and which are searched again.
+
+
+def _estate():
+    return synthetic_estate(tgws=2, route_tables=2, routes=10, vpcs=8, subnets=1, vpns=0, dx_gateways=0)
+
+
+def _collect(estate, previous=None):
+    ec2, dx = standin_clients(StandIn(estate))
+    recorder = ApiRecorder()
+    recorder.attach(ec2)
+    topology = normalize(collect_topology(ec2, dx, previous=previous_state(previous) if previous else None))
+    searched = sum(1 for r in recorder.records if r["Operation"] == "search_transit_gateway_routes")
+    return topology, searched
+
+
+def _route_tables(estate):
+    return [rtb["TransitGatewayRouteTableId"] for rtb in estate["ec2"]["DescribeTransitGatewayRouteTables"]]
+
+
+def test_unchanged_route_tables_are_not_searched_again():
+    estate = _estate()
+    previous, searched = _collect(estate)
+    assert searched == len(_route_tables(estate))
+    topology, searched = _collect(estate, previous)
+    assert searched == 0
+    assert topology == previous
+
+
+def test_disabled_propagation_forces_a_search():
+    estate = _estate()
+    previous, _ = _collect(estate)
+    rtb_id = _route_tables(estate)[0]
+    estate["ec2"]["GetTransitGatewayRouteTablePropagations"][rtb_id][0]["State"] = "disabled"
+    _, searched = _collect(estate, previous)
+    assert searched == 1
+
+
+def test_new_vpc_cidr_forces_a_search_of_the_tables_it_propagates_into():
+    estate = _estate()
+    previous, _ = _collect(estate)
+    vpc = estate["ec2"]["DescribeVpcs"][0]
+    vpc["CidrBlockAssociationSet"].append(
+        {"AssociationId": "vpc-cidr-assoc-new", "CidrBlock": "100.64.0.0/24", "CidrBlockState": {"State": "associated"}})
+    propagating = [
+        rtb_id for rtb_id, props in estate["ec2"]["GetTransitGatewayRouteTablePropagations"].items()
+        if any(p["ResourceId"] == vpc["VpcId"] for p in props)
+    ]
+    _, searched = _collect(estate, previous)
+    assert searched == len(propagating) == 1
+
+
+def test_bgp_propagations_are_always_searched():
+    estate = _estate()
+    rtb_id = _route_tables(estate)[0]
+    estate["ec2"]["GetTransitGatewayRouteTablePropagations"][rtb_id].append(
+        {"TransitGatewayAttachmentId": "tgw-attach-vpn", "ResourceId": "vpn-1", "ResourceType": "vpn",
+         "State": "enabled"})
+    previous, _ = _collect(estate)
+    _, searched = _collect(estate, previous)
+    assert searched == 1
+
+
+def test_multi_account_crawls_are_not_taken_as_the_previous_snapshot(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    with open("network_topology_20240101_000000.json", "w") as f:
+        json.dump({"TransitGateways": [], "VPCs": [], "DirectConnectGateways": []}, f)
+    with open("network_topology_multi_20240102_000000.json", "w") as f:
+        json.dump({"Accounts": {}, "Shards": []}, f)
+    os.utime("network_topology_20240101_000000.json", (0, 0))
+    path, topology = load_latest_snapshot()
+    assert path == "network_topology_20240101_000000.json"
+    assert "TransitGateways" in topology
+
+
+@pytest.mark.parametrize("compact", [False, True])
+@pytest.mark.parametrize("compression", [None, "gzip"])
+def test_snapshots_are_read_back_one_entity_at_a_time(tmp_path, compact, compression):
+    topology, _ = _collect(_estate())
+    path = str(tmp_path / f"network_topology_20240101_000000.json{COMPRESSION_SUFFIX[compression]}")
+    write_topology(path, ((s, e) for s in SECTIONS for e in topology[s]), compact=compact, compression=compression)
+    # A tiny chunk size splits strings, numbers and entities across reads
+    read = {section: [] for section in SECTIONS}
+    for section, entity in iter_snapshot(path, chunk_size=7):
+        read[section].append(entity)
+    assert read == topology
+
+    state, fingerprints = scan_snapshot(path)
+    assert fingerprints == fingerprint(topology)
+    assert state == previous_state(topology)
+
+
+def test_scanning_a_multi_account_crawl_finds_nothing_to_reuse(tmp_path):
+    path = str(tmp_path / "crawl.json")
+    with open(path, "w") as f:
+        json.dump({"Accounts": {"123456789012": {}}, "Shards": []}, f)
+    assert scan_snapshot(path) == (None, None)
+
+
+def test_static_route_changes_are_picked_up_once_the_routes_are_old(monkeypatch):
+    clock = [1_700_000_000.0]
+    monkeypatch.setattr(snapshot, "_now", lambda: clock[0])
+    estate = _estate()
+    previous, _ = _collect(estate)
+    rtb_id = _route_tables(estate)[0]
+    routes = estate["ec2"]["SearchTransitGatewayRoutes"][rtb_id]
+    routes.append(dict(routes[0], DestinationCidrBlock="192.168.0.0/24", Type="static"))
+
+    # Hourly runs keep the stale routes until they are MAX_ROUTE_AGE_SECONDS old
+    runs = 0
+    while True:
+        clock[0] += 3600
+        runs += 1
+        previous, searched = _collect(estate, previous)
+        if searched:
+            break
+    assert runs * 3600 == snapshot.MAX_ROUTE_AGE_SECONDS
+    assert searched == len(_route_tables(estate))
+    rtb = next(r for tgw in previous["TransitGateways"] for r in tgw["RouteTables"]
+               if r["TransitGatewayRouteTableId"] == rtb_id)
+    assert "192.168.0.0/24" in [r["DestinationCidrBlock"] for r in rtb["Routes"]]
+    assert rtb["LastSearched"] == snapshot.search_stamp()
@@ -0,0 +1,61 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from network_topology.collect import collect_topology
+from network_topology.snapshot import normalize
+from network_topology.standin import StandIn, standin_clients, synthetic_estate
+
+# The offline scripts read a multi-account crawl as one estate, the same
+# way cidr_overlap_check always has.
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def multi_account_snapshot(tmp_path):
+    ec2, dx = standin_clients(StandIn(synthetic_estate(
+        tgws=1, route_tables=2, routes=5, vpcs=4, subnets=2, vpns=2, dx_gateways=1, vifs=2)))
+    topology = normalize(collect_topology(ec2, dx))
+    path = tmp_path / "network_topology_multi_20240101_000000.json"
+    path.write_text(json.dumps({"Accounts": {"123456789012": {"us-east-1": topology}}, "Shards": []}))
+    return str(path), topology
+
+
+def _run(*args, stdin=None):
+    return subprocess.run([sys.executable, *args], input=stdin, cwd=ROOT,
+                          capture_output=True, text=True, check=True).stdout
+
+
+def test_tgw_routing_report_lists_each_route_table_once(multi_account_snapshot):
+    path, topology = multi_account_snapshot
+    _run("tgw_routing_report.py", path)
+    with open(path[:-len(".json")] + ".tgw-routing.json") as f:
+        report = json.load(f)
+    tgw = topology["TransitGateways"][0]
+    assert set(report["Attachments"]) == {a["TransitGatewayAttachmentId"] for a in tgw["Attachments"]}
+    assert set(report["RouteTables"]) == {r["TransitGatewayRouteTableId"] for r in tgw["RouteTables"]}
+    assert all("EffectiveRoutes" not in att for att in report["Attachments"].values())
+    for rtb in tgw["RouteTables"]:
+        assert len(report["RouteTables"][rtb["TransitGatewayRouteTableId"]]["Routes"]) == len(rtb["Routes"])
+
+
+def test_reachability_query_finds_subnets_in_every_account(multi_account_snapshot):
+    path, topology = multi_account_snapshot
+    subnet = topology["VPCs"][0]["Subnets"][0]
+    destination = subnet["CidrBlock"].split("/")[0]
+    result = json.loads(_run("reachability_query.py", path, stdin=f"{subnet['SubnetId']} {destination}\n"))
+    assert result["Reachable"], result
+
+
+def test_render_and_graph_see_every_account(multi_account_snapshot):
+    path, topology = multi_account_snapshot
+    _run("render_topology.py", path)
+    with open(path[:-len(".json")] + ".mmd") as f:
+        assert topology["VPCs"][0]["VpcId"] in f.read()
+    _run("topology_graph.py", path)
+    with open(path[:-len(".json")] + ".graphml") as f:
+        assert topology["TransitGateways"][0]["TransitGatewayId"] in f.read()
@@ -0,0 +1,109 @@
+import boto3
+import botocore.session
+import pytest
+from botocore.stub import Stubber
+
+from network_topology.fetch import MAX_PAGE_SIZE, TOKEN_PAGED, paginate
+
+# Stubbed multi-page responses for every describe/search/get call the
+# collectors page through: every item of every page must come out, in order.
+
+PAGES = 3
+ITEMS_PER_PAGE = 2
+
+ROUTE_STATES = [{"Name": "state", "Values": ["active", "blackhole"]}]
+
+# (service, operation, result key, item id key, request parameters the collectors pass)
+PAGED_CALLS = [
+    ("ec2", "describe_transit_gateways", "TransitGateways", "TransitGatewayId", {}),
+    ("ec2", "describe_transit_gateway_attachments", "TransitGatewayAttachments", "TransitGatewayAttachmentId", {}),
+    ("ec2", "describe_transit_gateway_route_tables", "TransitGatewayRouteTables", "TransitGatewayRouteTableId", {}),
+    ("ec2", "describe_transit_gateway_peering_attachments", "TransitGatewayPeeringAttachments",
+     "TransitGatewayAttachmentId", {}),
+    ("ec2", "describe_vpcs", "Vpcs", "VpcId", {}),
+    ("ec2", "describe_subnets", "Subnets", "SubnetId", {}),
+    ("ec2", "describe_route_tables", "RouteTables", "RouteTableId", {}),
+    ("ec2", "describe_vpc_peering_connections", "VpcPeeringConnections", "VpcPeeringConnectionId", {}),
+    ("ec2", "search_transit_gateway_routes", "Routes", "DestinationCidrBlock",
+     {"TransitGatewayRouteTableId": "tgw-rtb-1", "Filters": ROUTE_STATES}),
+    ("ec2", "get_transit_gateway_route_table_associations", "Associations", "TransitGatewayAttachmentId",
+     {"TransitGatewayRouteTableId": "tgw-rtb-1"}),
+    ("ec2", "get_transit_gateway_route_table_propagations", "TransitGatewayRouteTablePropagations",
+     "TransitGatewayAttachmentId", {"TransitGatewayRouteTableId": "tgw-rtb-1"}),
+    ("directconnect", "describe_direct_connect_gateways", "directConnectGateways", "directConnectGatewayId", {}),
+    ("directconnect", "describe_virtual_interfaces", "virtualInterfaces", "virtualInterfaceId", {}),
+    ("directconnect", "describe_direct_connect_gateway_associations", "directConnectGatewayAssociations",
+     "associationId", {"directConnectGatewayId": "dxgw-1"}),
+]
+
+# Calls whose API answers in one response
+UNPAGED_CALLS = [
+    ("ec2", "describe_vpn_connections", "VpnConnections", "VpnConnectionId"),
+    ("ec2", "describe_customer_gateways", "CustomerGateways", "CustomerGatewayId"),
+    ("ec2", "describe_vpn_gateways", "VpnGateways", "VpnGatewayId"),
+]
+
+
+def _client(service):
+    return boto3.client(service, region_name="us-east-1", aws_access_key_id="test", aws_secret_access_key="test")
+
+
+def _paging(client, operation):
+    # (page size parameter, token parameter, token response key, more-results flag or None)
+    if operation in TOKEN_PAGED:
+        return TOKEN_PAGED[operation] + (None,)
+    service = client.meta.service_model.service_name
+    config = botocore.session.get_session().get_paginator_model(service).get_paginator(
+        client.meta.method_to_api_mapping[operation])
+    return config["limit_key"], config["input_token"], config["output_token"], config.get("more_results")
+
+
+@pytest.mark.parametrize("service, operation, result_key, id_key, params", PAGED_CALLS,
+                         ids=[call[1] for call in PAGED_CALLS])
+def test_every_page_is_consumed(service, operation, result_key, id_key, params):
+    client = _client(service)
+    size_param, token_param, token_key, more_key = _paging(client, operation)
+    expected = []
+    with Stubber(client) as stubber:
+        for page in range(PAGES):
+            items = [{id_key: f"{operation}-{page}-{i}"} for i in range(ITEMS_PER_PAGE)]
+            expected.extend(items)
+            response = {result_key: items}
+            last = page == PAGES - 1
+            if not last:
+                response[token_key] = f"token-{page + 1}"
+            if more_key:
+                response[more_key] = not last
+            request = dict(params, **{size_param: MAX_PAGE_SIZE[operation]})
+            if page:
+                request[token_param] = f"token-{page}"
+            stubber.add_response(operation, response, request)
+
+        assert list(paginate(client, operation, result_key, **params)) == expected
+        stubber.assert_no_pending_responses()
+
+
+def test_route_search_stops_when_no_more_routes_are_available():
+    # A token without AdditionalRoutesAvailable must not be followed
+    client = _client("ec2")
+    params = {"TransitGatewayRouteTableId": "tgw-rtb-1", "Filters": ROUTE_STATES}
+    routes = [{"DestinationCidrBlock": "10.0.0.0/16"}]
+    with Stubber(client) as stubber:
+        stubber.add_response(
+            "search_transit_gateway_routes",
+            {"Routes": routes, "AdditionalRoutesAvailable": False, "NextToken": "ignored"},
+            dict(params, MaxResults=MAX_PAGE_SIZE["search_transit_gateway_routes"])
+        )
+        assert list(paginate(client, "search_transit_gateway_routes", "Routes", **params)) == routes
+        stubber.assert_no_pending_responses()
+
+
+@pytest.mark.parametrize("service, operation, result_key, id_key", UNPAGED_CALLS,
+                         ids=[call[1] for call in UNPAGED_CALLS])
+def test_unpaged_calls_are_made_once(service, operation, result_key, id_key):
+    client = _client(service)
+    items = [{id_key: f"{operation}-{i}"} for i in range(ITEMS_PER_PAGE)]
+    with Stubber(client) as stubber:
+        stubber.add_response(operation, {result_key: items}, {})
+        assert list(paginate(client, operation, result_key)) == items
+        stubber.assert_no_pending_responses()
@@ -0,0 +1,82 @@
+import os
+import subprocess
+import sys
+
+from network_topology.collect import SECTIONS
+from network_topology.reachability import ReachabilityIndex
+from network_topology.writer import write_topology
+
+# Reachability over a hand-built topology: one dual-stack VPC whose only
+# way out is a default route to its internet gateway, and a second VPC
+# nothing routes to.
+
+
+def _topology():
+    return {
+        "TransitGateways": [],
+        "DirectConnectGateways": [],
+        "VPCs": [
+            {
+                "VpcId": "vpc-a",
+                "CidrBlock": "10.0.0.0/16",
+                "CidrBlockAssociationSet": [
+                    {"CidrBlock": "10.0.0.0/16", "CidrBlockState": {"State": "associated"}}],
+                "Ipv6CidrBlockAssociationSet": [
+                    {"Ipv6CidrBlock": "2600:1f18:1::/56", "Ipv6CidrBlockState": {"State": "associated"}}],
+                "Subnets": [
+                    {"SubnetId": "subnet-a", "CidrBlock": "10.0.1.0/24", "Ipv6CidrBlockAssociationSet": [
+                        {"Ipv6CidrBlock": "2600:1f18:1:1::/64", "Ipv6CidrBlockState": {"State": "associated"}}]},
+                    {"SubnetId": "subnet-v6", "CidrBlock": None, "Ipv6CidrBlockAssociationSet": [
+                        {"Ipv6CidrBlock": "2600:1f18:1:2::/64", "Ipv6CidrBlockState": {"State": "associated"}}]},
+                ],
+                "RouteTables": [{
+                    "RouteTableId": "rtb-a",
+                    "Associations": [{"Main": True}],
+                    "Routes": [
+                        {"DestinationCidrBlock": "10.0.0.0/16", "GatewayId": "local", "State": "active"},
+                        {"DestinationIpv6CidrBlock": "2600:1f18:1::/56", "GatewayId": "local", "State": "active"},
+                        {"DestinationCidrBlock": "0.0.0.0/0", "GatewayId": "igw-a", "State": "active"},
+                    ],
+                }],
+                "PeeringConnections": [],
+            },
+            {
+                "VpcId": "vpc-b",
+                "CidrBlock": "100.64.0.0/16",
+                "CidrBlockAssociationSet": [
+                    {"CidrBlock": "100.64.0.0/16", "CidrBlockState": {"State": "associated"}}],
+                "Subnets": [], "RouteTables": [], "PeeringConnections": [],
+            },
+        ],
+    }
+
+
+def test_ipv6_destinations_are_delivered_to_their_subnet():
+    index = ReachabilityIndex(_topology())
+    result = index.query("subnet-a", "2600:1f18:1:2::10")
+    assert result["Reachable"]
+    assert result["Hops"][-1] == "subnet-v6"
+
+
+def test_internet_exits_do_not_reach_private_or_vpc_space():
+    index = ReachabilityIndex(_topology())
+    for destination, owner in (("192.168.5.5", "private address space"), ("100.64.0.10", "vpc-b")):
+        result = index.query("subnet-a", destination)
+        assert not result["Reachable"] and result["EgressOnly"]
+        assert result["Hops"][-1] == "igw-a"
+        assert owner in result["Reason"]
+    assert index.query("subnet-a", "8.8.8.8")["Reachable"]
+
+
+def test_malformed_queries_are_reported_per_line(tmp_path):
+    snapshot = str(tmp_path / "network_topology.json")
+    topology = _topology()
+    write_topology(snapshot, ((section, e) for section in SECTIONS for e in topology[section]))
+    queries = "subnet-a 10.0.1.5\nsubnet-a 10.0.1\nsubnet-a\nsubnet-a 8.8.8.8\n"
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    out = subprocess.run([sys.executable, "reachability_query.py", snapshot], input=queries, cwd=root,
+                         capture_output=True, text=True, check=True).stdout.splitlines()
+    assert len(out) == 4
+    assert '"Reachable": true' in out[0] and '"Reachable": true' in out[3]
+    assert "'10.0.1' is not an IP address" in out[1]
+    assert "'' is not an IP address" in out[2]
@@ -0,0 +1,50 @@
+import re
+
+from network_topology.render import render_mermaid_summary
+
+# The Mermaid summary keeps within its node budget, counting every node
+# Mermaid would draw, including edge ends that are not in the topology.
+
+
+def _nodes(mermaid):
+    # Every node id that is declared or used as an edge end
+    nodes = set()
+    for line in mermaid.splitlines():
+        if line.startswith(("graph ", "%%", "classDef ", "linkStyle ")):
+            continue
+        line = re.sub(r'\\["[^"]*"\\]|:::\\w+|\\|"[^"]*"\\|', "", line)
+        nodes.update(part for part in re.split(r"\\s*(?:---|-->|-\\.->)\\s*", line) if part)
+    return nodes
+
+
+def _topology(tgws=1):
+    vpc = {
+        "VpcId": "vpc-a",
+        "Subnets": [{"SubnetId": "subnet-a", "AvailabilityZone": "us-east-1a"}],
+        "RouteTables": [{"Routes": [{"DestinationCidrBlock": "10.1.0.0/16", "TransitGatewayId": "tgw-elsewhere"}]}],
+    }
+    return {
+        "TransitGateways": [
+            {"TransitGatewayId": f"tgw-{i}", "Attachments": [{"ResourceType": "vpc", "ResourceId": "vpc-gone"}]}
+            for i in range(tgws)
+        ],
+        "VPCs": [vpc],
+        "DirectConnectGateways": [],
+    }
+
+
+def test_undeclared_edge_ends_count_against_the_budget():
+    topology = _topology()
+    az = render_mermaid_summary(topology, node_budget=5)
+    # tgw-0, vpc-gone, vpc-a, tgw-elsewhere and the AZ node
+    assert "level of detail: az" in az and len(_nodes(az)) == 5
+    vpc = render_mermaid_summary(topology, node_budget=4)
+    assert "level of detail: vpc" in vpc and len(_nodes(vpc)) == 4
+    assert "level of detail: tgw" in render_mermaid_summary(topology, node_budget=3)
+
+
+def test_summaries_over_budget_at_every_level_are_truncated():
+    summary = render_mermaid_summary(_topology(tgws=10), node_budget=4)
+    assert "level of detail: tgw" in summary
+    assert len(_nodes(summary)) == 4
+    assert '"+7 more"' in summary
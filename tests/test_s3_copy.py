@@ -0,0 +1,63 @@
+import pytest
+from botocore.exceptions import ClientError
+from botocore.stub import Stubber
+
+import s3_copy
+
+# The shared copy engine against a stubbed S3 client: 5 MiB parts, one
+# part at a time so the stubbed calls come in order.
+
+SOURCE = {"Bucket": "src", "Key": "data/big.bin"}
+ETAG = '"0123456789abcdef"'
+MB = s3_copy.MB
+
+
+@pytest.fixture
+def s3(monkeypatch):
+    monkeypatch.setattr(s3_copy, "MULTIPART_THRESHOLD", 5 * MB)
+    monkeypatch.setattr(s3_copy, "PART_SIZE", 5 * MB)
+    monkeypatch.setattr(s3_copy, "COPY_CONCURRENCY", 1)
+    with Stubber(s3_copy.s3_client) as stubber:
+        yield stubber
+        stubber.assert_no_pending_responses()
+
+
+def _start_upload(stubber, size):
+    stubber.add_response("head_object", {"ContentLength": size, "ETag": ETAG, "ContentType": "application/zip",
+                                         "StorageClass": "STANDARD_IA"}, SOURCE)
+    stubber.add_response("get_object_tagging", {"TagSet": [{"Key": "team", "Value": "net ops"}]}, SOURCE)
+    stubber.add_response("create_multipart_upload", {"UploadId": "up-1"}, {
+        "Bucket": "dst", "Key": "copy/big.bin", "ContentType": "application/zip",
+        "StorageClass": "STANDARD_IA", "Tagging": "team=net+ops"})
+
+
+def _part(stubber, number, first, last):
+    stubber.add_response("upload_part_copy", {"CopyPartResult": {"ETag": f'"part{number}"'}}, {
+        "Bucket": "dst", "Key": "copy/big.bin", "UploadId": "up-1", "PartNumber": number,
+        "CopySource": SOURCE, "CopySourceRange": f"bytes={first}-{last}", "CopySourceIfMatch": ETAG})
+
+
+def test_parts_are_planned_from_head_not_the_event(s3):
+    # The event says 100 MiB, but the object HEAD finds is 12 MiB
+    _start_upload(s3, 12 * MB)
+    _part(s3, 1, 0, 5 * MB - 1)
+    _part(s3, 2, 5 * MB, 10 * MB - 1)
+    _part(s3, 3, 10 * MB, 12 * MB - 1)
+    s3.add_response("complete_multipart_upload", {}, {
+        "Bucket": "dst", "Key": "copy/big.bin", "UploadId": "up-1",
+        "MultipartUpload": {"Parts": [{"ETag": f'"part{n}"', "PartNumber": n} for n in (1, 2, 3)]}})
+    assert s3_copy.copy_object(SOURCE, 100 * MB, "dst", "copy/big.bin") == 3
+
+
+def test_a_source_overwritten_mid_copy_aborts_the_upload(s3):
+    _start_upload(s3, 10 * MB)
+    _part(s3, 1, 0, 5 * MB - 1)
+    s3.add_client_error("upload_part_copy", "PreconditionFailed", http_status_code=412)
+    s3.add_response("abort_multipart_upload", {}, {"Bucket": "dst", "Key": "copy/big.bin", "UploadId": "up-1"})
+    with pytest.raises(ClientError, match="PreconditionFailed"):
+        s3_copy.copy_object(SOURCE, 10 * MB, "dst", "copy/big.bin")
+
+
+def test_small_objects_take_one_copy_object_call(s3):
+    s3.add_response("copy_object", {}, {"CopySource": SOURCE, "Bucket": "dst", "Key": "copy/big.bin"})
+    assert s3_copy.copy_object(SOURCE, 5 * MB, "dst", "copy/big.bin") == 1
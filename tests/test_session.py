@@ -0,0 +1,70 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from botocore.stub import Stubber
+
+from network_topology import session
+from network_topology.instrument import record_api_calls
+
+# Assumed-role sessions, with STS replaced by a counter: credentials come
+# through the session's public get_credentials, one cache entry per
+# role, session name and region. API recording hooks into the clients
+# built here and must come out of them again.
+
+
+@pytest.fixture
+def assumed(monkeypatch):
+    calls = []
+
+    def fetcher(role_arn, session_name, region):
+        def fetch():
+            calls.append((role_arn, session_name, region))
+            return {
+                "access_key": f"AKIA{len(calls)}",
+                "secret_key": "secret",
+                "token": session_name,
+                "expiry_time": (datetime.now(timezone.utc) + timedelta(hours=1)).isoformat()
+            }
+        return fetch
+
+    monkeypatch.setattr(session, "_assume_role_fetcher", fetcher)
+    monkeypatch.setattr(session, "_start_refresher", lambda: None)
+    monkeypatch.setattr(session, "_sessions", {})
+    monkeypatch.setattr(session, "_clients", {})
+    return calls
+
+
+def test_credentials_come_from_the_assumed_role(assumed):
+    s = session.assumed_role_session("arn:aws:iam::123456789012:role/r", "crawl", "us-east-1")
+    creds = s.get_credentials().get_frozen_credentials()
+    assert (creds.access_key, creds.token) == ("AKIA1", "crawl")
+    assert s.region_name == "us-east-1"
+    assert session.assumed_role_session("arn:aws:iam::123456789012:role/r", "crawl", "us-east-1") is s
+    assert len(assumed) == 1
+
+
+def test_session_names_are_cached_apart(assumed):
+    role = "arn:aws:iam::123456789012:role/r"
+    first = session.get_client("ec2", role, "crawl-a", "us-east-1")
+    second = session.get_client("ec2", role, "crawl-b", "us-east-1")
+    assert first is not second
+    creds = session.assumed_role_session(role, "crawl-b", "us-east-1").get_credentials()
+    assert creds.get_frozen_credentials().token == "crawl-b"
+    assert [name for _, name, _ in assumed] == ["crawl-a", "crawl-b"]
+
+
+def test_api_recording_stops_cleanly(assumed, monkeypatch):
+    monkeypatch.setattr(session, "_client_hooks", [])
+    role = "arn:aws:iam::123456789012:role/r"
+    with record_api_calls() as recorder:
+        client = session.get_client("ec2", role, "crawl", "us-east-1")
+        with Stubber(client) as stubber:
+            stubber.add_response("describe_vpcs", {"Vpcs": []})
+            client.describe_vpcs()
+    assert session._client_hooks == []
+    assert [r["Operation"] for r in recorder.records] == ["describe_vpcs"]
+
+    with Stubber(client) as stubber:
+        stubber.add_response("describe_vpcs", {"Vpcs": []})
+        client.describe_vpcs()
+    assert len(recorder.records) == 1
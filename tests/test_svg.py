@@ -0,0 +1,36 @@
+import os
+
+from network_topology import render
+from network_topology.render import render_all
+from network_topology.standin import synthetic_estate
+from network_topology.svg import render_html, render_svg
+
+# render_all lays the topology out once for the SVG and HTML outputs.
+
+
+def _topology():
+    estate = synthetic_estate(tgws=1, route_tables=1, routes=1, vpcs=3, subnets=4, vpns=0, dx_gateways=0)
+    subnets = estate["ec2"]["DescribeSubnets"]
+    return {
+        "TransitGateways": [],
+        "DirectConnectGateways": [],
+        "VPCs": [{"VpcId": vpc["VpcId"], "CidrBlock": vpc["CidrBlock"],
+                  "Subnets": [sn for sn in subnets if sn["VpcId"] == vpc["VpcId"]]}
+                 for vpc in estate["ec2"]["DescribeVpcs"]],
+    }
+
+
+def test_svg_and_html_share_one_layout(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    calls = []
+    layout = render.layout
+    monkeypatch.setattr(render, "layout", lambda topology: calls.append(1) or layout(topology))
+    topology = _topology()
+    written = render_all(topology, "topology", ["svg", "html"])
+
+    assert len(calls) == 1
+    assert sorted(os.listdir(tmp_path)) == sorted(written)
+    with open("topology.svg") as f:
+        assert f.read() == render_svg(topology)
+    with open("topology.html") as f:
+        assert f.read() == render_html(topology)
@@ -0,0 +1,39 @@
+from network_topology.collect import collect_topology
+from network_topology.fetch import fetch_tgw_route_table_details, paginate
+from network_topology.standin import StandIn, standin_clients, synthetic_estate
+from network_topology.tgw_routing import find_routing_problems, index_tgw_routing
+
+# Blackhole TGW routes against the stand-in: Routes stays active-only for
+# every caller, and the topology keeps blackholes apart for analysis.
+
+
+def _estate():
+    estate = synthetic_estate(tgws=1, route_tables=2, routes=10, vpcs=4, subnets=1, vpns=0, dx_gateways=0)
+    routes = next(iter(estate["ec2"]["SearchTransitGatewayRoutes"].values()))
+    routes[0]["State"] = "blackhole"
+    return estate
+
+
+def _states(routes):
+    return {route["State"] for route in routes}
+
+
+def test_topology_keeps_blackholes_apart_from_routes():
+    estate = _estate()
+    topology = collect_topology(*standin_clients(StandIn(estate)))
+    route_tables = [rtb for tgw in topology["TransitGateways"] for rtb in tgw["RouteTables"]]
+    assert all(_states(rtb["Routes"]) <= {"active"} for rtb in route_tables)
+    blackholes = [route for rtb in route_tables for route in rtb["BlackholeRoutes"]]
+    expected = sum(route["State"] == "blackhole" for routes in estate["ec2"]["SearchTransitGatewayRoutes"].values()
+                   for route in routes)
+    assert len(blackholes) == expected >= 1 and _states(blackholes) == {"blackhole"}
+
+    problems = find_routing_problems(index_tgw_routing(topology))
+    assert len(problems["BlackholeRoutes"]) == expected
+
+
+def test_route_table_details_alone_search_active_routes_only():
+    ec2, _ = standin_clients(StandIn(_estate()))
+    route_tables = list(paginate(ec2, "describe_transit_gateway_route_tables", "TransitGatewayRouteTables"))
+    fetch_tgw_route_table_details(ec2, route_tables)
+    assert all("BlackholeRoutes" not in rtb and _states(rtb["Routes"]) <= {"active"} for rtb in route_tables)
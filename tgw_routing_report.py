@@ -0,0 +1,51 @@
+import json
+import sys
+
+from network_topology.snapshot import load_snapshot, merge_accounts, snapshot_basename
+from network_topology.tgw_routing import (
+    attachments_reaching, find_routing_problems, index_tgw_routing, route_table_routes
+)
+
+# TGW association / propagation report for a saved snapshot:
+#   python tgw_routing_report.py <snapshot.json[.gz|.zst] | snapshot.cols>
+# writes <snapshot>.tgw-routing.json with any routing problems, every
+# attachment's route tables and every route table's routes. An attachment's
+# effective routes are those of the table named in its AssociatedWith; they
+# are listed once per table, not copied into each attachment. With a CIDR or IP:
+#   python tgw_routing_report.py <snapshot> 10.20.0.0/16
+# it prints which attachments can reach it instead.
+
+if len(sys.argv) not in (2, 3):
+    sys.exit(f"Usage: {sys.argv[0]} <snapshot.json | snapshot.cols> [cidr]")
+
+source = sys.argv[1].rstrip("/")
+index = index_tgw_routing(merge_accounts(load_snapshot(source)))
+
+if len(sys.argv) == 3:
+    for reach in attachments_reaching(index, sys.argv[2]):
+        print(json.dumps(reach))
+    sys.exit()
+
+problems = find_routing_problems(index)
+report = {
+    "Problems": problems,
+    "Attachments": index["Attachments"],
+    "RouteTables": {
+        rtb_id: {
+            "TransitGatewayId": rtb["TransitGatewayId"],
+            "Associated": rtb["Associated"],
+            "Propagating": rtb["Propagating"],
+            "Routes": route_table_routes(index, rtb_id)
+        }
+        for rtb_id, rtb in index["RouteTables"].items()
+    }
+}
+output_file = f"{snapshot_basename(source)}.tgw-routing.json"
+with open(output_file, "w") as f:
+    json.dump(report, f, indent=2)
+
+print(f"✅ {len(index['Attachments'])} attachments, {len(index['RouteTables'])} route tables")
+for name, items in problems.items():
+    icon = "⚠️" if items else "✅"
+    print(f"{icon} {name}: {len(items)}")
+print(f"✅ Report saved to: {output_file}")
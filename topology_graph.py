@@ -0,0 +1,29 @@
+import sys
+
+import numpy as np
+
+from network_topology.graph import build_graph, write_gexf, write_graphml
+from network_topology.snapshot import load_snapshot, merge_accounts, snapshot_basename
+
+# Exports a saved snapshot as a graph for analytics tools:
+#   python topology_graph.py <snapshot.json[.gz|.zst] | snapshot.cols>
+# writes <snapshot>.graph.npz (CSR arrays and attribute tables, loadable without
+# allow_pickle), <snapshot>.graphml and <snapshot>.gexf (with node attributes)
+
+if len(sys.argv) != 2:
+    sys.exit(f"Usage: {sys.argv[0]} <snapshot.json | snapshot.cols>")
+
+source = sys.argv[1].rstrip("/")
+# A multi-account crawl is one graph, joined by its shared TGWs
+topology = merge_accounts(load_snapshot(source))
+
+graph = build_graph(topology)
+basename = snapshot_basename(source)
+
+np.savez_compressed(f"{basename}.graph.npz", **graph.to_arrays())
+write_graphml(graph, f"{basename}.graphml")
+write_gexf(graph, f"{basename}.gexf")
+
+components = len(np.unique(graph.connected_components()))
+print(f"✅ {len(graph.ids)} nodes, {len(graph.sources)} edges, {components} connected components")
+print(f"✅ Saved: {basename}.graph.npz, {basename}.graphml, {basename}.gexf")
@@ -0,0 +1,82 @@
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from network_topology.collect import collect_topology, iter_topology
+from network_topology.snapshot import (
+    diff_fingerprints, fingerprint, fingerprint_stream, load_snapshot, previous_state, scan_snapshot
+)
+from network_topology.standin import StandIn, standin_clients, synthetic_estate
+from network_topology.writer import write_topology
+
+# Peak RSS of writing a topology snapshot, json.dump of the whole document
+# versus the streaming writer, against the local EC2/DX stand-in:
+#   python writer_memory_benchmark.py
+# Each mode runs in its own process, since peak RSS never goes down.
+
+# ==== CONFIGURE ====
+# Routes dominate large snapshots: 20 TGWs x 5 route tables x 2000 routes
+ESTATE = dict(tgws=20, route_tables=5, routes=2000, vpcs=2000, subnets=8, vpns=100, dx_gateways=4, vifs=8)
+MODES = {
+    "json.dump": "collect_topology, then json.dump(indent=2)",
+    "stream": "iter_topology into write_topology",
+    "stream, incremental": "as stream, reusing routes from a previous snapshot read entity by entity",
+    "stream, incremental, json.load": "as above, with the previous snapshot loaded whole",
+}
+
+
+def _rss_mb():
+    # Current resident set, from /proc (Linux)
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+
+
+def run(mode, output, previous_path):
+    estate = synthetic_estate(**ESTATE)
+    ec2, dx = standin_clients(StandIn(estate))
+    baseline = _rss_mb()
+    started = time.perf_counter()
+
+    if mode == "json.dump":
+        topology = collect_topology(ec2, dx)
+        with open(output, "w") as f:
+            json.dump(topology, f, indent=2, default=str)
+    elif mode == "stream":
+        write_topology(output, iter_topology(ec2, dx))
+    else:
+        if mode == "stream, incremental":
+            previous, old_fingerprints = scan_snapshot(previous_path)
+        else:
+            # How the incremental refresh used to hold the previous snapshot
+            snapshot = load_snapshot(previous_path)
+            previous, old_fingerprints = previous_state(snapshot), fingerprint(snapshot)
+        new_fingerprints = {}
+        write_topology(output, fingerprint_stream(iter_topology(ec2, dx, previous=previous), new_fingerprints))
+        assert not diff_fingerprints(old_fingerprints, new_fingerprints)
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return {"Seconds": round(time.perf_counter() - started, 1), "PeakMB": round(peak - baseline, 1)}
+
+
+if len(sys.argv) == 4:
+    # One mode, in a child process
+    print(json.dumps(run(*sys.argv[1:])))
+    sys.exit()
+
+with tempfile.TemporaryDirectory() as tmp:
+    previous_path = os.path.join(tmp, "previous.json")
+    print(f"Estate: {ESTATE}")
+    print("Peak RSS above the process's RSS once the estate is built:")
+    for mode, description in MODES.items():
+        # The first streamed snapshot is the previous one for the incremental modes
+        output = previous_path if mode == "stream" else os.path.join(tmp, "snapshot.json")
+        child = subprocess.run([sys.executable, __file__, mode, output, previous_path],
+                               capture_output=True, text=True, check=True)
+        result = json.loads(child.stdout.strip().splitlines()[-1])
+        size = os.path.getsize(output) / 2 ** 20
+        print(f"{mode:>31}: peak {result['PeakMB']:7.1f} MB, {result['Seconds']:5.1f}s, "
+              f"{size:.0f} MB written  ({description})")